@@ -4,8 +4,13 @@ from flask_login import LoginManager
 from flask_migrate import Migrate
 from dotenv import load_dotenv
 import os
+import atexit
 from datetime import datetime
 from app.thread_monitor import thread_monitor
+from app.progress_bus import progress_bus
+from app.page_cache import page_cache
+from app.compression import compressor
+from app.generation_registry import generation_registry
 
 db = SQLAlchemy()
 login_manager = LoginManager()
@@ -25,10 +30,36 @@ def create_app(config_object=None):
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///quiz_master.db'
         app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Overall time budget for one lecture's content generation job, in seconds
+    app.config.setdefault('GENERATION_JOB_DEADLINE', int(os.getenv('GENERATION_JOB_DEADLINE', 900)))
+    # Stream quiz/flashcard generation for per-item progress and early stop
+    app.config.setdefault('LLM_STREAMING', os.getenv('LLM_STREAMING', '1') == '1')
+    app.config.setdefault('LLM_COMBINED_GENERATION', os.getenv('LLM_COMBINED_GENERATION', '0') == '1')
+    # Summaries: 'llm' (model, extractive on failure), 'extractive' (local only) or
+    # 'fast' (extractive right away, replaced by the model's version in the background)
+    app.config.setdefault('SUMMARY_MODE', os.getenv('SUMMARY_MODE', 'llm'))
+    # Assemble quizzes from each lecture's bank of generated questions
+    app.config.setdefault('QUESTION_BANK', os.getenv('QUESTION_BANK', '1') == '1')
+    # Regenerate flashcards/notes per transcript chunk, reusing outputs for unchanged chunks
+    app.config.setdefault('INCREMENTAL_REGENERATION', os.getenv('INCREMENTAL_REGENERATION', '1') == '1')
+    # Most model calls per lecture for incremental flashcards/notes; adjacent chunks share a call
+    app.config.setdefault('CHUNK_ARTIFACT_GROUPS', int(os.getenv('CHUNK_ARTIFACT_GROUPS', 4)))
+    # Reject generated questions/flashcards paraphrasing stored ones: scope 'lecture', 'subject' or 'off'
+    app.config.setdefault('DEDUP_SCOPE', os.getenv('DEDUP_SCOPE', 'lecture'))
+    app.config.setdefault('DEDUP_THRESHOLD', float(os.getenv('DEDUP_THRESHOLD', 0.6)))
+    # Per-stage concurrency limits for bulk lecture ingestion
+    app.config.setdefault('BULK_TRANSCRIPT_CONCURRENCY', int(os.getenv('BULK_TRANSCRIPT_CONCURRENCY', 8)))
+    app.config.setdefault('BULK_GENERATION_CONCURRENCY', int(os.getenv('BULK_GENERATION_CONCURRENCY', 4)))
+    app.config.setdefault('BULK_PLAYLIST_INDEX', os.getenv('BULK_PLAYLIST_INDEX'))
+
     # Initialize extensions
     db.init_app(app)
     migrate = Migrate(app, db)
     login_manager.init_app(app)
+    progress_bus.init_app(app)
+    generation_registry.init_app(app)
+    page_cache.init_app(app)
+    compressor.init_app(app)
     login_manager.login_view = 'login'
     login_manager.login_message_category = 'info'
     
@@ -40,7 +71,11 @@ def create_app(config_object=None):
 
     with app.app_context():
         from app import routes, models
+        from app.commands import register_commands
+        register_commands(app)
         db.create_all()
+        from app.search_index import search_index
+        search_index.ensure_schema()
         
         # Create default admin if it doesn't exist
         from app.models import Admin
@@ -54,9 +89,8 @@ def create_app(config_object=None):
         # Start thread monitor
         thread_monitor.start_monitoring()
         
-        # Register cleanup on app shutdown
-        @app.teardown_appcontext
-        def shutdown_thread_monitor(exception=None):
-            thread_monitor.stop_monitoring()
+        # Register cleanup on interpreter shutdown; teardown_appcontext fires after
+        # every request and would stop the monitor while jobs are still running
+        atexit.register(thread_monitor.stop_monitoring)
     
     return app
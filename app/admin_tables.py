@@ -0,0 +1,226 @@
+import base64
+import binascii
+import json
+import operator
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, exists, func, or_
+from app import db
+from app.models import Lecture, LectureSummary, Question, Quiz, Score, Subject, User
+
+PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(sort: str, values: List) -> str:
+    payload = json.dumps({'sort': sort, 'key': [v.isoformat() if isinstance(v, datetime) else v for v in values]})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str, sort: str, columns: List) -> List:
+    """Key values from a cursor, checked against the sort it was made for"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        values = payload['key']
+        if payload['sort'] != sort or len(values) != len(columns):
+            raise ValueError
+        return [datetime.fromisoformat(value) if isinstance(getattr(column, 'type', None), db.DateTime) else value
+                for column, value in zip(columns, values)]
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+def keyset_page(query, sort: str, column, tiebreak, descending: bool, cursor: Optional[str],
+                limit: int) -> Tuple[List, Optional[str]]:
+    """One page of rows ordered by (column, tiebreak), and the cursor for the next page.
+
+    The page starts after the cursor's key rather than at an offset, so deep pages
+    cost the same as the first one when the sort columns are indexed.
+    """
+    columns = [column] if column is tiebreak else [column, tiebreak]
+    if cursor:
+        values = decode_cursor(cursor, sort, columns)
+        beyond = operator.lt if descending else operator.gt
+        after = beyond(columns[-1], values[-1])
+        for key, value in zip(reversed(columns[:-1]), reversed(values[:-1])):
+            after = or_(beyond(key, value), and_(key == value, after))
+        query = query.filter(after)
+    query = query.add_columns(*[key.label(f'_key{i}') for i, key in enumerate(columns)])
+    rows = query.order_by(*[key.desc() if descending else key.asc() for key in columns]).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort, [getattr(rows[-1], f'_key{i}') for i in range(len(columns))])
+
+def page_params(args, sorts: Dict) -> Tuple[str, object, bool, Optional[str], int]:
+    """Sort key, sort column, direction, cursor and page size from request args.
+
+    sorts maps names to (column, descending by default); the first is the default sort.
+    """
+    sort = args.get('sort') or next(iter(sorts))
+    if sort not in sorts:
+        raise ValueError(f'Unknown sort: {sort}')
+    order = args.get('order')
+    if order not in (None, '', 'asc', 'desc'):
+        raise ValueError(f'Unknown order: {order}')
+    descending = sorts[sort][1] if not order else order == 'desc'
+    try:
+        limit = int(args.get('limit', PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit must be a number')
+    # The direction is part of the cursor's sort, so a cursor can't be reused with the other one
+    return (f"{sort}:{'desc' if descending else 'asc'}", sorts[sort][0], descending, args.get('cursor'),
+            min(max(limit, 1), MAX_PAGE_SIZE))
+
+def like_pattern(text: str) -> str:
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+def percent(scored, total) -> Optional[float]:
+    return round(scored * 100.0 / total, 1) if total else None
+
+def quizzes(args) -> Dict:
+    """Quizzes with their lecture, subject, question count and attempt stats"""
+    sorts = {'newest': (Quiz.id, True), 'date': (Quiz.date_of_quiz, True), 'lecture': (Lecture.title, False)}
+    sort, column, descending, cursor, limit = page_params(args, sorts)
+    query = db.session.query(Quiz.id, Quiz.date_of_quiz, Quiz.time_duration, Quiz.is_ai_generated,
+                             Lecture.title.label('lecture'), Subject.name.label('subject')) \
+        .join(Lecture, Quiz.lecture_id == Lecture.id).join(Subject, Lecture.subject_id == Subject.id)
+    if args.get('subject_id', type=int):
+        query = query.filter(Lecture.subject_id == args.get('subject_id', type=int))
+    if args.get('q'):
+        query = query.filter(Lecture.title.ilike(like_pattern(args['q']), escape='\\'))
+    rows, next_cursor = keyset_page(query, sort, column, Quiz.id, descending, cursor, limit)
+
+    ids = [row.id for row in rows]
+    questions = dict(db.session.query(Question.quiz_id, func.count(Question.id))
+                     .filter(Question.quiz_id.in_(ids)).group_by(Question.quiz_id).all())
+    attempts = {quiz_id: (count, scored, total) for quiz_id, count, scored, total in
+                db.session.query(Score.quiz_id, func.count(Score.id), func.sum(Score.total_scored),
+                                 func.sum(Score.total_questions))
+                .filter(Score.quiz_id.in_(ids)).group_by(Score.quiz_id)}
+    items = []
+    for row in rows:
+        count, scored, total = attempts.get(row.id, (0, 0, 0))
+        items.append({
+            'id': row.id,
+            'lecture': row.lecture,
+            'subject': row.subject,
+            'date': row.date_of_quiz.strftime('%Y-%m-%d %H:%M'),
+            'duration': row.time_duration,
+            'questions': questions.get(row.id, 0),
+            'attempts': count,
+            'avg_score': percent(scored, total),
+            'ai_generated': bool(row.is_ai_generated)
+        })
+    return {'items': items, 'next_cursor': next_cursor}
+
+def lectures(args) -> Dict:
+    """Lectures with their subject and whether a summary has been generated"""
+    sorts = {'newest': (Lecture.id, True), 'title': (Lecture.title, False)}
+    sort, column, descending, cursor, limit = page_params(args, sorts)
+    has_summary = exists().where(LectureSummary.lecture_id == Lecture.id)
+    query = db.session.query(Lecture.id, Lecture.title, Lecture.created_at, Lecture.video_url,
+                             Subject.name.label('subject'), has_summary.label('has_summary')) \
+        .join(Subject, Lecture.subject_id == Subject.id)
+    if args.get('subject_id', type=int):
+        query = query.filter(Lecture.subject_id == args.get('subject_id', type=int))
+    if args.get('q'):
+        query = query.filter(Lecture.title.ilike(like_pattern(args['q']), escape='\\'))
+    rows, next_cursor = keyset_page(query, sort, column, Lecture.id, descending, cursor, limit)
+    return {'items': [{
+        'id': row.id,
+        'title': row.title,
+        'subject': row.subject,
+        'created': row.created_at.strftime('%Y-%m-%d %H:%M') if row.created_at else '',
+        'has_video': bool(row.video_url),
+        'has_summary': bool(row.has_summary)
+    } for row in rows], 'next_cursor': next_cursor}
+
+def subjects(args) -> Dict:
+    """Subjects with their lecture and quiz counts"""
+    sorts = {'name': (Subject.name, False), 'newest': (Subject.id, True)}
+    sort, column, descending, cursor, limit = page_params(args, sorts)
+    query = db.session.query(Subject.id, Subject.name, Subject.description)
+    if args.get('q'):
+        query = query.filter(Subject.name.ilike(like_pattern(args['q']), escape='\\'))
+    rows, next_cursor = keyset_page(query, sort, column, Subject.id, descending, cursor, limit)
+
+    ids = [row.id for row in rows]
+    lecture_counts = dict(db.session.query(Lecture.subject_id, func.count(Lecture.id))
+                          .filter(Lecture.subject_id.in_(ids)).group_by(Lecture.subject_id).all())
+    quiz_counts = dict(db.session.query(Lecture.subject_id, func.count(Quiz.id)).join(Quiz, Quiz.lecture_id == Lecture.id)
+                       .filter(Lecture.subject_id.in_(ids)).group_by(Lecture.subject_id).all())
+    return {'items': [{
+        'id': row.id,
+        'name': row.name,
+        'description': row.description or '',
+        'lectures': lecture_counts.get(row.id, 0),
+        'quizzes': quiz_counts.get(row.id, 0)
+    } for row in rows], 'next_cursor': next_cursor}
+
+def rankings(args) -> Dict:
+    """Students who have attempted a quiz, by average score; ranks follow on from earlier pages"""
+    stats = db.session.query(
+        Score.user_id.label('user_id'),
+        func.avg(Score.total_scored * 100.0 / Score.total_questions).label('avg_score'),
+        func.count(Score.id).label('attempts')
+    ).group_by(Score.user_id).subquery()
+    sorts = {'score': (stats.c.avg_score, True), 'attempts': (stats.c.attempts, True)}
+    sort, column, descending, cursor, limit = page_params(args, sorts)
+    query = db.session.query(User.id, User.full_name, stats.c.avg_score, stats.c.attempts) \
+        .join(stats, stats.c.user_id == User.id)
+    if args.get('q'):
+        query = query.filter(User.full_name.ilike(like_pattern(args['q']), escape='\\'))
+    rows, next_cursor = keyset_page(query, sort, column, User.id, descending, cursor, limit)
+    return {'items': [{
+        'id': row.id,
+        'name': row.full_name,
+        'avg_score': round(row.avg_score, 1),
+        'attempts': row.attempts
+    } for row in rows], 'next_cursor': next_cursor}
+
+def subject_stats(args) -> Dict:
+    """Average and median score per subject, for subjects with at least one attempt"""
+    sorts = {'name': (Subject.name, False)}
+    sort, column, descending, cursor, limit = page_params(args, sorts)
+    attempted = exists().where(and_(Lecture.subject_id == Subject.id, Quiz.lecture_id == Lecture.id,
+                                    Score.quiz_id == Quiz.id))
+    query = db.session.query(Subject.id, Subject.name).filter(attempted)
+    rows, next_cursor = keyset_page(query, sort, column, Subject.id, descending, cursor, limit)
+
+    scores = {}
+    for subject_id, score in db.session.query(Lecture.subject_id, Score.total_scored * 100.0 / Score.total_questions) \
+            .join(Quiz, Quiz.lecture_id == Lecture.id).join(Score, Score.quiz_id == Quiz.id) \
+            .filter(Lecture.subject_id.in_([row.id for row in rows])):
+        scores.setdefault(subject_id, []).append(score)
+    return {'items': [{
+        'id': row.id,
+        'name': row.name,
+        'avg_score': round(sum(scores[row.id]) / len(scores[row.id]), 1),
+        'median_score': round(median(scores[row.id]), 1),
+        'attempts': len(scores[row.id])
+    } for row in rows], 'next_cursor': next_cursor}
+
+def activity() -> Dict:
+    """Attempts per hour of day, and per day over the last week, for the analytics charts"""
+    hourly = db.session.query(
+        db.func.extract('hour', Score.time_stamp_of_attempt).label('hour'),
+        db.func.count().label('count')
+    ).group_by('hour').all()
+    seven_days_ago = datetime.now() - timedelta(days=7)
+    daily = db.session.query(
+        db.func.date(Score.time_stamp_of_attempt).label('date'),
+        db.func.count().label('count')
+    ).filter(Score.time_stamp_of_attempt >= seven_days_ago).group_by('date').all()
+    return {
+        'hourly_attempts': {str(hour): count for hour, count in hourly},
+        'daily_attempts': {str(date): count for date, count in daily}
+    }
+
+# Dashboard tabs served by admin_dashboard_table
+TABLES = {
+    'quizzes': quizzes,
+    'lectures': lectures,
+    'subjects': subjects,
+    'rankings': rankings,
+    'subject-stats': subject_stats
+}
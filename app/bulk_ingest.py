@@ -0,0 +1,277 @@
+import csv
+import io
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from app import db
+from app.models import Lecture
+from app.thread_monitor import thread_monitor
+from app.generation_registry import generation_registry
+from app.progress_bus import progress_bus
+from services.video_service import VideoService
+from services.cancellation import CancellationToken
+
+def parse_ingest_csv(text: str) -> List[Dict]:
+    """Read url[,title] rows from CSV text; a header row is optional"""
+    items = []
+    rows = list(csv.reader(io.StringIO(text)))
+    if rows and rows[0] and rows[0][0].strip().lower() in ('url', 'video_url'):
+        rows = rows[1:]
+    for row in rows:
+        if not row or not row[0].strip():
+            continue
+        items.append({
+            'url': row[0].strip(),
+            'title': row[1].strip() if len(row) > 1 and row[1].strip() else None
+        })
+    return items
+
+def resolve_playlist(playlist_id: str, index_path: str) -> List[Dict]:
+    """Resolve a playlist ID offline from a supplied index file.
+
+    The index is either JSON ({"<playlist_id>": ["url", {"url": ..., "title": ...}, ...]})
+    or CSV with playlist_id,url,title columns.
+    """
+    with open(index_path, encoding='utf-8') as f:
+        if index_path.endswith('.json'):
+            entries = json.load(f).get(playlist_id, [])
+            return [entry if isinstance(entry, dict) else {'url': entry, 'title': None}
+                    for entry in entries]
+        return [{'url': row['url'].strip(), 'title': (row.get('title') or '').strip() or None}
+                for row in csv.DictReader(f) if row.get('playlist_id') == playlist_id]
+
+def clamp_concurrency(value, ceiling: int) -> int:
+    """A requested worker count clamped to 1..ceiling; the ceiling when not given"""
+    if value is None or value == '':
+        return ceiling
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Concurrency must be a whole number, got {value!r}')
+    return min(max(value, 1), ceiling)
+
+def parse_num_questions(value) -> int:
+    """A quiz length as an int in 5..50, raising ValueError otherwise"""
+    try:
+        if isinstance(value, (bool, float)):
+            raise TypeError
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Number of questions must be a whole number, got {value!r}')
+    if not 5 <= value <= 50:
+        raise ValueError('Number of questions must be between 5 and 50')
+    return value
+
+class BulkIngestJob:
+    """Creates lectures for many videos and generates their content in a two-stage pipeline.
+
+    Reports are also saved to the progress bus's shared state, so any worker can
+    answer status requests for the job.
+    """
+
+    def __init__(self, app, subject_id: int, items: List[Dict], options: Dict,
+                 transcript_workers: int = 8, generation_workers: int = 4,
+                 fetch_transcript: Optional[Callable[[str], Dict]] = None,
+                 generate: Optional[Callable] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.app = app
+        self.subject_id = subject_id
+        self.options = options
+        self.transcript_workers = max(1, transcript_workers)
+        self.generation_workers = max(1, generation_workers)
+        self.video_service = VideoService()
+        # Stage callables; fetch_transcript(url) and generate(app, lecture, options, cancel_token, transcript_data)
+        self.fetch_transcript = fetch_transcript or self.video_service.get_transcript
+        self.generate = generate
+        self.lock = threading.Lock()
+        self.items = [{
+            'index': i,
+            'url': item['url'],
+            'title': item.get('title') or f'Lecture {i + 1}',
+            'video_id': self.video_service._extract_video_id(item['url']),
+            'lecture_id': None,
+            'status': 'pending',
+            'error': None,
+            'transcript_seconds': None,
+            'generation_seconds': None
+        } for i, item in enumerate(items)]
+        self.started_at = None
+        self.finished_at = None
+
+    def _set(self, item: Dict, **fields):
+        with self.lock:
+            item.update(fields)
+        self.save()
+
+    @staticmethod
+    def _state_name(job_id: str) -> str:
+        return f'bulk-ingest:{job_id}'
+
+    def save(self):
+        """Publish the current report for status requests served by other workers"""
+        report = self.report()
+        try:
+            progress_bus.update_state(self._state_name(self.id), lambda _: report)
+        except Exception as e:
+            print(f"[Bulk Ingest] Could not save job status: {str(e)}")
+
+    @classmethod
+    def saved_report(cls, job_id: str) -> Optional[Dict]:
+        """The last report saved by whichever worker runs the job"""
+        return progress_bus.get_state(cls._state_name(job_id))
+
+    def create_lectures(self):
+        """Insert one Lecture row per valid item in a single transaction"""
+        valid = []
+        for item in self.items:
+            if item['video_id']:
+                valid.append(item)
+            else:
+                item.update(status='failed', error='Invalid YouTube URL')
+
+        lectures = [Lecture(subject_id=self.subject_id, title=item['title'], video_url=item['url'])
+                    for item in valid]
+        db.session.add_all(lectures)
+        db.session.commit()
+        for item, lecture in zip(valid, lectures):
+            item['lecture_id'] = lecture.id
+
+    def start(self) -> threading.Thread:
+        """Run the pipeline in a background thread"""
+        thread = threading.Thread(target=self.run, name=f'Bulk_Ingest_{self.id}', daemon=True)
+        thread.start()
+        return thread
+
+    def run(self):
+        from app.routes import find_reusable_lecture, copy_generated_content
+
+        self.started_at = time.time()
+        self.save()
+        transcript_pool = ThreadPoolExecutor(self.transcript_workers, thread_name_prefix='ingest_transcript')
+        generation_pool = ThreadPoolExecutor(self.generation_workers, thread_name_prefix='ingest_generate')
+        try:
+            fetches = {}
+            for item in self.items:
+                if item['lecture_id'] is None:
+                    continue
+                with self.app.app_context():
+                    # Content already generated for this video elsewhere needs no pipeline at all
+                    source = find_reusable_lecture(item['video_id'], self.options, exclude_id=item['lecture_id'])
+                    if source:
+                        copy_generated_content(source.id, db.session.get(Lecture, item['lecture_id']), self.options)
+                        db.session.commit()
+                        self._set(item, status='done', reused_from=source.id)
+                        continue
+                key = generation_registry.make_key(item['video_id'], self.options)
+                leader_id = generation_registry.join_or_start(key, item['lecture_id'])
+                if leader_id is not None:
+                    # Duplicate video in this batch (or already in flight): reuse that job's result
+                    self._set(item, status='coalesced', coalesced_with=leader_id)
+                    continue
+                fetches[transcript_pool.submit(self._fetch_transcript, item)] = item
+
+            # Each generation starts as soon as its transcript arrives
+            generations = []
+            for future in as_completed(fetches):
+                item = fetches[future]
+                transcript_data = future.result()
+                if transcript_data is None:
+                    generation_registry.publish(item['lecture_id'], {'component': 'error', 'progress': item['error']})
+                    generation_registry.finish(item['lecture_id'])
+                    continue
+                generations.append(generation_pool.submit(self._generate, item, transcript_data))
+            for future in generations:
+                future.result()
+        finally:
+            transcript_pool.shutdown(wait=True)
+            generation_pool.shutdown(wait=True)
+            self._resolve_coalesced()
+            self.finished_at = time.time()
+            self.save()
+
+    def _fetch_transcript(self, item: Dict) -> Optional[Dict]:
+        self._set(item, status='fetching_transcript')
+        started = time.time()
+        try:
+            transcript_data = self.fetch_transcript(item['url'])
+            self._set(item, status='queued_for_generation', transcript_seconds=time.time() - started)
+            return transcript_data
+        except Exception as e:
+            self._set(item, status='failed', error=f'Transcript fetch failed: {str(e)}',
+                      transcript_seconds=time.time() - started)
+            return None
+
+    def _generate(self, item: Dict, transcript_data: Dict):
+        from app.routes import generate_ai_content
+
+        generate = self.generate or generate_ai_content
+        self._set(item, status='generating')
+        started = time.time()
+        cancel_token = CancellationToken(self.app.config.get('GENERATION_JOB_DEADLINE'))
+        thread_monitor.register_thread(item['lecture_id'], threading.current_thread(), cancel_token=cancel_token)
+        try:
+            with self.app.app_context():
+                lecture = db.session.get(Lecture, item['lecture_id'])
+                completed = generate(self.app, lecture, self.options, cancel_token,
+                                     transcript_data=transcript_data)
+            self._set(item, status='done' if completed else 'cancelled',
+                      error=None if completed else cancel_token.reason,
+                      generation_seconds=time.time() - started)
+        except Exception as e:
+            self._set(item, status='failed', error=str(e), generation_seconds=time.time() - started)
+
+    def _resolve_coalesced(self):
+        by_lecture = {item['lecture_id']: item for item in self.items if item['lecture_id']}
+        for item in self.items:
+            if item['status'] == 'coalesced':
+                leader = by_lecture.get(item.get('coalesced_with'))
+                # Leaders outside this batch report through their own progress stream
+                item['status'] = leader['status'] if leader else 'coalesced'
+                item['error'] = leader['error'] if leader else None
+
+    def report(self) -> Dict:
+        """Per-item status plus aggregate throughput"""
+        with self.lock:
+            items = [dict(item) for item in self.items]
+        counts = {}
+        for item in items:
+            counts[item['status']] = counts.get(item['status'], 0) + 1
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0
+        completed = counts.get('done', 0)
+        transcript_times = [i['transcript_seconds'] for i in items if i['transcript_seconds'] is not None]
+        generation_times = [i['generation_seconds'] for i in items if i['generation_seconds'] is not None]
+        return {
+            'job_id': self.id,
+            'subject_id': self.subject_id,
+            'finished': self.finished_at is not None,
+            'total': len(items),
+            'counts': counts,
+            'elapsed_seconds': round(elapsed, 2),
+            'lectures_per_minute': round(completed / elapsed * 60, 2) if elapsed else 0,
+            'avg_transcript_seconds': round(sum(transcript_times) / len(transcript_times), 2) if transcript_times else None,
+            'avg_generation_seconds': round(sum(generation_times) / len(generation_times), 2) if generation_times else None,
+            'concurrency': {'transcript': self.transcript_workers, 'generation': self.generation_workers},
+            'items': items
+        }
+
+def collect_items(payload: Dict, playlist_index: Optional[str] = None) -> List[Dict]:
+    """Gather ingest items from urls, items, csv and/or playlist_id fields of a request"""
+    items = [{'url': url, 'title': None} for url in payload.get('urls') or []]
+    items += [{'url': item['url'], 'title': item.get('title')} for item in payload.get('items') or []]
+    if payload.get('csv'):
+        items += parse_ingest_csv(payload['csv'])
+    if payload.get('playlist_id'):
+        if not playlist_index:
+            raise ValueError('No playlist index configured to resolve playlist IDs')
+        resolved = resolve_playlist(payload['playlist_id'], playlist_index)
+        if not resolved:
+            raise ValueError(f"Playlist {payload['playlist_id']} not found in playlist index")
+        items += resolved
+    return items
+
+# Bulk jobs started in this process, by job ID; other workers read BulkIngestJob.saved_report
+bulk_jobs: Dict[str, BulkIngestJob] = {}
@@ -0,0 +1,101 @@
+import json
+from typing import Callable, Dict, List, Optional
+from flask import current_app
+from app import db
+from app.models import LectureChunkArtifact
+from services.cancellation import CancellationToken
+from services.transcript_chunks import chunk_segments, group_chunks
+
+class ChunkArtifactStore:
+    """Generated output recorded per transcript chunk, keyed by the chunk's content hash.
+
+    Regenerating a lecture only sends chunks whose text changed to the model;
+    outputs for unchanged chunks come from the database, and ones for chunks
+    no longer in the transcript are dropped. Flashcards and notes are made per
+    group of adjacent chunks (CHUNK_ARTIFACT_GROUPS), so a lecture costs a
+    bounded number of calls however long it is.
+    """
+
+    def outputs(self, lecture_id: int, kind: str, chunks: List[Dict],
+                generate: Callable[[Dict], Optional[object]], force: bool = False) -> Dict:
+        """Per-chunk outputs in chunk order (caller commits).
+
+        generate returns a JSON-serializable output for a chunk, or None on
+        failure; a failed chunk keeps its previous output, if any, and is
+        sent again next time.
+        """
+        rows = {row.chunk_hash: row for row in
+                LectureChunkArtifact.query.filter_by(lecture_id=lecture_id, kind=kind)}
+        outputs, fresh = [], set()
+        for chunk in chunks:
+            row = rows.get(chunk['hash'])
+            if row is not None and (not force or chunk['hash'] in fresh):
+                row.position = chunk['index']
+                outputs.append(json.loads(row.content))
+                continue
+            output = generate(chunk)
+            fresh.add(chunk['hash'])
+            if output is None:
+                if row is not None:
+                    outputs.append(json.loads(row.content))  # Keep the previous output
+                continue
+            if row is None:
+                row = LectureChunkArtifact(lecture_id=lecture_id, kind=kind, chunk_hash=chunk['hash'])
+                db.session.add(row)
+                rows[chunk['hash']] = row
+            row.position = chunk['index']
+            row.content = json.dumps(output)
+            outputs.append(output)
+
+        current = {chunk['hash'] for chunk in chunks}
+        for key, row in rows.items():
+            if key not in current:
+                db.session.delete(row)
+        print(f"[Chunk Cache] Lecture {lecture_id} {kind}: {len(fresh)} of {len(chunks)} chunks generated")
+        return {'outputs': outputs, 'chunks': len(chunks), 'generated': len(fresh),
+                'reused': len(chunks) - len(fresh)}
+
+    def copy(self, source_lecture_id: int, target_lecture_id: int):
+        """Give another lecture of the same video the source's chunk outputs (caller commits)"""
+        known = {(row.kind, row.chunk_hash) for row in
+                 LectureChunkArtifact.query.filter_by(lecture_id=target_lecture_id)}
+        for row in LectureChunkArtifact.query.filter_by(lecture_id=source_lecture_id).all():
+            if (row.kind, row.chunk_hash) not in known:
+                db.session.add(LectureChunkArtifact(lecture_id=target_lecture_id, kind=row.kind,
+                                                    chunk_hash=row.chunk_hash, position=row.position,
+                                                    content=row.content))
+
+    def _groups(self, segments: List[Dict]) -> List[Dict]:
+        return group_chunks(chunk_segments(segments), current_app.config.get('CHUNK_ARTIFACT_GROUPS', 4))
+
+    def flashcards(self, lecture_id: int, segments: List[Dict], ai_service, count: int = 10,
+                   force: bool = False, cancel_token: Optional[CancellationToken] = None) -> List[Dict]:
+        """At most count flashcards, split across chunk groups by their share of the transcript"""
+        groups = self._groups(segments)
+        total = sum(len(group['text']) for group in groups)
+        done = 0
+        for group in groups:
+            # Cumulative rounding, so the shares add up to count
+            group['count'] = round((done + len(group['text'])) * count / total) - round(done * count / total)
+            done += len(group['text'])
+
+        def generate(group):
+            if not group['count']:
+                return []
+            cards = ai_service.generate_flashcards(group['text'], cancel_token=cancel_token, count=group['count'],
+                                                   max_chars=None)  # A group is sized to be sent whole
+            return cards[:group['count']] or None
+        result = self.outputs(lecture_id, 'flashcards', groups, generate, force=force)
+        # Outputs cached under an older split of count can add up to more than count
+        return [card for cards in result['outputs'] for card in cards][:count]
+
+    def notes(self, lecture_id: int, segments: List[Dict], ai_service, force: bool = False,
+              cancel_token: Optional[CancellationToken] = None) -> str:
+        """Study notes joined from each chunk group's part notes"""
+        result = self.outputs(lecture_id, 'notes', self._groups(segments),
+                              lambda group: ai_service.generate_part_notes(group['text'], cancel_token=cancel_token),
+                              force=force)
+        return '\n\n'.join(result['outputs']) or "Error generating study notes. Please try again."
+
+# Global per-chunk artifact store
+chunk_artifacts = ChunkArtifactStore()
@@ -0,0 +1,112 @@
+import json
+import click
+from flask import current_app
+
+def register_commands(app):
+    """Register the app's maintenance and batch CLI commands"""
+
+    @app.cli.command('bulk-ingest')
+    @click.option('--subject-id', type=int, required=True, help='Subject to add the lectures to')
+    @click.option('--csv', 'csv_path', type=click.Path(exists=True), help='CSV file of url[,title] rows')
+    @click.option('--playlist-id', help='Playlist to resolve from the playlist index')
+    @click.option('--playlist-index', type=click.Path(exists=True),
+                  help='JSON/CSV file mapping playlist IDs to videos')
+    @click.option('--summary/--no-summary', default=True)
+    @click.option('--flashcards/--no-flashcards', default=True)
+    @click.option('--notes/--no-notes', default=True)
+    @click.option('--quiz/--no-quiz', default=False)
+    @click.option('--num-questions', type=int, default=10)
+    @click.option('--transcript-concurrency', type=int, default=None)
+    @click.option('--generation-concurrency', type=int, default=None)
+    @click.argument('urls', nargs=-1)
+    def bulk_ingest_command(subject_id, csv_path, playlist_id, playlist_index, summary, flashcards,
+                            notes, quiz, num_questions, transcript_concurrency, generation_concurrency, urls):
+        """Create lectures for many YouTube videos and generate their AI content."""
+        from app.bulk_ingest import BulkIngestJob, clamp_concurrency, collect_items, parse_num_questions
+
+        payload = {'urls': list(urls), 'playlist_id': playlist_id}
+        if csv_path:
+            with open(csv_path, encoding='utf-8') as f:
+                payload['csv'] = f.read()
+        items = collect_items(payload, playlist_index or current_app.config.get('BULK_PLAYLIST_INDEX'))
+        if not items:
+            raise click.UsageError('No videos given; pass URLs, --csv or --playlist-id')
+        try:
+            if quiz:
+                num_questions = parse_num_questions(num_questions)
+            # Like the route, the command may lower the configured concurrency, never raise it
+            transcript_workers = clamp_concurrency(transcript_concurrency,
+                                                   current_app.config['BULK_TRANSCRIPT_CONCURRENCY'])
+            generation_workers = clamp_concurrency(generation_concurrency,
+                                                   current_app.config['BULK_GENERATION_CONCURRENCY'])
+        except ValueError as e:
+            raise click.UsageError(str(e))
+
+        job = BulkIngestJob(
+            current_app._get_current_object(), subject_id, items,
+            {
+                'generate_summary': summary,
+                'generate_flashcards': flashcards,
+                'generate_notes': notes,
+                'generate_quiz': quiz,
+                'num_questions': num_questions
+            },
+            transcript_workers=transcript_workers,
+            generation_workers=generation_workers
+        )
+        job.create_lectures()
+        click.echo(f'Ingesting {len(items)} videos (job {job.id})...')
+        job.run()
+
+        report = job.report()
+        for item in report['items']:
+            line = f"[{item['status']:>9}] {item['url']} -> lecture {item['lecture_id']}"
+            if item['error']:
+                line += f" ({item['error']})"
+            click.echo(line)
+        click.echo(json.dumps({k: v for k, v in report.items() if k != 'items'}, indent=2))
+
+    @app.cli.command('search-reindex')
+    def search_reindex_command():
+        """Rebuild the lecture search index from stored content."""
+        from app.search_index import search_index
+
+        count = search_index.rebuild()
+        mode = 'FTS5' if search_index.uses_fts() else 'LIKE fallback'
+        click.echo(f'Indexed {count} lectures ({mode})')
+
+    @app.cli.command('dedup-content')
+    @click.option('--scope', type=click.Choice(['lecture', 'subject']), default=None,
+                  help='Compare within each lecture or each subject (default: DEDUP_SCOPE)')
+    @click.option('--threshold', type=float, default=None, help='Jaccard similarity counted as a duplicate')
+    @click.option('--dry-run', is_flag=True, help='Report duplicates without removing them')
+    def dedup_content_command(scope, threshold, dry_run):
+        """Remove near-duplicate flashcards, banked questions and unattempted quiz questions."""
+        from app import db
+        from app.dedup import dedupe_existing
+
+        scope = scope or ('subject' if app.config.get('DEDUP_SCOPE') == 'subject' else 'lecture')
+        threshold = threshold or app.config.get('DEDUP_THRESHOLD', 0.6)
+        for kind in ('flashcards', 'questions', 'quiz_questions'):
+            report = dedupe_existing(kind, scope=scope, threshold=threshold, dry_run=dry_run)
+            click.echo(f"{kind}: {report['duplicates']} near-duplicates in {report['rows']} rows "
+                       f"({report['groups']} {scope}s), {report['removed']} removed")
+        if not dry_run:
+            db.session.commit()
+
+    @app.cli.command('render-content')
+    @click.option('--all', 'render_all', is_flag=True, help='Re-render rows that already have HTML')
+    def render_content_command(render_all):
+        """Fill the pre-rendered HTML of summaries and notes stored without it."""
+        from app import db
+        from app.models import LectureNote, LectureSummary
+        from services.markdown_renderer import markdown_renderer
+
+        for model in (LectureSummary, LectureNote):
+            query = model.query if render_all else model.query.filter(model.content_html.is_(None))
+            count = 0
+            for row in query.yield_per(200):
+                row.content_html = markdown_renderer.render(row.content)
+                count += 1
+            db.session.commit()
+            click.echo(f'Rendered {count} {model.__tablename__} rows')
@@ -0,0 +1,80 @@
+import gzip
+import os
+from typing import Optional
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only without it
+    brotli = None
+
+DEFAULT_MIMETYPES = ('text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+                     'application/javascript', 'application/json', 'image/svg+xml')
+
+class Compressor:
+    """gzip/brotli compression of buffered HTML and JSON responses.
+
+    Streamed responses (the generation progress event stream, send_file) pass
+    through untouched, so events are still flushed to the browser as they happen.
+    """
+
+    def __init__(self, min_size: int = 500, gzip_level: int = 6, brotli_level: int = 4,
+                 mimetypes=DEFAULT_MIMETYPES):
+        self.enabled = True
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_level = brotli_level
+        self.mimetypes = frozenset(mimetypes)
+
+    def init_app(self, app):
+        self.enabled = app.config.setdefault('COMPRESS_RESPONSES', os.getenv('COMPRESS_RESPONSES', '1') == '1')
+        self.min_size = app.config.setdefault('COMPRESS_MIN_SIZE', int(os.getenv('COMPRESS_MIN_SIZE', 500)))
+        self.gzip_level = app.config.setdefault('COMPRESS_GZIP_LEVEL', int(os.getenv('COMPRESS_GZIP_LEVEL', 6)))
+        self.brotli_level = app.config.setdefault('COMPRESS_BROTLI_LEVEL', int(os.getenv('COMPRESS_BROTLI_LEVEL', 4)))
+        mimetypes = app.config.setdefault('COMPRESS_MIMETYPES', os.getenv('COMPRESS_MIMETYPES'))
+        if isinstance(mimetypes, str):
+            mimetypes = [m.strip() for m in mimetypes.split(',') if m.strip()]
+        self.mimetypes = frozenset(mimetypes or DEFAULT_MIMETYPES)
+        app.after_request(self.after_request)
+
+    def encodings(self):
+        return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_level)
+        # mtime=0 keeps the output identical for identical pages
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def choose_encoding(self) -> Optional[str]:
+        return request.accept_encodings.best_match(self.encodings())
+
+    def after_request(self, response):
+        if (not self.enabled
+                or response.mimetype not in self.mimetypes
+                or response.is_streamed
+                or response.direct_passthrough
+                or not 200 <= response.status_code < 300
+                or response.status_code == 204
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        # The body depends on Accept-Encoding from here on, even when left uncompressed
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        response.set_data(self.compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        # A strong ETag names exact bytes; the compressed body is only equivalent
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+# Global response compressor
+compressor = Compressor()
@@ -0,0 +1,41 @@
+import hashlib
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+from flask import Response, make_response, request, session
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+
+def page_etag(parts: Iterable) -> str:
+    """ETag for a private page from its content validators and the viewer"""
+    key = '\x1f'.join(str(part) for part in parts) + '\x1f' + str(current_user.get_id())
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+def conditional_page(parts: Iterable, render: Callable[[], str],
+                     last_modified: Optional[datetime] = None) -> Response:
+    """A 304 when the browser's copy still matches, otherwise the rendered page with validators.
+
+    parts are cheap values (versions, timestamps, ids) that change whenever the
+    page would; render is only called on a miss. Pages are per user, so they
+    are marked private and revalidated on every view. Pages showing flashed
+    messages are never validated, since those are shown once.
+    """
+    if session.get('_flashes'):
+        response = make_response(render())
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    etag = page_etag(parts)
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0)  # HTTP dates have whole seconds
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    return response
@@ -0,0 +1,139 @@
+import itertools
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models import BankQuestion, Lecture, LectureFlashcard, Question, Quiz, Score
+from services.minhash import NearDuplicateIndex
+
+# Stored rows checked for near-duplicates: model, text column
+KINDS = {
+    'questions': (BankQuestion, BankQuestion.question_statement),
+    'flashcards': (LectureFlashcard, LectureFlashcard.front)
+}
+
+class NearDuplicateGuard:
+    """Rejects generated questions and flashcards that paraphrase ones already stored.
+
+    One MinHash/LSH index is kept per (kind, scope), where the scope is a
+    lecture or, with DEDUP_SCOPE=subject, every lecture of its subject. An
+    index is rebuilt from the database only when the scope's row count or
+    highest id changed in ways its own inserts don't explain, so a check is
+    an LSH lookup rather than a scan of stored rows.
+    """
+
+    def __init__(self, capacity: int = 32):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self._indexes: 'OrderedDict[Tuple, Dict]' = OrderedDict()
+        self._pending_ids = itertools.count()  # Keys for accepted items not yet stored as rows
+
+    def _scope(self, lecture: Lecture) -> Optional[Tuple[str, int]]:
+        scope = current_app.config.get('DEDUP_SCOPE', 'lecture')
+        if scope == 'subject':
+            return 'subject', lecture.subject_id
+        if scope == 'lecture':
+            return 'lecture', lecture.id
+        return None
+
+    def _rows(self, kind: str, scope: Tuple[str, int]):
+        model, _ = KINDS[kind]
+        query = db.session.query(model)
+        if scope[0] == 'subject':
+            return query.join(Lecture, Lecture.id == model.lecture_id).filter(Lecture.subject_id == scope[1])
+        return query.filter(model.lecture_id == scope[1])
+
+    def _version(self, kind: str, scope: Tuple[str, int]) -> Tuple[int, int]:
+        model, _ = KINDS[kind]
+        count, max_id = self._rows(kind, scope).with_entities(func.count(model.id), func.max(model.id)).one()
+        return count, max_id or 0
+
+    def index(self, kind: str, scope: Tuple[str, int]) -> NearDuplicateIndex:
+        """The scope's index, rebuilt if its rows changed behind its back"""
+        count, max_id = self._version(kind, scope)
+        key = (kind,) + scope
+        with self.lock:
+            cached = self._indexes.get(key)
+            # Unchanged, or grown by exactly the items this guard let through
+            if cached and count == cached['count'] + cached['pending'] and \
+                    (max_id > cached['max_id'] if cached['pending'] else max_id == cached['max_id']):
+                cached.update(count=count, max_id=max_id, pending=0)
+                self._indexes.move_to_end(key)
+                return cached['index']
+        model, column = KINDS[kind]
+        index = NearDuplicateIndex(threshold=current_app.config.get('DEDUP_THRESHOLD', 0.6))
+        for row_id, text in self._rows(kind, scope).with_entities(model.id, column):
+            index.insert(row_id, text)
+        with self.lock:
+            self._indexes[key] = {'index': index, 'count': count, 'max_id': max_id, 'pending': 0}
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.capacity:
+                self._indexes.popitem(last=False)
+        return index
+
+    def filter(self, kind: str, lecture: Lecture, items: List[Dict], text: Callable[[Dict], str]) -> List[Dict]:
+        """Items that don't near-duplicate a stored row of the scope or an earlier item"""
+        scope = self._scope(lecture)
+        if scope is None or not items:
+            return items
+        index = self.index(kind, scope)
+        kept = [item for item in items if index.add(('new', next(self._pending_ids)), text(item))]
+        with self.lock:
+            cached = self._indexes.get((kind,) + scope)
+            if cached and cached['index'] is index:
+                cached['pending'] += len(kept)
+        if len(kept) < len(items):
+            print(f"[Dedup] {kind} for lecture {lecture.id}: dropped {len(items) - len(kept)} near-duplicates")
+        return kept
+
+def dedupe_existing(kind: str, scope: str = 'lecture', threshold: float = 0.6, dry_run: bool = False) -> Dict:
+    """Remove stored near-duplicates, keeping the oldest row of each group (caller commits).
+
+    kind is 'flashcards', 'questions' (the question bank) or 'quiz_questions'.
+    Quiz questions are only removed from quizzes nobody has attempted, since
+    saved attempt feedback refers to questions by position.
+    """
+    if kind == 'quiz_questions':
+        rows = db.session.query(Question.id, Question.question_statement, Lecture.id, Lecture.subject_id, Quiz.id)\
+            .join(Quiz, Quiz.id == Question.quiz_id).join(Lecture, Lecture.id == Quiz.lecture_id)\
+            .order_by(Question.id)
+        attempted = {quiz_id for (quiz_id,) in db.session.query(Score.quiz_id).distinct()}
+    else:
+        model, column = KINDS[kind]
+        rows = db.session.query(model.id, column, Lecture.id, Lecture.subject_id, model.lecture_id)\
+            .join(Lecture, Lecture.id == model.lecture_id).order_by(model.id)
+        attempted = set()
+
+    groups = defaultdict(list)
+    for row_id, text, lecture_id, subject_id, owner_id in rows:
+        groups[subject_id if scope == 'subject' else lecture_id].append((row_id, text, owner_id))
+
+    duplicates = {}  # duplicate row id -> kept row id
+    for members in groups.values():
+        index = NearDuplicateIndex(threshold=threshold)
+        for row_id, text, owner_id in members:
+            original = index.find(text)
+            if original is not None and not (kind == 'quiz_questions' and owner_id in attempted):
+                duplicates[row_id] = original
+            else:
+                index.insert(row_id, text)
+
+    if duplicates and not dry_run:
+        ids = list(duplicates)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            if kind == 'questions':
+                # Quiz questions drawn from a removed bank entry now point at the one kept
+                for duplicate_id in chunk:
+                    Question.query.filter_by(bank_question_id=duplicate_id)\
+                        .update({'bank_question_id': duplicates[duplicate_id]}, synchronize_session=False)
+            model = Question if kind == 'quiz_questions' else KINDS[kind][0]
+            model.query.filter(model.id.in_(chunk)).delete(synchronize_session=False)
+    return {'kind': kind, 'scope': scope, 'groups': len(groups),
+            'rows': sum(len(members) for members in groups.values()), 'duplicates': len(duplicates),
+            'removed': 0 if dry_run else len(duplicates)}
+
+# Global near-duplicate guard for generated content
+near_duplicate_guard = NearDuplicateGuard()
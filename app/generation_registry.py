@@ -0,0 +1,167 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from app.progress_bus import progress_bus
+
+class GenerationRegistry:
+    """Coalesces concurrent generation requests for the same video and options.
+
+    Each job's leader, followers and events so far are kept in the progress bus's
+    shared state, so requests that land on different workers coalesce too (with the
+    default sqlite:// bus, workers on one host; with redis://, any host). With a
+    memory:// bus coalescing only happens within one process.
+    """
+
+    def __init__(self, ttl: float = 960):
+        # Claims older than this are from a leader that died without finishing
+        self.ttl = ttl
+        self.leading: Dict[int, str] = {}  # leader lecture ID -> job name, for jobs run by this process
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('GENERATION_JOB_DEADLINE', 900) + 60
+
+    @staticmethod
+    def make_key(video_id: str, options: Dict) -> Tuple:
+        """Identify a generation by video and the content it produces"""
+        return (
+            video_id,
+            bool(options.get('generate_summary')),
+            bool(options.get('generate_flashcards')),
+            bool(options.get('generate_notes')),
+            bool(options.get('generate_quiz')),
+            options.get('num_questions') if options.get('generate_quiz') else None
+        )
+
+    @staticmethod
+    def _job_name(key: Tuple) -> str:
+        return 'generation:' + hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _lecture_name(lecture_id: int) -> str:
+        return f'generation-lecture:{lecture_id}'
+
+    def _job_of(self, lecture_id: int) -> Optional[str]:
+        with self.lock:
+            name = self.leading.get(lecture_id)
+        if name is None:
+            index = progress_bus.get_state(self._lecture_name(lecture_id))
+            name = index['job'] if index else None
+        return name
+
+    def join_or_start(self, key: Tuple, lecture_id: int) -> Optional[int]:
+        """Attach lecture_id to an in-flight job, or register it as the leader.
+
+        Returns the leader's lecture ID when attached, or None when the caller
+        should start the generation itself.
+        """
+        progress_bus.open(lecture_id)
+        name = self._job_name(key)
+        now = time.time()
+
+        def claim(state):
+            if state is None or state['started'] < now - self.ttl:
+                return {'leader': lecture_id, 'followers': [], 'history': [], 'started': now}
+            state['followers'].append(lecture_id)
+            return state
+
+        state = progress_bus.update_state(name, claim, ttl=self.ttl)
+        progress_bus.update_state(self._lecture_name(lecture_id), lambda _: {'job': name}, ttl=self.ttl)
+        if state['leader'] == lecture_id:
+            with self.lock:
+                self.leading[lecture_id] = name
+            return None
+        for event in state['history']:
+            progress_bus.publish(lecture_id, event)
+        return state['leader']
+
+    def publish(self, lecture_id: int, event: Dict):
+        """Publish a progress event to a job's leader and every attached follower"""
+        with self.lock:
+            name = self.leading.get(lecture_id)
+        if name is None:
+            progress_bus.publish(lecture_id, event)
+            return
+
+        def record(state):
+            if state is not None and state['leader'] == lecture_id:
+                state['history'].append(event)
+            return state
+
+        state = progress_bus.update_state(name, record, ttl=self.ttl)
+        targets = [lecture_id] + (state['followers'] if state and state['leader'] == lecture_id else [])
+        for target in targets:
+            progress_bus.publish(target, event)
+
+    def followers(self, leader_id: int) -> List[int]:
+        """Lectures currently attached to the job led by leader_id"""
+        name = self._job_of(leader_id)
+        state = progress_bus.get_state(name) if name else None
+        return list(state['followers']) if state and state['leader'] == leader_id else []
+
+    def detach(self, lecture_id: int) -> bool:
+        """Stop delivering a job's progress and result to a follower lecture"""
+        name = self._job_of(lecture_id)
+        if name is None:
+            return False
+        detached = []
+
+        def drop(state):
+            if state is not None and lecture_id in state['followers']:
+                state['followers'].remove(lecture_id)
+                detached.append(lecture_id)
+            return state
+
+        progress_bus.update_state(name, drop, ttl=self.ttl)
+        if detached:
+            progress_bus.update_state(self._lecture_name(lecture_id), lambda _: None)
+        return bool(detached)
+
+    def promote(self, leader_id: int) -> Optional[int]:
+        """Make the first follower the job's leader, e.g. when the leader lecture is deleted.
+
+        Returns the new leader's ID, or None if no follower is left to take over.
+        """
+        name = self._job_of(leader_id)
+        if name is None:
+            return None
+        promoted = []
+
+        def handover(state):
+            if state is not None and state['leader'] == leader_id and state['followers']:
+                state['leader'] = state['followers'].pop(0)
+                promoted.append(state['leader'])
+            return state
+
+        progress_bus.update_state(name, handover, ttl=self.ttl)
+        if not promoted:
+            return None
+        with self.lock:
+            if self.leading.pop(leader_id, None) is not None:
+                self.leading[promoted[0]] = name
+        progress_bus.update_state(self._lecture_name(leader_id), lambda _: None)
+        return promoted[0]
+
+    def finish(self, leader_id: int) -> List[int]:
+        """Close a job to new joiners and return the followers still attached"""
+        with self.lock:
+            name = self.leading.pop(leader_id, None)
+        if name is None:
+            return []
+        followers = []
+
+        def close(state):
+            if state is not None and state['leader'] == leader_id:
+                followers.extend(state['followers'])
+                return None
+            return state
+
+        progress_bus.update_state(name, close, ttl=self.ttl)
+        for lecture_id in [leader_id] + followers:
+            progress_bus.update_state(self._lecture_name(lecture_id), lambda _: None)
+        return followers
+
+# Global registry of in-flight generation jobs
+generation_registry = GenerationRegistry()
@@ -1,7 +1,9 @@
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import db, login_manager
+import secrets
 from datetime import datetime
+from services.markdown_renderer import markdown_renderer
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -46,17 +48,19 @@ class Admin(UserMixin, db.Model):
 
 class Subject(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     description = db.Column(db.Text)
     lectures = db.relationship('Lecture', backref='subject', lazy=True,
                              cascade='all, delete-orphan')
 
 class Lecture(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False)
-    title = db.Column(db.String(200), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False, index=True)
+    title = db.Column(db.String(200), nullable=False, index=True)
     video_url = db.Column(db.String(500), nullable=False)  # Making video_url required since it's our content source
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Changes whenever displayed content does; part of cached page keys
+    content_version = db.Column(db.String(16), nullable=False, default=lambda: secrets.token_hex(8))
     
     # Related content
     quizzes = db.relationship('Quiz', backref='lecture', lazy=True,
@@ -69,11 +73,22 @@ class Lecture(db.Model):
                           cascade='all, delete-orphan')
     timestamps = db.relationship('LectureTimestamp', backref='lecture', lazy=True, 
                                cascade='all, delete-orphan')
+    search_document = db.relationship('LectureSearchDocument', uselist=False,
+                                      cascade='all, delete-orphan')
+    timeline = db.relationship('LectureTimeline', uselist=False, cascade='all, delete-orphan')
+    question_bank = db.relationship('BankQuestion', backref='lecture', lazy=True,
+                                    cascade='all, delete-orphan')
+    chunk_artifacts = db.relationship('LectureChunkArtifact', lazy=True, cascade='all, delete-orphan')
+
+    def touch(self):
+        """Give the lecture a new content version, so cached renderings of it are replaced"""
+        self.content_version = secrets.token_hex(8)
 
 class LectureSummary(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False, index=True)
+    content = db.Column(db.Text, nullable=False)  # Markdown source
+    content_html = db.Column(db.Text)  # Sanitized HTML, rendered when content is set
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class LectureFlashcard(db.Model):
@@ -86,9 +101,16 @@ class LectureFlashcard(db.Model):
 class LectureNote(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    content = db.Column(db.Text, nullable=False)  # Markdown source
+    content_html = db.Column(db.Text)  # Sanitized HTML, rendered when content is set
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+@db.event.listens_for(LectureSummary.content, 'set')
+@db.event.listens_for(LectureNote.content, 'set')
+def render_content_html(target, value, oldvalue, initiator):
+    """Render summaries and notes once, when written, instead of on every page view"""
+    target.content_html = markdown_renderer.render(value)
+
 class LectureTimestamp(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False)
@@ -96,35 +118,89 @@ class LectureTimestamp(db.Model):
     timestamp = db.Column(db.Integer, nullable=False)  # timestamp in seconds
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class LectureTimeline(db.Model):
+    """Transcript segment start times and text offsets (packed uint32 arrays) over one text blob"""
+    lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), primary_key=True)
+    starts = db.Column(db.LargeBinary, nullable=False)
+    offsets = db.Column(db.LargeBinary, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class LectureSearchDocument(db.Model):
+    """Plain-text copy of a lecture's searchable content; on SQLite the FTS5 index reads from it"""
+    lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), primary_key=True)
+    title = db.Column(db.String(200), nullable=False, default='')
+    transcript = db.Column(db.Text, nullable=False, default='')
+    summary = db.Column(db.Text, nullable=False, default='')
+    notes = db.Column(db.Text, nullable=False, default='')
+    flashcards = db.Column(db.Text, nullable=False, default='')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Quiz(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False)
-    date_of_quiz = db.Column(db.DateTime, nullable=False)
+    lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False, index=True)
+    date_of_quiz = db.Column(db.DateTime, nullable=False, index=True)
     time_duration = db.Column(db.Integer, nullable=False)  # in minutes
     remarks = db.Column(db.Text)
     is_ai_generated = db.Column(db.Boolean, default=False)
+    # Bumped by touch() when questions change; validator for conditional GETs
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     questions = db.relationship('Question', backref='quiz', lazy=True,
                               cascade='all, delete-orphan')
     scores = db.relationship('Score', backref='quiz', lazy=True,
                            cascade='all, delete-orphan')
 
+    def touch(self):
+        """Mark the quiz changed, e.g. after its questions were edited"""
+        self.updated_at = datetime.utcnow()
+
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False, index=True)
     question_statement = db.Column(db.Text, nullable=False)
     option1 = db.Column(db.String(200), nullable=False)
     option2 = db.Column(db.String(200), nullable=False)
     option3 = db.Column(db.String(200), nullable=False)
     option4 = db.Column(db.String(200), nullable=False)
     correct_option = db.Column(db.Integer, nullable=False)  # 1, 2, 3, or 4
+    bank_question_id = db.Column(db.Integer, db.ForeignKey('bank_question.id'))
+
+class BankQuestion(db.Model):
+    """A validated generated question, kept per lecture for assembling later quizzes"""
+    __table_args__ = (db.UniqueConstraint('lecture_id', 'content_hash', name='uq_bank_question_content'),)
+    id = db.Column(db.Integer, primary_key=True)
+    lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False, index=True)
+    content_hash = db.Column(db.String(40), nullable=False)
+    question_statement = db.Column(db.Text, nullable=False)
+    option1 = db.Column(db.String(200), nullable=False)
+    option2 = db.Column(db.String(200), nullable=False)
+    option3 = db.Column(db.String(200), nullable=False)
+    option4 = db.Column(db.String(200), nullable=False)
+    correct_option = db.Column(db.Integer, nullable=False)
+    topic = db.Column(db.Integer)  # Index of the lecture chapter the question covers
+    times_used = db.Column(db.Integer, nullable=False, default=0)
+    times_answered = db.Column(db.Integer, nullable=False, default=0)
+    times_correct = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class LectureChunkArtifact(db.Model):
+    """Output generated from one transcript chunk, reused while the chunk's text is unchanged"""
+    __table_args__ = (db.UniqueConstraint('lecture_id', 'kind', 'chunk_hash', name='uq_chunk_artifact'),)
+    id = db.Column(db.Integer, primary_key=True)
+    lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'flashcards' or 'notes'
+    chunk_hash = db.Column(db.String(40), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    content = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Score(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     total_scored = db.Column(db.Integer, nullable=False)
     total_questions = db.Column(db.Integer, nullable=False)
     time_stamp_of_attempt = db.Column(db.DateTime, nullable=False,
-                                    default=datetime.utcnow)
+                                    default=datetime.utcnow, index=True)
     time_taken = db.Column(db.Integer, nullable=False)  # time taken in minutes
     feedback = db.Column(db.Text)  # JSON string containing detailed question feedback
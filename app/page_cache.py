@@ -0,0 +1,89 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+try:
+    import redis
+except ImportError:  # optional, only needed for a shared redis:// page cache
+    redis = None
+
+class PageCache:
+    """Rendered pages and fragments in a local LRU, backed by an optional shared redis tier.
+
+    Keys include the content version of what they render, so entries are never
+    invalidated in place: a content change makes new keys, and the old entries
+    fall out of the LRU and expire from the shared tier.
+    """
+
+    def __init__(self, capacity: int = 256, ttl: int = 3600):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.client = None
+        self.lock = threading.Lock()
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self.stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    def init_app(self, app):
+        self.capacity = app.config.setdefault('PAGE_CACHE_SIZE', int(os.getenv('PAGE_CACHE_SIZE', 256)))
+        self.ttl = app.config.setdefault('PAGE_CACHE_TTL', int(os.getenv('PAGE_CACHE_TTL', 3600)))
+        url = app.config.setdefault('PAGE_CACHE_URL', os.getenv('PAGE_CACHE_URL'))
+        self.client = None
+        if url:
+            if redis is None:
+                raise RuntimeError("The 'redis' package is required for a shared page cache")
+            self.client = redis.Redis.from_url(url)
+        with self.lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, value: str):
+        with self.lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.stats['local_hits'] += 1
+                return value
+        if self.client is not None:
+            try:
+                raw = self.client.get(f'page:{key}')
+            except Exception as e:
+                print(f"[Page Cache] Shared tier unavailable: {str(e)}")
+                raw = None
+            if raw is not None:
+                value = raw.decode('utf-8')
+                self._remember(key, value)
+                with self.lock:
+                    self.stats['shared_hits'] += 1
+                return value
+        with self.lock:
+            self.stats['misses'] += 1
+        return None
+
+    def set(self, key: str, value: str):
+        self._remember(key, value)
+        if self.client is not None:
+            try:
+                self.client.setex(f'page:{key}', self.ttl, value.encode('utf-8'))
+            except Exception as e:
+                print(f"[Page Cache] Shared tier unavailable: {str(e)}")
+
+    def get_or_render(self, key: str, render: Callable[[], str]) -> str:
+        value = self.get(key)
+        if value is None:
+            value = render()
+            self.set(key, value)
+        return value
+
+    def snapshot(self) -> Dict[str, any]:
+        with self.lock:
+            return dict(self.stats, entries=len(self._entries), shared=self.client is not None)
+
+# Global cache of rendered lecture pages
+page_cache = PageCache()
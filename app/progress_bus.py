@@ -0,0 +1,312 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+try:
+    import redis
+except ImportError:  # optional, only needed for redis:// progress buses
+    redis = None
+
+class InProcessTransport:
+    """Per-job queues in this process; only works with a single worker"""
+
+    def __init__(self, retention: int = 3600):
+        self.queues: Dict[int, queue.Queue] = {}
+        self.opened_at: Dict[int, float] = {}
+        self.lock = threading.Lock()
+        self.retention = retention
+        self.states: Dict[str, tuple] = {}
+        self.state_lock = threading.Lock()
+
+    def _channel(self, job_id: int) -> queue.Queue:
+        with self.lock:
+            if job_id not in self.queues:
+                self.queues[job_id] = queue.Queue()
+                self.opened_at[job_id] = time.time()
+            return self.queues[job_id]
+
+    def open(self, job_id: int):
+        with self.lock:
+            # Drop channels nobody ever subscribed to
+            cutoff = time.time() - self.retention
+            for stale in [j for j, t in self.opened_at.items() if t < cutoff]:
+                self.queues.pop(stale, None)
+                self.opened_at.pop(stale, None)
+            self.queues[job_id] = queue.Queue()
+            self.opened_at[job_id] = time.time()
+
+    def publish(self, job_id: int, event: Dict):
+        self._channel(job_id).put(event)
+
+    def subscribe(self, job_id: int):
+        return QueueSubscription(self._channel(job_id))
+
+    def close(self, job_id: int):
+        with self.lock:
+            self.queues.pop(job_id, None)
+            self.opened_at.pop(job_id, None)
+
+    def get_state(self, name: str) -> Optional[Dict]:
+        with self.state_lock:
+            value, expires_at = self.states.get(name, (None, 0))
+            return json.loads(value) if value is not None and expires_at > time.time() else None
+
+    def update_state(self, name: str, update: Callable[[Optional[Dict]], Optional[Dict]],
+                     ttl: Optional[float] = None) -> Optional[Dict]:
+        with self.state_lock:
+            value, expires_at = self.states.get(name, (None, 0))
+            state = update(json.loads(value) if value is not None and expires_at > time.time() else None)
+            if state is None:
+                self.states.pop(name, None)
+            else:
+                self.states[name] = (json.dumps(state), time.time() + (ttl or self.retention))
+            return state
+
+class QueueSubscription:
+    def __init__(self, q: queue.Queue):
+        self.q = q
+
+    def get(self, timeout: float) -> Dict:
+        return self.q.get(timeout=timeout)
+
+    def close(self):
+        pass
+
+class SQLiteLogTransport:
+    """Append-only event log in a SQLite file shared by every worker on the host"""
+
+    def __init__(self, path: str, retention: int = 3600, poll_interval: float = 0.25):
+        self.path = path
+        self.retention = retention
+        self.poll_interval = poll_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS progress_event (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                job_id INTEGER NOT NULL,
+                                payload TEXT NOT NULL,
+                                created_at REAL NOT NULL)''')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_progress_event_job ON progress_event (job_id, id)')
+            conn.execute('''CREATE TABLE IF NOT EXISTS shared_state (
+                                name TEXT PRIMARY KEY,
+                                value TEXT NOT NULL,
+                                expires_at REAL NOT NULL)''')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def open(self, job_id: int):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM progress_event WHERE job_id = ? OR created_at < ?',
+                         (job_id, time.time() - self.retention))
+            conn.execute('DELETE FROM shared_state WHERE expires_at < ?', (time.time(),))
+
+    def publish(self, job_id: int, event: Dict):
+        with self._connect() as conn:
+            conn.execute('INSERT INTO progress_event (job_id, payload, created_at) VALUES (?, ?, ?)',
+                         (job_id, json.dumps(event), time.time()))
+
+    def subscribe(self, job_id: int):
+        return SQLiteLogSubscription(self, job_id)
+
+    def close(self, job_id: int):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM progress_event WHERE job_id = ?', (job_id,))
+
+    def get_state(self, name: str) -> Optional[Dict]:
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT value FROM shared_state WHERE name = ? AND expires_at > ?',
+                               (name, time.time())).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def update_state(self, name: str, update: Callable[[Optional[Dict]], Optional[Dict]],
+                     ttl: Optional[float] = None) -> Optional[Dict]:
+        # BEGIN IMMEDIATE takes the write lock up front, so read-modify-write is atomic across workers
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT value FROM shared_state WHERE name = ? AND expires_at > ?',
+                               (name, time.time())).fetchone()
+            state = update(json.loads(row[0]) if row else None)
+            if state is None:
+                conn.execute('DELETE FROM shared_state WHERE name = ?', (name,))
+            else:
+                conn.execute('INSERT OR REPLACE INTO shared_state (name, value, expires_at) VALUES (?, ?, ?)',
+                             (name, json.dumps(state), time.time() + (ttl or self.retention)))
+            conn.execute('COMMIT')
+            return state
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+class SQLiteLogSubscription:
+    def __init__(self, transport: SQLiteLogTransport, job_id: int):
+        self.transport = transport
+        self.job_id = job_id
+        self.last_id = 0  # replay the job's log from the start so late subscribers catch up
+        self.pending = []
+        self.conn = transport._connect()
+
+    def get(self, timeout: float) -> Dict:
+        deadline = time.monotonic() + timeout
+        while not self.pending:
+            rows = self.conn.execute(
+                'SELECT id, payload FROM progress_event WHERE job_id = ? AND id > ? ORDER BY id',
+                (self.job_id, self.last_id)).fetchall()
+            if rows:
+                self.last_id = rows[-1][0]
+                self.pending.extend(json.loads(payload) for _, payload in rows)
+                break
+            if time.monotonic() >= deadline:
+                raise queue.Empty
+            time.sleep(min(self.transport.poll_interval, max(deadline - time.monotonic(), 0)))
+        return self.pending.pop(0)
+
+    def close(self):
+        self.conn.close()
+
+class RedisTransport:
+    """Redis pub/sub plus a per-job backlog list, so subscribers can join late"""
+
+    def __init__(self, url: str, retention: int = 3600):
+        if redis is None:
+            raise RuntimeError("The 'redis' package is required for redis:// progress buses")
+        self.client = redis.Redis.from_url(url)
+        self.retention = retention
+
+    def _keys(self, job_id: int):
+        base = f'progress:{job_id}'
+        return base, f'{base}:log', f'{base}:seq'
+
+    def open(self, job_id: int):
+        self.client.delete(*self._keys(job_id)[1:])
+
+    def publish(self, job_id: int, event: Dict):
+        channel, log_key, seq_key = self._keys(job_id)
+        seq = self.client.incr(seq_key)
+        message = json.dumps({'seq': seq, 'event': event})
+        pipe = self.client.pipeline()
+        pipe.rpush(log_key, message)
+        pipe.expire(log_key, self.retention)
+        pipe.expire(seq_key, self.retention)
+        pipe.publish(channel, message)
+        pipe.execute()
+
+    def subscribe(self, job_id: int):
+        return RedisSubscription(self, job_id)
+
+    def close(self, job_id: int):
+        self.client.delete(*self._keys(job_id)[1:])
+
+    def get_state(self, name: str) -> Optional[Dict]:
+        raw = self.client.get(f'state:{name}')
+        return json.loads(raw) if raw is not None else None
+
+    def update_state(self, name: str, update: Callable[[Optional[Dict]], Optional[Dict]],
+                     ttl: Optional[float] = None) -> Optional[Dict]:
+        with self.client.lock(f'state-lock:{name}', timeout=10, blocking_timeout=10):
+            raw = self.client.get(f'state:{name}')
+            state = update(json.loads(raw) if raw is not None else None)
+            if state is None:
+                self.client.delete(f'state:{name}')
+            else:
+                self.client.set(f'state:{name}', json.dumps(state), px=max(int((ttl or self.retention) * 1000), 1))
+            return state
+
+class RedisSubscription:
+    def __init__(self, transport: RedisTransport, job_id: int):
+        channel, log_key, _ = transport._keys(job_id)
+        # Subscribe before reading the backlog so nothing published in between is lost
+        self.pubsub = transport.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+        self.last_seq = 0
+        self.pending = []
+        for raw in transport.client.lrange(log_key, 0, -1):
+            self._accept(raw)
+
+    def _accept(self, raw):
+        message = json.loads(raw)
+        if message['seq'] > self.last_seq:
+            self.last_seq = message['seq']
+            self.pending.append(message['event'])
+
+    def get(self, timeout: float) -> Dict:
+        deadline = time.monotonic() + timeout
+        while not self.pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise queue.Empty
+            message = self.pubsub.get_message(timeout=remaining)
+            if message and message.get('type') == 'message':
+                self._accept(message['data'])
+        return self.pending.pop(0)
+
+    def close(self):
+        self.pubsub.close()
+
+def create_transport(url: str, retention: int = 3600):
+    """Build a transport from a PROGRESS_BUS_URL (memory://, sqlite:///path or redis://...)"""
+    parsed = urlparse(url)
+    if parsed.scheme in ('', 'memory'):
+        return InProcessTransport(retention=retention)
+    if parsed.scheme == 'sqlite':
+        return SQLiteLogTransport(url[len('sqlite:///'):], retention=retention)
+    if parsed.scheme in ('redis', 'rediss', 'unix'):
+        return RedisTransport(url, retention=retention)
+    raise ValueError(f"Unsupported progress bus URL: {url}")
+
+class ProgressBus:
+    """Delivers generation progress events from the worker thread to SSE subscribers"""
+
+    def __init__(self):
+        self.transport = InProcessTransport()
+
+    def init_app(self, app):
+        default_url = 'sqlite:///' + os.path.join(app.instance_path, 'progress_bus.db')
+        url = app.config.setdefault('PROGRESS_BUS_URL', os.getenv('PROGRESS_BUS_URL', default_url))
+        retention = app.config.setdefault('PROGRESS_BUS_RETENTION', 3600)
+        self.transport = create_transport(url, retention=retention)
+
+    def open(self, job_id: int):
+        """Start a fresh channel for a new job"""
+        self.transport.open(job_id)
+
+    def publish(self, job_id: int, event: Dict):
+        self.transport.publish(job_id, event)
+
+    def subscribe(self, job_id: int):
+        """Return a subscription whose get(timeout) raises queue.Empty like queue.Queue"""
+        return self.transport.subscribe(job_id)
+
+    def close(self, job_id: int):
+        """Release a job's channel once its subscriber is done"""
+        self.transport.close(job_id)
+
+    def get_state(self, name: str) -> Optional[Dict]:
+        """A small JSON document shared by every worker, or None if unset or expired"""
+        return self.transport.get_state(name)
+
+    def update_state(self, name: str, update: Callable[[Optional[Dict]], Optional[Dict]],
+                     ttl: Optional[float] = None) -> Optional[Dict]:
+        """Atomically replace a shared document with update(current); None deletes it.
+
+        update must not touch the bus itself, since the transport may hold a lock while it runs.
+        """
+        return self.transport.update_state(name, update, ttl)
+
+# Global progress bus instance
+progress_bus = ProgressBus()
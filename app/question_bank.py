@@ -0,0 +1,188 @@
+import hashlib
+import heapq
+import random
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from app import db
+from app.dedup import near_duplicate_guard
+from app.models import BankQuestion, Lecture, LectureTimestamp, Question, Quiz, Score
+from services.chapterizer import tokenize
+from services.item_pool import normalize_key
+
+def content_hash(question: Dict) -> str:
+    """Stable hash of a question's wording and options, insensitive to case and punctuation"""
+    parts = [normalize_key(question['question_statement'])] + sorted(normalize_key(o) for o in question['options'])
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+def difficulty(question: BankQuestion, min_answers: int = 5) -> str:
+    """'easy', 'medium' or 'hard' from students' answers; 'unrated' until min_answers"""
+    if question.times_answered < min_answers:
+        return 'unrated'
+    rate = question.times_correct / question.times_answered
+    return 'easy' if rate >= 0.8 else 'hard' if rate < 0.5 else 'medium'
+
+class QuestionBank:
+    """Every validated question generated for a lecture, reused to assemble new quizzes.
+
+    Quizzes are drawn locally: questions a student has already answered in one
+    of the lecture's quizzes are left out and unused ones come first, so a
+    student working through a lecture's quizzes does not see repeats, and picks
+    rotate across strata of chapter and difficulty for even coverage. The model
+    is only asked for more questions when too few unused ones remain.
+    """
+
+    def size(self, lecture_id: int) -> int:
+        return BankQuestion.query.filter_by(lecture_id=lecture_id).count()
+
+    def fresh_count(self, lecture_id: int) -> int:
+        return BankQuestion.query.filter_by(lecture_id=lecture_id, times_used=0).count()
+
+    def answered(self, lecture_id: int, user_id: Optional[int] = None) -> set:
+        """Content hashes of banked questions answered in the lecture's quizzes, by user_id or by any student"""
+        query = db.session.query(BankQuestion.content_hash)\
+            .join(Question, Question.bank_question_id == BankQuestion.id)\
+            .join(Quiz, Quiz.id == Question.quiz_id)\
+            .join(Score, Score.quiz_id == Quiz.id)\
+            .filter(Quiz.lecture_id == lecture_id)
+        if user_id is not None:
+            query = query.filter(Score.user_id == user_id)
+        return {row.content_hash for row in query.distinct()}
+
+    def available(self, lecture_id: int, user_id: Optional[int] = None) -> int:
+        """How many banked questions are still unanswered (see answered)"""
+        answered = self.answered(lecture_id, user_id)
+        return sum(1 for row in db.session.query(BankQuestion.content_hash).filter_by(lecture_id=lecture_id)
+                   if row.content_hash not in answered)
+
+    def _topic(self, question: Dict, chapters: List[set]) -> Optional[int]:
+        words = set(tokenize(question['question_statement'] + ' ' +
+                             question['options'][question['correct_option'] - 1]))
+        overlaps = [len(words & chapter) for chapter in chapters]
+        if not overlaps or not max(overlaps):
+            return None
+        return overlaps.index(max(overlaps))
+
+    def add(self, lecture_id: int, questions: List[Dict]) -> int:
+        """Store validated questions, skipping ones already banked or paraphrasing one; returns how many were new (caller commits)"""
+        questions = near_duplicate_guard.filter('questions', db.session.get(Lecture, lecture_id), questions,
+                                                lambda question: question['question_statement'])
+        chapters = [set(tokenize(ts.title)) for ts in
+                    LectureTimestamp.query.filter_by(lecture_id=lecture_id).order_by(LectureTimestamp.timestamp)]
+        known = {row.content_hash for row in
+                 db.session.query(BankQuestion.content_hash).filter_by(lecture_id=lecture_id)}
+        added = 0
+        for question in questions:
+            key = content_hash(question)
+            if key in known:
+                continue
+            known.add(key)
+            db.session.add(BankQuestion(
+                lecture_id=lecture_id,
+                content_hash=key,
+                question_statement=question['question_statement'],
+                option1=question['options'][0],
+                option2=question['options'][1],
+                option3=question['options'][2],
+                option4=question['options'][3],
+                correct_option=question['correct_option'],
+                topic=self._topic(question, chapters)
+            ))
+            added += 1
+        return added
+
+    def assemble(self, lecture_id: int, count: int, rng: Optional[random.Random] = None,
+                 user_id: Optional[int] = None) -> Optional[List[BankQuestion]]:
+        """Pick count unanswered questions, least used first and spread across strata; None if too few remain.
+
+        Answered means by user_id, or by any student when None, since a lecture
+        quiz is shared by every student.
+        """
+        answered = self.answered(lecture_id, user_id)
+        bank = [question for question in BankQuestion.query.filter_by(lecture_id=lecture_id).all()
+                if question.content_hash not in answered]
+        if len(bank) < count:
+            return None
+        rng = rng or random.Random()
+        strata = defaultdict(list)
+        for question in bank:
+            strata[(question.topic, difficulty(question))].append(question)
+        for members in strata.values():
+            rng.shuffle(members)
+            members.sort(key=lambda q: q.times_used, reverse=True)  # Pop from the end: least used first
+
+        # Next pick: lowest use count, then the stratum drawn from least, then random
+        heap = [(members[-1].times_used, 0, rng.random(), key) for key, members in strata.items()]
+        heapq.heapify(heap)
+        picked = []
+        while len(picked) < count:
+            _, drawn, _, key = heapq.heappop(heap)
+            members = strata[key]
+            picked.append(members.pop())
+            if members:
+                heapq.heappush(heap, (members[-1].times_used, drawn + 1, rng.random(), key))
+        return picked
+
+    def questions_for_quiz(self, lecture_id: int, count: int, generate: Callable[[], Dict],
+                           user_id: Optional[int] = None) -> Dict:
+        """Questions for a new quiz in QuizService.generate_quiz's result format.
+
+        generate is only called when fewer than count unused questions are banked;
+        its questions are banked first. If it fails, a bank with enough (used but
+        unanswered) questions still yields a quiz; if it comes up short, the quiz
+        is cut to what the bank can offer. Each question carries bank_question_id.
+        """
+        generated = False
+        if self.fresh_count(lecture_id) < count:
+            result = generate()
+            if result.get('success'):
+                added = self.add(lecture_id, result['questions'])
+                generated = True
+                print(f"[Question Bank] Lecture {lecture_id}: banked {added} new questions")
+                if result.get('short'):
+                    db.session.flush()
+                    count = min(count, self.available(lecture_id, user_id))
+            elif self.available(lecture_id, user_id) < count:
+                return result
+            else:
+                print(f"[Question Bank] Lecture {lecture_id}: generation failed, reusing banked questions")
+        db.session.flush()
+        picked = self.assemble(lecture_id, count, user_id=user_id)
+        if picked is None:
+            return {'success': False, 'error': f'Question bank has fewer than {count} questions'}
+        for question in picked:
+            question.times_used += 1
+        return {
+            'success': True,
+            'generated': generated,
+            'questions': [{
+                'question_statement': q.question_statement,
+                'options': [q.option1, q.option2, q.option3, q.option4],
+                'correct_option': q.correct_option,
+                'bank_question_id': q.id
+            } for q in picked]
+        }
+
+    def copy(self, source_lecture_id: int, target_lecture_id: int):
+        """Share a lecture's bank, use counts included, with another lecture of the same video (caller commits)"""
+        known = {row.content_hash for row in
+                 db.session.query(BankQuestion.content_hash).filter_by(lecture_id=target_lecture_id)}
+        for q in BankQuestion.query.filter_by(lecture_id=source_lecture_id).all():
+            if q.content_hash not in known:
+                db.session.add(BankQuestion(
+                    lecture_id=target_lecture_id, content_hash=q.content_hash,
+                    question_statement=q.question_statement, option1=q.option1, option2=q.option2,
+                    option3=q.option3, option4=q.option4, correct_option=q.correct_option,
+                    topic=q.topic, times_used=q.times_used
+                ))
+
+    def record_answers(self, questions: List[Question], feedback: List[Dict]):
+        """Update banked questions' answer counts from a graded attempt (caller commits)"""
+        for question, result in zip(questions, feedback):
+            if question.bank_question_id:
+                BankQuestion.query.filter_by(id=question.bank_question_id).update({
+                    'times_answered': BankQuestion.times_answered + 1,
+                    'times_correct': BankQuestion.times_correct + int(result['is_correct'])
+                }, synchronize_session=False)
+
+# Global question bank
+question_bank = QuestionBank()
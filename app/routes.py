@@ -2,11 +2,20 @@ from flask import render_template, request, redirect, url_for, flash, jsonify, a
 from flask_login import login_user, login_required, logout_user, current_user
 from app import db, login_manager
 from app.models import (User, Admin, Subject, Quiz, Question, Score,
-                     Lecture, LectureSummary, LectureFlashcard, LectureNote, LectureTimestamp)
+                     Lecture, LectureSummary, LectureFlashcard, LectureNote, LectureTimestamp,
+                        LectureTimeline)
 from services.ai_service import LectureAIService
 from services.video_service import VideoService
 from services.quiz_service import QuizService
 from services.flashcard_service import FlashcardService
+from services.cancellation import CancellationToken, GenerationCancelled
+from services.structured_output import parse_stats
+from services.model_router import model_router
+from services.hedging import hedge_policy
+from services.circuit_breaker import CircuitBreaker, circuit_breakers
+from services.transcript_reducer import reduction_stats
+from services.chapterizer import chapterize
+from services.markdown_renderer import markdown_renderer
 from datetime import datetime, timedelta
 import json
 import queue
@@ -15,35 +24,35 @@ from functools import wraps
 from flask import current_app as app
 import re
 from app.thread_monitor import thread_monitor
-
-# Global queue for progress updates with thread safety
-progress_queues = {}
-progress_lock = threading.Lock()
+from app.progress_bus import progress_bus
+from app.generation_registry import generation_registry
+from app.bulk_ingest import BulkIngestJob, clamp_concurrency, collect_items, bulk_jobs, parse_num_questions
+from app.search_index import search_index
+from app.timeline_store import timeline_store
+from app.question_bank import question_bank
+from app.dedup import near_duplicate_guard
+from app.chunk_artifacts import chunk_artifacts
+from app.page_cache import page_cache
+from app.conditional import conditional_page
+from app import admin_tables
 
 def send_progress_update(lecture_id: int, component: str, progress: int):
-    """Thread-safe progress update for AI content generation"""
-    with progress_lock:
-        if lecture_id in progress_queues:
-            try:
-                progress_queues[lecture_id].put({
-                    'component': component,
-                    'progress': progress
-                })
-            except Exception as e:
-                print(f"Error sending progress update: {str(e)}")
-
-def get_progress_queue(lecture_id: int) -> queue.Queue:
-    """Thread-safe progress queue getter"""
-    with progress_lock:
-        if lecture_id not in progress_queues:
-            progress_queues[lecture_id] = queue.Queue()
-        return progress_queues[lecture_id]
+    """Publish a progress update for AI content generation to every worker"""
+    try:
+        # Fans out to lectures coalesced onto this job, if any
+        generation_registry.publish(lecture_id, {
+            'component': component,
+            'progress': progress
+        })
+    except Exception as e:
+        print(f"Error sending progress update: {str(e)}")
 
 def cleanup_progress_queue(lecture_id: int):
-    """Thread-safe progress queue cleanup"""
-    with progress_lock:
-        if lecture_id in progress_queues:
-            del progress_queues[lecture_id]
+    """Release the progress channel once its subscriber is done"""
+    try:
+        progress_bus.close(lecture_id)
+    except Exception as e:
+        print(f"Error cleaning up progress channel: {str(e)}")
 
 @app.route('/lecture/<int:lecture_id>/generation-progress')
 def generation_progress(lecture_id):
@@ -51,9 +60,10 @@ def generation_progress(lecture_id):
     def generate():
         keepalive_count = 0
         max_keepalive = 60  # Maximum number of keepalive messages before timing out
+        subscription = None
         
         try:
-            q = get_progress_queue(lecture_id)
+            q = subscription = progress_bus.subscribe(lecture_id)
             
             while True:
                 try:
@@ -121,6 +131,8 @@ def generation_progress(lecture_id):
             
         finally:
             # Always clean up
+            if subscription is not None:
+                subscription.close()
             cleanup_progress_queue(lecture_id)
             
             # If thread died unexpectedly, try to clean up the lecture
@@ -147,39 +159,67 @@ def generation_progress(lecture_id):
                        'X-Accel-Buffering': 'no'  # Disable proxy buffering
                    })
 
-def generate_ai_content(app, lecture, options):
-    """Generate AI content with progress updates and thread monitoring"""
+def generate_ai_content(app, lecture, options, cancel_token=None, transcript_data=None):
+    """Generate AI content with progress updates and thread monitoring.
+
+    Returns True once content is committed, False if the job was cancelled.
+    transcript_data may be supplied by callers that already fetched it.
+    """
+    if cancel_token is None:
+        cancel_token = CancellationToken(app.config.get('GENERATION_JOB_DEADLINE'))
+    job_id = lecture.id  # the thread monitor tracks the job by its original leader
+    followers = []
+    draft_summary = None
     try:
         with app.app_context():
             ai_service = LectureAIService()
             video_service = VideoService()
             quiz_service = QuizService(ai_service)
             flashcard_service = FlashcardService()
+            # Stream quiz/flashcard responses for per-item progress and early stop
+            stream = app.config.get('LLM_STREAMING', True)
             
             def safe_progress_update(lecture_id, component, progress):
                 """Send progress update and notify thread monitor"""
-                if lecture_id in progress_queues:
-                    try:
-                        progress_queues[lecture_id].put({
-                            'component': component,
-                            'progress': progress
-                        })
-                        # Update thread monitor
-                        thread_monitor.update_progress(lecture_id)
-                    except Exception as e:
-                        print(f"Error sending progress update: {str(e)}")
+                send_progress_update(lecture_id, component, progress)
+                # Update thread monitor
+                thread_monitor.update_progress(lecture_id)
 
             try:
                 # Get transcript and send initial progress
                 safe_progress_update(lecture.id, 'transcript', 0)
-                transcript_data = video_service.get_transcript(lecture.video_url)
+                if transcript_data is None:
+                    transcript_data = video_service.get_transcript(lecture.video_url, cancel_token=cancel_token)
                 transcript_text = transcript_data['full_text']
                 safe_progress_update(lecture.id, 'transcript', 100)
+
+                # Chapters come from the timed transcript locally, no model call needed
+                LectureTimestamp.query.filter_by(lecture_id=lecture.id).delete()
+                for chapter in chapterize(transcript_data['timestamps']):
+                    db.session.add(LectureTimestamp(lecture_id=lecture.id, title=chapter['title'],
+                                                    timestamp=chapter['start']))
+                timeline_store.save(lecture.id, transcript_data['timestamps'])
+
+                # Optionally send the transcript once for every artifact; sections that
+                # fail validation fall back to (or are topped up by) their own calls
+                pack = {}
+                pack_sections = [section for section in ('summary', 'notes', 'flashcards', 'quiz')
+                                 if options.get(f'generate_{section}')]
+                if app.config.get('LLM_COMBINED_GENERATION') and len(pack_sections) > 1:
+                    cancel_token.raise_if_cancelled()
+                    pack = ai_service.generate_lecture_pack(
+                        transcript_text, pack_sections, num_questions=options.get('num_questions', 10),
+                        cancel_token=cancel_token, card_filter=flashcard_service.valid_cards)
                 
                 # Generate each type of content based on options
                 if options.get('generate_summary'):
+                    cancel_token.raise_if_cancelled()
                     safe_progress_update(lecture.id, 'summary', 0)
-                    summary_content = ai_service.generate_summary(transcript_text)
+                    if pack.get('summary'):
+                        summary_content = pack['summary']
+                    else:
+                        summary_content, draft_summary = generate_summary_content(ai_service, transcript_text,
+                                                                                  cancel_token)
                     if summary_content:
                         summary = LectureSummary(lecture_id=lecture.id, content=summary_content)
                         db.session.add(summary)
@@ -188,27 +228,32 @@ def generate_ai_content(app, lecture, options):
                         raise ValueError('Summary generation failed')
                 
                 if options.get('generate_flashcards'):
+                    cancel_token.raise_if_cancelled()
                     safe_progress_update(lecture.id, 'flashcards', 0)
-                    flashcard_result = flashcard_service.generate_flashcards(transcript_text)
+                    flashcard_result = flashcard_service.generate_flashcards(
+                        transcript_text, cancel_token=cancel_token, stream=stream,
+                        on_progress=lambda done, total: safe_progress_update(
+                            lecture.id, 'flashcards', int(done / total * 90)),
+                        seed=pack.get('flashcards'))
                     if not flashcard_result.get('success'):
                         raise ValueError(f"Flashcard generation failed: {flashcard_result.get('error', 'Unknown error')}")
                     
-                    flashcards = flashcard_result['flashcards']
-                    total_cards = len(flashcards)
-                    for i, card in enumerate(flashcards, 1):
+                    cards = near_duplicate_guard.filter('flashcards', lecture, flashcard_result['flashcards'],
+                                                        lambda card: card['front'])
+                    for card in cards:
                         flashcard = LectureFlashcard(
                             lecture_id=lecture.id,
                             front=card['front'],
                             back=card['back']
                         )
                         db.session.add(flashcard)
-                        if i % 2 == 0:
-                            safe_progress_update(lecture.id, 'flashcards', int((i/total_cards) * 100))
                     safe_progress_update(lecture.id, 'flashcards', 100)
                 
                 if options.get('generate_notes'):
+                    cancel_token.raise_if_cancelled()
                     safe_progress_update(lecture.id, 'notes', 0)
-                    notes_content = ai_service.generate_notes(transcript_text)
+                    notes_content = pack.get('notes') or ai_service.generate_notes(
+                        transcript_text, cancel_token=cancel_token)
                     if notes_content:
                         notes = LectureNote(lecture_id=lecture.id, content=notes_content)
                         db.session.add(notes)
@@ -217,55 +262,230 @@ def generate_ai_content(app, lecture, options):
                         raise ValueError('Notes generation failed')
 
                 if options.get('generate_quiz'):
+                    cancel_token.raise_if_cancelled()
                     safe_progress_update(lecture.id, 'quiz', 0)
                     num_questions = options.get('num_questions', 10)
                     if 5 <= num_questions <= 50:
-                        quiz_result = quiz_service.generate_quiz(transcript_text, num_questions)
-                        
+                        def generate_quiz():
+                            return quiz_service.generate_quiz(
+                                transcript_text, num_questions, cancel_token=cancel_token, stream=stream,
+                                on_progress=lambda done, total: safe_progress_update(
+                                    lecture.id, 'quiz', int(done / total * 90)),
+                                seed=pack.get('quiz'))
+
+                        quiz_result = questions_for_quiz(lecture.id, num_questions, generate_quiz)
                         if not quiz_result.get('success'):
                             raise ValueError(f"Quiz generation failed: {quiz_result.get('error', 'Unknown error')}")
-                        
-                        questions = quiz_result['questions']
-                        quiz = Quiz(
-                            lecture_id=lecture.id,
-                            date_of_quiz=datetime.now() + timedelta(days=1),
-                            time_duration=30,
-                            remarks=f'AI-generated quiz from lecture: {lecture.title}',
-                            is_ai_generated=True
-                        )
-                        db.session.add(quiz)
-                        db.session.flush()
-                        
-                        total_questions = len(questions)
-                        for i, q in enumerate(questions, 1):
-                            question = Question(
-                                quiz_id=quiz.id,
-                                question_statement=q['question_statement'],
-                                option1=q['options'][0],
-                                option2=q['options'][1],
-                                option3=q['options'][2],
-                                option4=q['options'][3],
-                                correct_option=q['correct_option']
-                            )
-                            db.session.add(question)
-                            safe_progress_update(lecture.id, 'quiz', int((i/total_questions) * 100))
+                        add_quiz(lecture, quiz_result['questions'], f'AI-generated quiz from lecture: {lecture.title}')
                         safe_progress_update(lecture.id, 'quiz', 100)
                     else:
                         raise ValueError('Invalid number of questions')
                 
+                # Last checkpoint: don't attach content to a lecture deleted mid-generation
+                cancel_token.raise_if_cancelled()
+                if not db.session.query(Lecture.id).filter_by(id=lecture.id).first():
+                    # Deleted leader: hand the result to a coalesced lecture instead of dropping it
+                    lecture = promote_follower(lecture.id)
+                lecture.touch()
+                search_index.index_lecture(lecture, transcript=transcript_text)
+                db.session.commit()
+                
+                # Hand the result to lectures that coalesced onto this job
+                followers = generation_registry.finish(lecture.id)
+                for follower_id in followers:
+                    follower = db.session.get(Lecture, follower_id)
+                    if follower:
+                        copy_generated_content(lecture.id, follower, options)
                 db.session.commit()
-                safe_progress_update(lecture.id, 'complete', 100)
+                for target_id in [lecture.id] + followers:
+                    safe_progress_update(target_id, 'complete', 100)
+                if draft_summary:
+                    start_summary_refinement([lecture.id] + followers, transcript_text, draft_summary)
+                return True
             
+            except GenerationCancelled as e:
+                db.session.rollback()
+                error_msg = f"Content generation cancelled: {str(e)}"
+                print(error_msg)
+                for target_id in [lecture.id] + followers:
+                    safe_progress_update(target_id, 'error', error_msg)
+                return False
             except Exception as e:
                 db.session.rollback()
                 error_msg = str(e)
                 print(f"Error in content generation: {error_msg}")
-                safe_progress_update(lecture.id, 'error', error_msg)
+                for target_id in [lecture.id] + followers:
+                    safe_progress_update(target_id, 'error', error_msg)
                 raise
     finally:
-        # Clean up
-        cleanup_progress_queue(lecture.id)
-        thread_monitor.unregister_thread(lecture.id)
+        # Clean up; the progress channel is released by its subscriber, which may
+        # live in another worker and still have events to read
+        generation_registry.finish(lecture.id)
+        thread_monitor.unregister_thread(job_id)
+
+def promote_follower(leader_id):
+    """Move a deleted leader's uncommitted content to the follower that takes over its job.
+
+    Raises GenerationCancelled when no follower is left to receive it.
+    """
+    new_leader_id = generation_registry.promote(leader_id)
+    lecture = db.session.get(Lecture, new_leader_id) if new_leader_id else None
+    if lecture is None:
+        raise GenerationCancelled('Lecture was deleted during generation')
+    # Everything written for the leader so far belongs to this job's transaction
+    for obj in list(db.session.new) + list(db.session.identity_map.values()):
+        if not isinstance(obj, Lecture) and getattr(obj, 'lecture_id', None) == leader_id:
+            obj.lecture_id = new_leader_id
+    print(f"Lecture {leader_id} was deleted during generation; lecture {new_leader_id} takes over its job")
+    return lecture
+
+def refine_summary(app, lecture_ids, transcript_text, draft):
+    """Replace a lecture's extractive draft summary with the model's version.
+
+    Summaries edited since the draft was saved are left alone, as is the draft
+    itself if the model call fails.
+    """
+    with app.app_context():
+        cancel_token = CancellationToken(app.config.get('GENERATION_JOB_DEADLINE'))
+        try:
+            refined = LectureAIService().generate_model_summary(transcript_text, cancel_token=cancel_token)
+        except Exception as e:
+            refined = None
+            print(f"Error refining summary: {str(e)}")
+        if not refined:
+            print(f"Keeping extractive summary for lectures {lecture_ids}")
+            return False
+        updated = LectureSummary.query.filter(LectureSummary.lecture_id.in_(lecture_ids),
+                                              LectureSummary.content == draft)\
+            .update({'content': refined, 'content_html': markdown_renderer.render(refined)},
+                    synchronize_session=False)
+        for lecture in Lecture.query.filter(Lecture.id.in_(lecture_ids)):
+            lecture.touch()
+            search_index.index_lecture(lecture)
+        db.session.commit()
+        print(f"Refined {updated} summaries for lectures {lecture_ids}")
+        return True
+
+def generate_summary_content(ai_service, transcript_text, cancel_token=None):
+    """Summary per SUMMARY_MODE, and the extractive draft to refine afterwards ('fast' mode) or None"""
+    summary_mode = app.config.get('SUMMARY_MODE', 'llm')
+    if summary_mode in ('extractive', 'fast'):
+        summary_content = ai_service.generate_extractive_summary(transcript_text)
+        return summary_content, summary_content if summary_mode == 'fast' else None
+    return ai_service.generate_summary(transcript_text, cancel_token=cancel_token), None
+
+def start_summary_refinement(lecture_ids, transcript_text, draft):
+    """Replace a fast-mode draft summary with the model's version in the background"""
+    threading.Thread(
+        target=refine_summary,
+        args=(app._get_current_object(), lecture_ids, transcript_text, draft),
+        name=f'Summary_Refine_{lecture_ids[0]}',
+        daemon=True
+    ).start()
+
+def questions_for_quiz(lecture_id, num_questions, generate):
+    """Quiz questions from the lecture's question bank, which only calls generate when it runs low"""
+    if app.config.get('QUESTION_BANK'):
+        return question_bank.questions_for_quiz(lecture_id, num_questions, generate)
+    return generate()
+
+def add_quiz(lecture, questions, remarks):
+    """Store an AI-generated quiz scheduled for tomorrow (caller commits)"""
+    quiz = Quiz(
+        lecture_id=lecture.id,
+        date_of_quiz=datetime.now() + timedelta(days=1),
+        time_duration=30,
+        remarks=remarks,
+        is_ai_generated=True
+    )
+    db.session.add(quiz)
+    db.session.flush()
+    for q in questions:
+        db.session.add(Question(
+            quiz_id=quiz.id,
+            question_statement=q['question_statement'],
+            option1=q['options'][0],
+            option2=q['options'][1],
+            option3=q['options'][2],
+            option4=q['options'][3],
+            correct_option=q['correct_option'],
+            bank_question_id=q.get('bank_question_id')
+        ))
+    return quiz
+
+def copy_generated_content(source_lecture_id, target_lecture, options):
+    """Clone generated content onto another lecture of the same video (caller commits)"""
+    if options.get('generate_summary'):
+        summary = LectureSummary.query.filter_by(lecture_id=source_lecture_id).first()
+        if summary:
+            db.session.add(LectureSummary(lecture_id=target_lecture.id, content=summary.content))
+    
+    if options.get('generate_flashcards'):
+        for card in LectureFlashcard.query.filter_by(lecture_id=source_lecture_id).all():
+            db.session.add(LectureFlashcard(lecture_id=target_lecture.id, front=card.front, back=card.back))
+    
+    if options.get('generate_notes'):
+        for note in LectureNote.query.filter_by(lecture_id=source_lecture_id).all():
+            db.session.add(LectureNote(lecture_id=target_lecture.id, content=note.content))
+    
+    for ts in LectureTimestamp.query.filter_by(lecture_id=source_lecture_id).all():
+        db.session.add(LectureTimestamp(lecture_id=target_lecture.id, title=ts.title, timestamp=ts.timestamp))
+    
+    if options.get('generate_quiz'):
+        source_quiz = Quiz.query.filter_by(lecture_id=source_lecture_id, is_ai_generated=True)\
+                                .order_by(Quiz.id.desc()).first()
+        if source_quiz:
+            quiz = Quiz(
+                lecture_id=target_lecture.id,
+                date_of_quiz=datetime.now() + timedelta(days=1),
+                time_duration=source_quiz.time_duration,
+                remarks=f'AI-generated quiz from lecture: {target_lecture.title}',
+                is_ai_generated=True
+            )
+            db.session.add(quiz)
+            db.session.flush()
+            for q in source_quiz.questions:
+                db.session.add(Question(
+                    quiz_id=quiz.id,
+                    question_statement=q.question_statement,
+                    option1=q.option1,
+                    option2=q.option2,
+                    option3=q.option3,
+                    option4=q.option4,
+                    correct_option=q.correct_option,
+                    bank_question_id=q.bank_question_id
+                ))
+
+    target_lecture.touch()
+    search_index.index_lecture(target_lecture, transcript=search_index.transcript(source_lecture_id))
+    timeline_store.copy(source_lecture_id, target_lecture.id)
+    question_bank.copy(source_lecture_id, target_lecture.id)
+    chunk_artifacts.copy(source_lecture_id, target_lecture.id)
+
+def find_reusable_lecture(video_id, options, exclude_id=None):
+    """Find an existing lecture for the same video whose generated content covers options"""
+    if not video_id:
+        return None
+    
+    video_service = VideoService()
+    candidates = Lecture.query.filter(Lecture.video_url.contains(video_id))\
+                              .order_by(Lecture.created_at.desc()).all()
+    for candidate in candidates:
+        if candidate.id == exclude_id or video_service._extract_video_id(candidate.video_url) != video_id:
+            continue
+        if options.get('generate_summary') and not LectureSummary.query.filter_by(lecture_id=candidate.id).first():
+            continue
+        if options.get('generate_flashcards') and not LectureFlashcard.query.filter_by(lecture_id=candidate.id).first():
+            continue
+        if options.get('generate_notes') and not LectureNote.query.filter_by(lecture_id=candidate.id).first():
+            continue
+        if options.get('generate_quiz'):
+            quiz = Quiz.query.filter_by(lecture_id=candidate.id, is_ai_generated=True)\
+                             .order_by(Quiz.id.desc()).first()
+            if not quiz or len(quiz.questions) != options.get('num_questions', 10):
+                continue
+        return candidate
+    return None
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -297,6 +517,16 @@ def student_required(f):
 def index():
     return render_template('index.html')
 
+@app.route('/health')
+def health():
+    """Circuit breaker state of each upstream dependency"""
+    breakers = {name: breaker.snapshot() for name, breaker in circuit_breakers.items()}
+    degraded = any(b['state'] != CircuitBreaker.CLOSED for b in breakers.values())
+    return jsonify({
+        'status': 'degraded' if degraded else 'ok',
+        'breakers': breakers
+    })
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
@@ -372,120 +602,36 @@ def logout():
 @login_required
 @admin_required
 def admin_dashboard():
-    subjects = Subject.query.all()
-    quizzes = Quiz.query.all()
-    lectures = Lecture.query.all()
-    
-    # Get all students
-    students = User.query.all()
-    
-    # Overall statistics
+    """Dashboard shell with the headline stats; each tab loads its rows from admin_dashboard_table"""
     overall_stats = {
-        'total_students': len(students),
-        'total_quizzes': len(quizzes),
+        'total_students': User.query.count(),
+        'total_quizzes': Quiz.query.count(),
         'total_attempts': Score.query.count(),
         'avg_score': db.session.query(db.func.avg(Score.total_scored * 100.0 / Score.total_questions)).scalar() or 0,
         'avg_time_taken': db.session.query(db.func.avg(Score.time_taken)).scalar() or 0
     }
-    
-    # Get hourly attempt distribution
-    hourly_attempts = db.session.query(
-        db.func.extract('hour', Score.time_stamp_of_attempt).label('hour'),
-        db.func.count().label('count')
-    ).group_by('hour').all()
-    
-    # Get daily attempt distribution for last 7 days
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    daily_attempts = db.session.query(
-        db.func.date(Score.time_stamp_of_attempt).label('date'),
-        db.func.count().label('count')
-    ).filter(Score.time_stamp_of_attempt >= seven_days_ago)\
-     .group_by('date').all()
-    
-    # Get quiz-wise average time taken
-    quiz_time_stats = db.session.query(
-        Quiz.id,
-        Quiz.lecture_id,
-        db.func.avg(Score.time_taken).label('avg_time')
-    ).join(Score).group_by(Quiz.id).all()
-    
-    # Add time-based metrics to overall_stats
-    overall_stats.update({
-        'hourly_attempts': {str(hour): count for hour, count in hourly_attempts},
-        'daily_attempts': {str(date): count for date, count in daily_attempts},
-        'quiz_time_stats': {quiz_id: {'lecture_id': lecture_id, 'avg_time': float(avg_time)} 
-                           for quiz_id, lecture_id, avg_time in quiz_time_stats}
-    })
-    
-    # Student rankings
-    student_rankings = []
-    for student in students:
-        scores = Score.query.filter_by(user_id=student.id).all()
-        if scores:
-            avg_score = sum(s.total_scored * 100.0 / s.total_questions for s in scores) / len(scores)
-            total_attempts = len(scores)
-            # Calculate subject-wise performance
-            subject_performance = {}
-            for subject in subjects:
-                subject_quizzes = Quiz.query.join(Lecture).filter(Lecture.subject_id == subject.id).all()
-                if subject_quizzes:
-                    quiz_ids = [q.id for q in subject_quizzes]
-                    subject_scores = [s for s in scores if s.quiz_id in quiz_ids]
-                    if subject_scores:
-                        subject_avg = sum(s.total_scored * 100.0 / s.total_questions for s in subject_scores) / len(subject_scores)
-                        subject_performance[subject.name] = subject_avg
-            
-            student_rankings.append({
-                'student': student,
-                'avg_score': avg_score,
-                'total_attempts': total_attempts,
-                'subject_performance': subject_performance
-            })
-    
-    # Sort by average score
-    student_rankings.sort(key=lambda x: x['avg_score'], reverse=True)
-    
-    # Add rank to each student
-    for i, ranking in enumerate(student_rankings, 1):
-        ranking['rank'] = i
-    
-    # Subject-wise statistics
-    subject_stats = []
-    for subject in subjects:
-        subject_quizzes = Quiz.query.join(Lecture).filter(Lecture.subject_id == subject.id).all()
-        if subject_quizzes:
-            quiz_ids = [q.id for q in subject_quizzes]
-            scores = Score.query.filter(Score.quiz_id.in_(quiz_ids)).all()
-            if scores:
-                all_scores = [s.total_scored * 100.0 / s.total_questions for s in scores]
-                avg_score = sum(all_scores) / len(all_scores)
-                # Calculate median
-                sorted_scores = sorted(all_scores)
-                mid = len(sorted_scores) // 2
-                median = sorted_scores[mid] if len(sorted_scores) % 2 else (sorted_scores[mid-1] + sorted_scores[mid]) / 2
-                # Calculate mode
-                from statistics import mode, multimode
-                try:
-                    score_mode = mode(all_scores)
-                except:
-                    score_mode = multimode(all_scores)[0]  # Take first mode if multiple exist
-                
-                subject_stats.append({
-                    'subject': subject,
-                    'avg_score': avg_score,
-                    'median_score': median,
-                    'mode_score': score_mode,
-                    'total_attempts': len(scores),
-                    'num_quizzes': len(subject_quizzes)
-                })
-    
-    return render_template('admin_dashboard.html',
-                         subjects=subjects,
-                         quizzes=quizzes,
-                         lectures=lectures,
-                         overall_stats=overall_stats,
-                         student_rankings=student_rankings,
-                         subject_stats=subject_stats)
+    return render_template('admin_dashboard.html', overall_stats=overall_stats)
+
+@app.route('/admin/dashboard/activity')
+@login_required
+@admin_required
+def admin_dashboard_activity():
+    """Hourly and daily attempt counts for the analytics tab's charts"""
+    return jsonify(dict(admin_tables.activity(), success=True))
+
+@app.route('/admin/dashboard/<table>')
+@login_required
+@admin_required
+def admin_dashboard_table(table):
+    """One keyset-paginated page of a dashboard tab: ?sort=&order=&q=&subject_id=&limit=&cursor="""
+    page = admin_tables.TABLES.get(table)
+    if page is None:
+        return jsonify({'success': False, 'error': f'Unknown table: {table}'}), 404
+    try:
+        result = page(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(dict(result, success=True))
 
 @app.route('/user/dashboard')
 @login_required
@@ -763,6 +909,7 @@ def edit_quiz(quiz_id):
                 )
                 db.session.add(question)
             
+            quiz.touch()
             db.session.commit()
             flash('Quiz updated successfully')
             return redirect(url_for('admin_dashboard'))
@@ -801,8 +948,13 @@ def delete_quiz(quiz_id):
 @login_required
 @admin_required
 def view_quiz_questions(quiz_id):
-    quiz = Quiz.query.get_or_404(quiz_id)
-    return render_template('view_questions.html', quiz=quiz)
+    versions = db.session.query(Quiz.updated_at, Lecture.content_version)\
+        .join(Lecture, Lecture.id == Quiz.lecture_id).filter(Quiz.id == quiz_id).first()
+    if versions is None:
+        abort(404)
+    return conditional_page(('quiz', quiz_id) + tuple(versions),
+                            lambda: render_template('view_questions.html', quiz=Quiz.query.get(quiz_id)),
+                            last_modified=versions.updated_at)
 
 @app.route('/admin/quiz/<int:quiz_id>/question/add', methods=['POST'])
 @login_required
@@ -831,6 +983,7 @@ def add_question(quiz_id):
         correct_option=int(correct_option)
     )
     db.session.add(question)
+    quiz.touch()
     db.session.commit()
     
     flash('Question added successfully')
@@ -848,6 +1001,7 @@ def edit_question(question_id):
     question.option3 = request.form.get('option3').strip()
     question.option4 = request.form.get('option4').strip()
     question.correct_option = int(request.form.get('correct_option'))
+    question.quiz.touch()
     
     db.session.commit()
     flash('Question updated successfully')
@@ -859,6 +1013,7 @@ def edit_question(question_id):
 def delete_question(question_id):
     question = Question.query.get_or_404(question_id)
     quiz_id = question.quiz_id
+    question.quiz.touch()
     db.session.delete(question)
     db.session.commit()
     flash('Question deleted successfully')
@@ -984,6 +1139,7 @@ def submit_quiz(quiz_id):
         feedback=json.dumps(result['feedback'])  # Store detailed feedback
     )
     db.session.add(score)
+    question_bank.record_answers(questions, result['feedback'])
     db.session.commit()
     
     # Clear quiz session
@@ -997,13 +1153,26 @@ def submit_quiz(quiz_id):
 @app.route('/attempt/<int:attempt_id>')
 @login_required
 def view_attempt(attempt_id):
-    score = Score.query.get_or_404(attempt_id)
+    attempt = db.session.query(Score.user_id, Score.time_stamp_of_attempt, Quiz.updated_at, Lecture.content_version)\
+        .join(Quiz, Quiz.id == Score.quiz_id).join(Lecture, Lecture.id == Quiz.lecture_id)\
+        .filter(Score.id == attempt_id).first()
+    if attempt is None:
+        abort(404)
     
     # Only allow the user who took the quiz or an admin to view the attempt
-    if score.user_id != current_user.id and not current_user.is_admin():
+    if attempt.user_id != current_user.id and not current_user.is_admin():
         flash('Access denied')
         return redirect(url_for('user_dashboard'))
     
+    # Attempts don't change; the page only does if the quiz's questions are edited
+    last_modified = max(attempt.time_stamp_of_attempt, attempt.updated_at or attempt.time_stamp_of_attempt)
+    return conditional_page(('attempt', attempt_id) + tuple(attempt), lambda: render_attempt(attempt_id),
+                            last_modified=last_modified)
+
+def render_attempt(attempt_id):
+    """Rendered attempt page, with the questions and the saved per-question feedback"""
+    score = Score.query.get(attempt_id)
+    
     # Use QuizService to format questions for display
     quiz_service = QuizService()
     questions = Question.query.filter_by(quiz_id=score.quiz_id).all()
@@ -1059,6 +1228,8 @@ def create_lecture():
             video_url=video_url
         )
         db.session.add(lecture)
+        db.session.flush()
+        search_index.index_lecture(lecture)
         db.session.commit()
         
         if 'generate_ai_content' in request.form:
@@ -1072,10 +1243,13 @@ def create_lecture():
                 }
                 
                 # Start AI content generation in a background thread
+                cancel_token = CancellationToken(app.config.get('GENERATION_JOB_DEADLINE'))
                 thread = threading.Thread(
                     target=generate_ai_content,
-                    args=(app, lecture, options)
+                    args=(app._get_current_object(), lecture, options, cancel_token)
                 )
+                progress_bus.open(lecture.id)
+                thread_monitor.register_thread(lecture.id, thread, cancel_token=cancel_token)
                 thread.start()
                 
                 flash('Lecture created. AI content is being generated...')
@@ -1115,7 +1289,10 @@ def edit_lecture(lecture_id):
             try:
                 ai_service = LectureAIService()
                 video_service = VideoService()
-                transcript_data = video_service.get_transcript(video_url)
+                # Regeneration runs inside this request, so bound it like a generation job
+                cancel_token = CancellationToken(app.config.get('GENERATION_JOB_DEADLINE'))
+                transcript_data = video_service.get_transcript(video_url, cancel_token=cancel_token)
+                draft_summary = None
                 
                 # Clear existing AI content based on selection
                 if 'generate_summary' in request.form:
@@ -1128,13 +1305,23 @@ def edit_lecture(lecture_id):
                 
                 # Generate new content based on selection
                 if 'generate_summary' in request.form:
-                    summary_content = ai_service.generate_summary(transcript_data['full_text'])
+                    summary_content, draft_summary = generate_summary_content(
+                        ai_service, transcript_data['full_text'], cancel_token)
+                    if not summary_content:
+                        raise ValueError('Summary generation failed')
                     summary = LectureSummary(lecture_id=lecture.id, content=summary_content)
                     db.session.add(summary)
                 
+                incremental = app.config.get('INCREMENTAL_REGENERATION')
+                force = 'force_regenerate' in request.form
                 if 'generate_flashcards' in request.form:
-                    flashcards = ai_service.generate_flashcards(transcript_data['full_text'])
-                    for card in flashcards:
+                    if incremental:
+                        flashcards = chunk_artifacts.flashcards(lecture.id, transcript_data['timestamps'],
+                                                                ai_service, force=force, cancel_token=cancel_token)
+                    else:
+                        flashcards = ai_service.generate_flashcards(transcript_data['full_text'],
+                                                                    cancel_token=cancel_token)
+                    for card in near_duplicate_guard.filter('flashcards', lecture, flashcards, lambda card: card['front']):
                         flashcard = LectureFlashcard(
                             lecture_id=lecture.id,
                             front=card['front'],
@@ -1143,53 +1330,48 @@ def edit_lecture(lecture_id):
                         db.session.add(flashcard)
                 
                 if 'generate_notes' in request.form:
-                    notes_content = ai_service.generate_notes(transcript_data['full_text'])
+                    if incremental:
+                        notes_content = chunk_artifacts.notes(lecture.id, transcript_data['timestamps'],
+                                                              ai_service, force=force, cancel_token=cancel_token)
+                    else:
+                        notes_content = ai_service.generate_notes(transcript_data['full_text'],
+                                                                  cancel_token=cancel_token)
                     notes = LectureNote(lecture_id=lecture.id, content=notes_content)
                     db.session.add(notes)
                 
-                # Use timestamps from transcript directly
-                for ts in transcript_data['timestamps']:
+                # Chapter the transcript at topic shifts (local TF-IDF, no API call)
+                for chapter in chapterize(transcript_data['timestamps']):
                     timestamp = LectureTimestamp(
                         lecture_id=lecture.id,
-                        title=ts['text'],
-                        timestamp=int(ts['start'])
+                        title=chapter['title'],
+                        timestamp=chapter['start']
                     )
                     db.session.add(timestamp)
+                timeline_store.save(lecture.id, transcript_data['timestamps'])
+                lecture.touch()
+                search_index.index_lecture(lecture, transcript=transcript_data['full_text'])
                 
                 if 'generate_quiz' in request.form:
                     num_questions = int(request.form.get('num_questions', 10))
                     if 5 <= num_questions <= 50:
-                        questions = ai_service.generate_quiz(transcript_data['full_text'], num_questions)
-                        
-                        quiz = Quiz(
-                            lecture_id=lecture.id,
-                            date_of_quiz=datetime.now() + timedelta(days=1),
-                            time_duration=30,
-                            remarks='AI-generated quiz from lecture: ' + title,
-                            is_ai_generated=True
-                        )
-                        db.session.add(quiz)
-                        db.session.flush()
-                        
-                        for q in questions:
-                            question = Question(
-                                quiz_id=quiz.id,
-                                question_statement=q['question_statement'],
-                                option1=q['options'][0],
-                                option2=q['options'][1],
-                                option3=q['options'][2],
-                                option4=q['options'][3],
-                                correct_option=q['correct_option']
-                            )
-                            db.session.add(question)
+                        quiz_result = questions_for_quiz(lecture.id, num_questions, lambda: QuizService(ai_service)
+                                                         .generate_quiz(transcript_data['full_text'], num_questions,
+                                                                        cancel_token=cancel_token))
+                        if not quiz_result.get('success'):
+                            raise ValueError(f"Quiz generation failed: {quiz_result.get('error', 'Unknown error')}")
+                        add_quiz(lecture, quiz_result['questions'], 'AI-generated quiz from lecture: ' + title)
                 
                 db.session.commit()
+                if draft_summary:
+                    start_summary_refinement([lecture.id], transcript_data['full_text'], draft_summary)
                 flash('Lecture and selected AI content updated successfully')
             except Exception as e:
                 db.session.rollback()
                 flash('Error regenerating AI content: ' + str(e))
                 return redirect(url_for('admin_dashboard'))
         else:
+            lecture.touch()
+            search_index.index_lecture(lecture)
             db.session.commit()
             flash('Lecture updated successfully')
         return redirect(url_for('admin_dashboard'))
@@ -1204,6 +1386,10 @@ def delete_lecture(lecture_id):
     lecture = Lecture.query.get_or_404(lecture_id)
     
     try:
+        # Stop any in-flight generation so it doesn't keep spending quota on a deleted lecture;
+        # a job other lectures are attached to keeps running and is handed to one of them
+        if not generation_registry.detach(lecture_id) and not generation_registry.followers(lecture_id):
+            thread_monitor.cancel(lecture_id, 'Lecture was deleted')
         db.session.delete(lecture)
         db.session.commit()
         flash('Lecture deleted successfully')
@@ -1221,46 +1407,25 @@ def generate_lecture_quiz(lecture_id):
     num_questions = int(request.form.get('num_questions', 10))
     
     try:
-        ai_service = LectureAIService()
-        video_service = VideoService()
-        quiz_service = QuizService(ai_service)
-        
-        # Get transcript from video
-        transcript_data = video_service.get_transcript(lecture.video_url)
-        transcript_text = transcript_data['full_text']
-        
-        # Generate quiz questions from transcript
-        quiz_result = quiz_service.generate_quiz(transcript_text, num_questions)
+        def generate_quiz():
+            """Generate quiz questions from the transcript (only fetched if the bank runs low)"""
+            cancel_token = CancellationToken(app.config.get('GENERATION_JOB_DEADLINE'))
+            quiz_service = QuizService(LectureAIService())
+            transcript_data = VideoService().get_transcript(lecture.video_url, cancel_token=cancel_token)
+            return quiz_service.generate_quiz(transcript_data['full_text'], num_questions,
+                                              cancel_token=cancel_token)
+
+        if not 5 <= num_questions <= 50:
+            raise ValueError('Number of questions must be between 5 and 50')
+        quiz_result = questions_for_quiz(lecture.id, num_questions, generate_quiz)
         
         if not quiz_result.get('success'):
             raise ValueError(quiz_result.get('error', 'Failed to generate quiz questions'))
             
-        questions = quiz_result['questions']
-        
-        quiz = Quiz(
-            lecture_id=lecture.id,
-            date_of_quiz=datetime.now() + timedelta(days=1),  # Schedule for tomorrow
-            time_duration=30,  # 30 minutes default
-            remarks='AI-generated quiz from lecture: ' + lecture.title,
-            is_ai_generated=True
-        )
-        db.session.add(quiz)
-        db.session.flush()
-        
-        for q in questions:
-            question = Question(
-                quiz_id=quiz.id,
-                question_statement=q['question_statement'],
-                option1=q['options'][0],
-                option2=q['options'][1],
-                option3=q['options'][2],
-                option4=q['options'][3],
-                correct_option=q['correct_option']
-            )
-            db.session.add(question)
-        
+        add_quiz(lecture, quiz_result['questions'], 'AI-generated quiz from lecture: ' + lecture.title)
         db.session.commit()
-        flash('Quiz generated successfully')
+        flash('Quiz generated successfully' if quiz_result.get('generated', True)
+              else 'Quiz assembled from the question bank')
     except Exception as e:
         db.session.rollback()
         flash('Error generating quiz: ' + str(e))
@@ -1270,8 +1435,56 @@ def generate_lecture_quiz(lecture_id):
 @app.route('/lecture/<int:lecture_id>')
 @login_required
 def view_lecture(lecture_id):
+    """Lecture page: a 304 or a page cache hit while the lecture's content version is unchanged"""
+    version = db.session.query(Lecture.content_version).filter_by(id=lecture_id).first()
+    if version is None:
+        abort(404)
+    role = 'admin' if current_user.is_admin() else 'user'
+    return conditional_page(('lecture', lecture_id, version[0], role),
+                            lambda: render_lecture(lecture_id, f'lecture:{lecture_id}:{version[0]}:{role}'))
+
+def render_lecture(lecture_id, key):
+    """Rendered lecture page, from the page cache when possible"""
+    # Flashed messages are per session, so pages showing them are not cached
+    cacheable = not session.get('_flashes')
+    if cacheable:
+        page = page_cache.get(key + ':page')
+        if page is not None:
+            return page
+
     lecture = Lecture.query.get_or_404(lecture_id)
-    return render_template('view_lecture.html', lecture=lecture)
+    has_timeline = db.session.query(LectureTimeline.lecture_id).filter_by(lecture_id=lecture_id).first() is not None
+    body = page_cache.get_or_render(key + ':body', lambda: render_template(
+        'lecture_body.html', lecture=lecture, has_timeline=has_timeline))
+    page = render_template('view_lecture.html', lecture=lecture, has_timeline=has_timeline, lecture_body=body)
+    if cacheable:
+        page_cache.set(key + ':page', page)
+    return page
+
+@app.route('/lecture/<int:lecture_id>/transcript')
+@login_required
+def lecture_transcript_window(lecture_id):
+    """Transcript segments around playback time t, for the synced transcript panel"""
+    timeline = timeline_store.load(lecture_id)
+    if timeline is None:
+        return jsonify({'success': False, 'error': 'No transcript timeline for this lecture'}), 404
+    t = max(request.args.get('t', 0, type=float), 0)
+    before = min(max(request.args.get('before', 30, type=float), 0), 600)
+    after = min(max(request.args.get('after', 90, type=float), 0), 600)
+    return jsonify(dict(timeline.window(t, before, after), success=True, duration=timeline.duration))
+
+@app.route('/search')
+@login_required
+def search():
+    query = request.args.get('q', '').strip()
+    subject_id = request.args.get('subject_id', type=int)
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    results = search_index.search(query, limit=limit, subject_id=subject_id) if query else []
+    if request.args.get('format') == 'json':
+        return jsonify({'query': query, 'results': results})
+    subjects = Subject.query.order_by(Subject.name).all()
+    return render_template('search.html', query=query, results=results, subjects=subjects,
+                           subject_id=subject_id)
 
 @app.route('/admin/lecture/<int:lecture_id>/regenerate/<content_type>', methods=['POST'])
 @login_required
@@ -1282,20 +1495,31 @@ def regenerate_lecture_content(lecture_id, content_type):
     video_service = VideoService()
     
     try:
+        # Regeneration runs inside this request, so bound it like a generation job
+        cancel_token = CancellationToken(app.config.get('GENERATION_JOB_DEADLINE'))
         # Get transcript from video
-        transcript_data = video_service.get_transcript(lecture.video_url)
+        transcript_data = video_service.get_transcript(lecture.video_url, cancel_token=cancel_token)
         transcript_text = transcript_data['full_text']
+        incremental = app.config.get('INCREMENTAL_REGENERATION')
+        force = bool((request.get_json(silent=True) or {}).get('force'))
+        draft_summary = None
         
         if content_type == 'summary':
             LectureSummary.query.filter_by(lecture_id=lecture_id).delete()
-            summary_content = ai_service.generate_summary(transcript_text)
+            summary_content, draft_summary = generate_summary_content(ai_service, transcript_text, cancel_token)
+            if not summary_content:
+                raise ValueError('Summary generation failed')
             summary = LectureSummary(lecture_id=lecture.id, content=summary_content)
             db.session.add(summary)
             
         elif content_type == 'flashcards':
             LectureFlashcard.query.filter_by(lecture_id=lecture_id).delete()
-            flashcards = ai_service.generate_flashcards(transcript_text)
-            for card in flashcards:
+            if incremental:
+                flashcards = chunk_artifacts.flashcards(lecture.id, transcript_data['timestamps'],
+                                                        ai_service, force=force, cancel_token=cancel_token)
+            else:
+                flashcards = ai_service.generate_flashcards(transcript_text, cancel_token=cancel_token)
+            for card in near_duplicate_guard.filter('flashcards', lecture, flashcards, lambda card: card['front']):
                 flashcard = LectureFlashcard(
                     lecture_id=lecture.id,
                     front=card['front'],
@@ -1305,11 +1529,20 @@ def regenerate_lecture_content(lecture_id, content_type):
                 
         elif content_type == 'notes':
             LectureNote.query.filter_by(lecture_id=lecture_id).delete()
-            notes_content = ai_service.generate_notes(transcript_text)
+            if incremental:
+                notes_content = chunk_artifacts.notes(lecture.id, transcript_data['timestamps'],
+                                                      ai_service, force=force, cancel_token=cancel_token)
+            else:
+                notes_content = ai_service.generate_notes(transcript_text, cancel_token=cancel_token)
             notes = LectureNote(lecture_id=lecture.id, content=notes_content)
             db.session.add(notes)
             
+        timeline_store.save(lecture.id, transcript_data['timestamps'])
+        lecture.touch()
+        search_index.index_lecture(lecture, transcript=transcript_text)
         db.session.commit()
+        if draft_summary:
+            start_summary_refinement([lecture.id], transcript_text, draft_summary)
         return jsonify({'success': True})
         
     except Exception as e:
@@ -1348,6 +1581,8 @@ def process_video():
                 video_url=url
             )
             db.session.add(lecture)
+            db.session.flush()
+            search_index.index_lecture(lecture)
             db.session.commit()
         except Exception as db_error:
             db.session.rollback()
@@ -1362,21 +1597,53 @@ def process_video():
             'num_questions': request.json.get('num_questions', 10)
         }
 
-        try:
-            # Initialize progress queue with thread safety
-            with progress_lock:
-                progress_queues[lecture.id] = queue.Queue()
+        video_id = VideoService()._extract_video_id(url)
+
+        # Reuse content already generated for this video, e.g. in another subject
+        source_lecture = find_reusable_lecture(video_id, options, exclude_id=lecture.id)
+        if source_lecture:
+            try:
+                copy_generated_content(source_lecture.id, lecture, options)
+                db.session.commit()
+            except Exception as copy_error:
+                db.session.rollback()
+                return jsonify({'error': f'Database error: {str(copy_error)}'}), 500
+            
+            progress_bus.open(lecture.id)
+            for component in ['transcript', 'summary', 'flashcards', 'notes', 'quiz']:
+                if component == 'transcript' or options.get(f'generate_{component}'):
+                    send_progress_update(lecture.id, component, 100)
+            send_progress_update(lecture.id, 'complete', 100)
+            return jsonify({
+                'success': True,
+                'lecture_id': lecture.id,
+                'reused_from': source_lecture.id,
+                'message': 'Lecture created from previously generated content'
+            })
 
+        # Attach to an identical generation already in flight instead of running it twice
+        leader_id = generation_registry.join_or_start(
+            generation_registry.make_key(video_id, options), lecture.id)
+        if leader_id is not None:
+            return jsonify({
+                'success': True,
+                'lecture_id': lecture.id,
+                'coalesced_with': leader_id,
+                'message': 'Lecture created and attached to in-progress content generation'
+            })
+
+        try:
             # Start background processing
+            cancel_token = CancellationToken(app.config.get('GENERATION_JOB_DEADLINE'))
             thread = threading.Thread(
                 target=generate_ai_content,
-                args=(app._get_current_object(), lecture, options),
+                args=(app._get_current_object(), lecture, options, cancel_token),
                 name=f'AI_Content_Gen_{lecture.id}'
             )
             thread.daemon = True
             
             # Register thread with monitor before starting
-            thread_monitor.register_thread(lecture.id, thread)
+            thread_monitor.register_thread(lecture.id, thread, cancel_token=cancel_token)
             thread.start()
 
             return jsonify({
@@ -1386,6 +1653,7 @@ def process_video():
             })
 
         except Exception as thread_error:
+            generation_registry.finish(lecture.id)
             cleanup_progress_queue(lecture.id)
             thread_monitor.unregister_thread(lecture.id)
             db.session.delete(lecture)
@@ -1396,6 +1664,94 @@ def process_video():
         print(f"[ERROR] An error occurred: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/admin/lecture/<int:lecture_id>/cancel-generation', methods=['POST'])
+@login_required
+@admin_required
+def cancel_generation(lecture_id):
+    """Cancel an in-flight AI content generation job"""
+    if generation_registry.detach(lecture_id):
+        # Coalesced lecture: stop following the shared job but let it run for the others
+        send_progress_update(lecture_id, 'error', 'Content generation cancelled: Cancelled by admin')
+        return jsonify({'success': True})
+    if not thread_monitor.cancel(lecture_id, 'Cancelled by admin'):
+        return jsonify({'success': False, 'error': 'No content generation in progress for this lecture'}), 404
+    return jsonify({'success': True})
+
+@app.route('/admin/lecture/bulk-ingest', methods=['POST'])
+@login_required
+@admin_required
+def bulk_ingest():
+    """Create lectures for many videos and generate their content in the background"""
+    payload = request.json or {}
+    subject_id = payload.get('subject_id')
+    if not subject_id or not Subject.query.get(subject_id):
+        return jsonify({'error': 'A valid subject ID is required'}), 400
+
+    try:
+        items = collect_items(payload, app.config.get('BULK_PLAYLIST_INDEX'))
+    except (ValueError, OSError, KeyError) as e:
+        return jsonify({'error': str(e)}), 400
+    if not items:
+        return jsonify({'error': 'No videos to ingest'}), 400
+
+    options = {
+        'generate_summary': payload.get('generate_summary', True),
+        'generate_flashcards': payload.get('generate_flashcards', True),
+        'generate_notes': payload.get('generate_notes', True),
+        'generate_quiz': payload.get('generate_quiz', False),
+        'num_questions': payload.get('num_questions', 10)
+    }
+
+    try:
+        if options['generate_quiz']:
+            options['num_questions'] = parse_num_questions(options['num_questions'])
+        # Requests may lower the configured concurrency, never raise it
+        transcript_workers = clamp_concurrency(payload.get('transcript_concurrency'),
+                                               app.config['BULK_TRANSCRIPT_CONCURRENCY'])
+        generation_workers = clamp_concurrency(payload.get('generation_concurrency'),
+                                               app.config['BULK_GENERATION_CONCURRENCY'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    job = BulkIngestJob(
+        app._get_current_object(), subject_id, items, options,
+        transcript_workers=transcript_workers,
+        generation_workers=generation_workers
+    )
+    try:
+        job.create_lectures()
+    except Exception as db_error:
+        db.session.rollback()
+        return jsonify({'error': f'Database error: {str(db_error)}'}), 500
+
+    bulk_jobs[job.id] = job
+    job.start()
+    return jsonify({'success': True, **job.report()}), 202
+
+@app.route('/admin/lecture/bulk-ingest/<job_id>')
+@login_required
+@admin_required
+def bulk_ingest_status(job_id):
+    """Per-item status and aggregate throughput of a bulk ingest job"""
+    job = bulk_jobs.get(job_id)
+    report = job.report() if job else BulkIngestJob.saved_report(job_id)
+    if not report:
+        return jsonify({'error': 'Unknown bulk ingest job'}), 404
+    return jsonify({'success': True, **report})
+
+@app.route('/admin/ai/stats')
+@login_required
+@admin_required
+def ai_generation_stats():
+    """Response parse rates, calls per generation, model routing, hedging and transcript reduction"""
+    return jsonify({
+        'success': True,
+        'parse': parse_stats.snapshot(),
+        'routing': model_router.snapshot(),
+        'hedging': hedge_policy.snapshot(),
+        'transcripts': reduction_stats.snapshot()
+    })
+
 @app.template_filter('to_letter')
 def to_letter(number):
     """Convert a number to corresponding uppercase letter (1=A, 2=B, etc.)"""
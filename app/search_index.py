@@ -0,0 +1,189 @@
+import html
+import re
+from typing import Dict, List, Optional
+from markupsafe import Markup, escape
+from sqlalchemy import and_, or_, text
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models import (Lecture, LectureFlashcard, LectureNote, LectureSearchDocument, LectureSummary,
+                        Subject)
+
+FTS_TABLE = 'lecture_search'
+COLUMNS = ('title', 'transcript', 'summary', 'notes', 'flashcards')
+# bm25 column weights, in COLUMNS order: a title hit outranks many transcript hits
+WEIGHTS = (10.0, 1.0, 4.0, 2.0, 2.0)
+
+# External-content FTS5 index over lecture_search_document, kept in sync by triggers
+# so ORM inserts, updates and cascade deletes all reach it
+SQLITE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {', '.join(COLUMNS)}, content='lecture_search_document', content_rowid='lecture_id',
+        tokenize='porter unicode61 remove_diacritics 2')""",
+    f"""CREATE TRIGGER IF NOT EXISTS lecture_search_ai AFTER INSERT ON lecture_search_document BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {', '.join(COLUMNS)})
+        VALUES (new.lecture_id, {', '.join('new.' + c for c in COLUMNS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS lecture_search_ad AFTER DELETE ON lecture_search_document BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(COLUMNS)})
+        VALUES ('delete', old.lecture_id, {', '.join('old.' + c for c in COLUMNS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS lecture_search_au AFTER UPDATE ON lecture_search_document BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(COLUMNS)})
+        VALUES ('delete', old.lecture_id, {', '.join('old.' + c for c in COLUMNS)});
+        INSERT INTO {FTS_TABLE}(rowid, {', '.join(COLUMNS)})
+        VALUES (new.lecture_id, {', '.join('new.' + c for c in COLUMNS)});
+    END"""
+]
+
+TAG_RE = re.compile(r'<[^>]+>')
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+# Highlight delimiters FTS5 puts around matches; swapped for <mark> after escaping
+MARK_OPEN, MARK_CLOSE = '\x02', '\x03'
+
+def plain_text(content: Optional[str]) -> str:
+    """Stored summaries and notes are HTML; index their text only"""
+    return html.unescape(TAG_RE.sub(' ', content or ''))
+
+def fts_query(query: str) -> Optional[str]:
+    """Quote each term so user input can't break FTS5 syntax; the last term matches as a prefix"""
+    terms = TERM_RE.findall(query)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"' for term in terms[:-1]) + (' ' if len(terms) > 1 else '') + f'"{terms[-1]}"*'
+
+def highlight(snippet: str) -> Markup:
+    return Markup(str(escape(snippet)).replace(MARK_OPEN, '<mark>').replace(MARK_CLOSE, '</mark>'))
+
+class SearchIndex:
+    """Full-text search over lectures and their generated content.
+
+    SQLite gets a ranked FTS5 index; other databases fall back to LIKE matching
+    over the same documents. Documents are refreshed per lecture as content
+    is generated, so the index never needs a full rebuild in normal use.
+    """
+
+    def __init__(self):
+        self._fts_engines = {}
+
+    def uses_fts(self) -> bool:
+        engine = db.engine
+        if engine.url not in self._fts_engines:
+            self._fts_engines[engine.url] = engine.dialect.name == 'sqlite' and self.ensure_schema()
+        return self._fts_engines[engine.url]
+
+    def ensure_schema(self) -> bool:
+        """Create the FTS5 table and sync triggers if missing; False if SQLite lacks FTS5"""
+        if db.engine.dialect.name != 'sqlite':
+            return False
+        try:
+            with db.engine.begin() as connection:
+                for statement in SQLITE_SCHEMA:
+                    connection.execute(text(statement))
+            return True
+        except OperationalError as e:
+            print(f"[Search] FTS5 unavailable, using LIKE search: {str(e)}")
+            return False
+
+    def transcript(self, lecture_id: int) -> Optional[str]:
+        document = db.session.get(LectureSearchDocument, lecture_id)
+        return document.transcript if document else None
+
+    def index_lecture(self, lecture: Lecture, transcript: Optional[str] = None) -> LectureSearchDocument:
+        """Refresh a lecture's search document from its current content (caller commits).
+
+        The transcript is kept from the previous document unless a new one is given.
+        """
+        document = db.session.get(LectureSearchDocument, lecture.id)
+        if document is None:
+            document = LectureSearchDocument(lecture_id=lecture.id, transcript='')
+            db.session.add(document)
+        summary = LectureSummary.query.filter_by(lecture_id=lecture.id).first()
+        document.title = lecture.title
+        if transcript is not None:
+            document.transcript = transcript
+        document.summary = plain_text((summary.content_html or summary.content) if summary else '')
+        document.notes = '\n'.join(plain_text(note.content_html or note.content)
+                                   for note in LectureNote.query.filter_by(lecture_id=lecture.id))
+        document.flashcards = '\n'.join(f'{card.front} {card.back}'
+                                        for card in LectureFlashcard.query.filter_by(lecture_id=lecture.id))
+        return document
+
+    def rebuild(self) -> int:
+        """Re-index every lecture's stored content and rebuild the FTS5 index"""
+        lectures = Lecture.query.all()
+        for lecture in lectures:
+            self.index_lecture(lecture)
+        db.session.commit()
+        if self.uses_fts():
+            db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            db.session.commit()
+        return len(lectures)
+
+    def search(self, query: str, limit: int = 20, subject_id: Optional[int] = None) -> List[Dict]:
+        """Ranked matches as dicts with lecture_id, title, subject, snippet and score"""
+        hits = self._fts_search(query, limit, subject_id) if self.uses_fts() \
+            else self._like_search(query, limit, subject_id)
+        if not hits:
+            return []
+        lectures = {lecture.id: lecture for lecture in
+                    Lecture.query.filter(Lecture.id.in_([hit['lecture_id'] for hit in hits]))}
+        subjects = {subject.id: subject.name for subject in
+                    Subject.query.filter(Subject.id.in_({l.subject_id for l in lectures.values()}))}
+        results = []
+        for hit in hits:
+            lecture = lectures.get(hit['lecture_id'])
+            if lecture:
+                results.append(dict(hit, title=lecture.title, subject=subjects.get(lecture.subject_id)))
+        return results
+
+    def _fts_search(self, query: str, limit: int, subject_id: Optional[int]) -> List[Dict]:
+        match = fts_query(query)
+        if not match:
+            return []
+        sql = f"""
+            SELECT {FTS_TABLE}.rowid AS lecture_id,
+                   bm25({FTS_TABLE}, {', '.join(map(str, WEIGHTS))}) AS score,
+                   snippet({FTS_TABLE}, -1, :open, :close, '…', 16) AS snippet
+            FROM {FTS_TABLE}
+            {'JOIN lecture ON lecture.id = ' + FTS_TABLE + '.rowid' if subject_id else ''}
+            WHERE {FTS_TABLE} MATCH :match {'AND lecture.subject_id = :subject_id' if subject_id else ''}
+            ORDER BY score
+            LIMIT :limit"""
+        rows = db.session.execute(text(sql), {'match': match, 'open': MARK_OPEN, 'close': MARK_CLOSE,
+                                              'limit': limit, 'subject_id': subject_id})
+        return [{'lecture_id': row.lecture_id, 'score': round(-row.score, 3), 'snippet': highlight(row.snippet)}
+                for row in rows]
+
+    def _like_search(self, query: str, limit: int, subject_id: Optional[int]) -> List[Dict]:
+        terms = TERM_RE.findall(query.lower())
+        if not terms:
+            return []
+        columns = [getattr(LectureSearchDocument, column) for column in COLUMNS]
+        matches = LectureSearchDocument.query.filter(
+            and_(*[or_(*[column.ilike(f'%{term}%') for column in columns]) for term in terms]))
+        if subject_id:
+            matches = matches.join(Lecture, Lecture.id == LectureSearchDocument.lecture_id)\
+                .filter(Lecture.subject_id == subject_id)
+        hits = []
+        for document in matches.limit(limit * 5):
+            values = [(getattr(document, column) or '').lower() for column in COLUMNS]
+            score = sum(weight * value.count(term) for weight, value in zip(WEIGHTS, values) for term in terms)
+            hits.append({'lecture_id': document.lecture_id, 'score': round(score, 3),
+                         'snippet': self._like_snippet(document, terms)})
+        hits.sort(key=lambda hit: -hit['score'])
+        return hits[:limit]
+
+    def _like_snippet(self, document: LectureSearchDocument, terms: List[str], width: int = 80) -> Markup:
+        pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+        for column in COLUMNS[1:] + COLUMNS[:1]:
+            value = getattr(document, column) or ''
+            found = pattern.search(value)
+            if found:
+                start = max(found.start() - width, 0)
+                excerpt = value[start:found.end() + width]
+                marked = pattern.sub(lambda m: f'{MARK_OPEN}{m.group(0)}{MARK_CLOSE}', excerpt)
+                return highlight(('…' if start else '') + marked + ('…' if found.end() + width < len(value) else ''))
+        return Markup('')
+
+# Global search index
+search_index = SearchIndex()
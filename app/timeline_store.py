@@ -0,0 +1,57 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from app import db
+from app.models import LectureTimeline
+from services.timeline import Timeline
+
+class TimelineStore:
+    """Persists lecture timelines and keeps recently read ones decoded in memory.
+
+    Cached entries are keyed by the row's updated_at, so a re-generated
+    timeline is picked up without explicit invalidation.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self._cache: 'OrderedDict[int, tuple]' = OrderedDict()
+
+    def save(self, lecture_id: int, segments: Iterable[Dict]) -> Timeline:
+        """Store the timeline for a lecture's transcript segments (caller commits)"""
+        timeline = Timeline.from_segments(segments)
+        starts, offsets = timeline.to_bytes()
+        row = db.session.get(LectureTimeline, lecture_id)
+        if row is None:
+            row = LectureTimeline(lecture_id=lecture_id)
+            db.session.add(row)
+        row.starts, row.offsets, row.text = starts, offsets, timeline.text
+        return timeline
+
+    def copy(self, source_lecture_id: int, target_lecture_id: int):
+        """Give another lecture of the same video the source's timeline (caller commits)"""
+        source = db.session.get(LectureTimeline, source_lecture_id)
+        if source is not None and db.session.get(LectureTimeline, target_lecture_id) is None:
+            db.session.add(LectureTimeline(lecture_id=target_lecture_id, starts=source.starts,
+                                           offsets=source.offsets, text=source.text))
+
+    def load(self, lecture_id: int) -> Optional[Timeline]:
+        version = db.session.query(LectureTimeline.updated_at).filter_by(lecture_id=lecture_id).scalar()
+        if version is None:
+            return None
+        with self.lock:
+            cached = self._cache.get(lecture_id)
+            if cached and cached[0] == version:
+                self._cache.move_to_end(lecture_id)
+                return cached[1]
+        row = db.session.get(LectureTimeline, lecture_id)
+        timeline = Timeline.from_bytes(row.starts, row.offsets, row.text)
+        with self.lock:
+            self._cache[lecture_id] = (row.updated_at, timeline)
+            self._cache.move_to_end(lecture_id)
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+        return timeline
+
+# Global timeline store
+timeline_store = TimelineStore()
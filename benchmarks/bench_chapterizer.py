@@ -0,0 +1,43 @@
+"""Benchmark local chapter detection on synthetic transcripts of up to six hours.
+
+Times chapterize over the timestamp groups assemble_transcript produces, which
+is what edit_lecture and generate_ai_content chapter. No network access needed.
+Usage:
+    python benchmarks/bench_chapterizer.py [--hours 1 2 4 6] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_transcript_assembly import synthetic_transcript
+from services.chapterizer import chapterize
+from services.video_service import assemble_transcript
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hours', type=float, nargs='+', default=[1, 2, 4, 6])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    report = []
+    for hours in args.hours:
+        _, groups = assemble_transcript(synthetic_transcript(hours))
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            chapters = chapterize(groups)
+            best = min(best, time.perf_counter() - start)
+        report.append({
+            'hours': hours,
+            'groups': len(groups),
+            'chapters': len(chapters),
+            'ms': round(best * 1000, 1)
+        })
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
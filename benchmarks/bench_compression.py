@@ -0,0 +1,102 @@
+"""Benchmark response compression on the lecture page, admin dashboard and search JSON.
+
+Seeds an in-memory database, renders each response once uncompressed, then
+reports bytes on the wire and compression CPU per request for gzip (and
+brotli when installed) at several levels, plus end-to-end request CPU with
+compression off and at the configured defaults. No network access needed.
+Usage:
+    python benchmarks/bench_compression.py [--lectures 40] [--repeat 50]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.compression import brotli, compressor
+from app.models import Lecture, LectureFlashcard, LectureNote, LectureSummary, Quiz, Subject, User
+from app.search_index import search_index
+
+class BenchConfig:
+    SECRET_KEY = 'bench'
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    TESTING = True
+
+PARAGRAPH = ('A **wave** carries energy through a medium without moving the medium along with it. '
+             'Its *amplitude*, period and wavelength are related by v = f * lambda.\n\n')
+
+def seed(lectures):
+    subject = Subject(name='Physics')
+    db.session.add(subject)
+    db.session.flush()
+    for i in range(lectures):
+        lecture = Lecture(subject_id=subject.id, title=f'Waves part {i + 1}', video_url='https://youtu.be/aaaaaaaaaaa')
+        db.session.add(lecture)
+        db.session.flush()
+        db.session.add(LectureSummary(lecture_id=lecture.id, content='# Summary\n\n' + PARAGRAPH * 12))
+        db.session.add(LectureNote(lecture_id=lecture.id, content='# Notes\n\n' + PARAGRAPH * 30))
+        for j in range(10):
+            db.session.add(LectureFlashcard(lecture_id=lecture.id, front=f'What is property {j} of a wave?',
+                                            back=PARAGRAPH.strip()))
+        db.session.add(Quiz(lecture_id=lecture.id, date_of_quiz=datetime(2024, 1, 1), time_duration=30))
+        search_index.index_lecture(lecture, transcript=PARAGRAPH * 40)
+    for i in range(lectures * 5):
+        db.session.add(User(email=f'student{i}@example.com', full_name=f'Student {i}', dob=datetime(2005, 1, 1)))
+    db.session.commit()
+
+def cpu_per_request(client, url, repeat, headers):
+    start = time.process_time()
+    for _ in range(repeat):
+        client.get(url, headers=headers)
+    return (time.process_time() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lectures', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        seed(args.lectures)
+    client = app.test_client()
+    client.post('/admin_login', data={'username': 'admin', 'password': 'admin123'})
+
+    levels = [('gzip', level) for level in (1, 6, 9)]
+    if brotli is not None:
+        levels += [('br', level) for level in (1, 4, 11)]
+    defaults = (compressor.gzip_level, compressor.brotli_level)
+
+    report = []
+    for url in ('/lecture/1', '/admin/dashboard', '/search?q=wave&format=json&limit=100'):
+        compressor.enabled = False
+        body = client.get(url).get_data()
+        entry = {'url': url, 'raw_bytes': len(body), 'encodings': []}
+        for encoding, level in levels:
+            compressor.gzip_level = compressor.brotli_level = level
+            start = time.process_time()
+            for _ in range(args.repeat):
+                compressed = compressor.compress(body, encoding)
+            entry['encodings'].append({
+                'encoding': encoding,
+                'level': level,
+                'bytes': len(compressed),
+                'ratio': round(len(body) / len(compressed), 1),
+                'cpu_ms': round((time.process_time() - start) / args.repeat * 1000, 3)
+            })
+        compressor.gzip_level, compressor.brotli_level = defaults
+        accept = {'Accept-Encoding': 'br, gzip'}
+        entry['request_cpu_ms'] = {'off': round(cpu_per_request(client, url, args.repeat, accept), 2)}
+        compressor.enabled = True
+        entry['request_cpu_ms']['on'] = round(cpu_per_request(client, url, args.repeat, accept), 2)
+        entry['wire_bytes'] = len(client.get(url, headers=accept).get_data())
+        report.append(entry)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Compare the four-call generation path with the combined lecture pack call.
+
+Needs GOOGLE_API_KEY. Usage:
+    python benchmarks/bench_lecture_pack.py --video-url https://www.youtube.com/watch?v=... --runs 3
+    python benchmarks/bench_lecture_pack.py --transcript-file transcript.txt
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai_service import LectureAIService
+from services.flashcard_service import FlashcardService
+from services.quiz_service import QuizService
+from services.video_service import VideoService
+from services.llm_client import LLMClient
+
+SECTIONS = ['summary', 'notes', 'flashcards', 'quiz']
+
+class CountingModel:
+    """Passes calls through to a Gemini model, tallying calls and tokens"""
+
+    def __init__(self, model):
+        self.model = model
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def generate_content(self, prompt, **kwargs):
+        response = self.model.generate_content(prompt, **kwargs)
+        self.calls += 1
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            self.input_tokens += usage.prompt_token_count
+            self.output_tokens += usage.candidates_token_count
+        else:
+            # Older SDKs don't report usage; count the text instead
+            self.input_tokens += self.model.count_tokens(prompt).total_tokens
+            self.output_tokens += self.model.count_tokens(response.text).total_tokens
+        return response
+
+def separate_calls(text, ai_service, flashcard_service, quiz_service, num_questions):
+    """The current path: one call per artifact"""
+    summary = ai_service.generate_summary(text)
+    notes = ai_service.generate_notes(text)
+    flashcards = flashcard_service.generate_flashcards(text)
+    quiz = quiz_service.generate_quiz(text, num_questions)
+    return {
+        'summary': not summary.startswith('Error'),
+        'notes': not notes.startswith('Error'),
+        'flashcards': flashcards.get('success', False),
+        'quiz': quiz.get('success', False)
+    }
+
+def lecture_pack(text, ai_service, flashcard_service, quiz_service, num_questions):
+    """The combined call, falling back to separate calls exactly like generate_ai_content"""
+    pack = ai_service.generate_lecture_pack(text, SECTIONS, num_questions=num_questions,
+                                            card_filter=flashcard_service.valid_cards)
+    summary = pack.get('summary') or ai_service.generate_summary(text)
+    notes = pack.get('notes') or ai_service.generate_notes(text)
+    flashcards = flashcard_service.generate_flashcards(text, seed=pack.get('flashcards'))
+    quiz = quiz_service.generate_quiz(text, num_questions, seed=pack.get('quiz'))
+    return {
+        'summary': not summary.startswith('Error'),
+        'notes': not notes.startswith('Error'),
+        'flashcards': flashcards.get('success', False),
+        'quiz': quiz.get('success', False),
+        'pack_sections': sorted(pack)
+    }
+
+def run(path, text, runs, num_questions):
+    ai_service = LectureAIService()
+    flashcard_service = FlashcardService()
+    quiz_service = QuizService(ai_service)
+    counter = CountingModel(ai_service.model)
+    ai_service.llm = LLMClient(counter)
+    flashcard_service.llm = LLMClient(counter)
+
+    results = []
+    for _ in range(runs):
+        counter.reset()
+        start = time.perf_counter()
+        outcome = path(text, ai_service, flashcard_service, quiz_service, num_questions)
+        results.append({
+            'latency': time.perf_counter() - start,
+            'calls': counter.calls,
+            'input_tokens': counter.input_tokens,
+            'output_tokens': counter.output_tokens,
+            'success': all(outcome[section] for section in SECTIONS),
+            'pack_sections': outcome.get('pack_sections')
+        })
+
+    report = {
+        'runs': runs,
+        'success_rate': sum(r['success'] for r in results) / runs,
+        'latency_p50': statistics.median(r['latency'] for r in results),
+        'latency_max': max(r['latency'] for r in results),
+        'calls_mean': statistics.mean(r['calls'] for r in results),
+        'input_tokens_mean': statistics.mean(r['input_tokens'] for r in results),
+        'output_tokens_mean': statistics.mean(r['output_tokens'] for r in results)
+    }
+    if path is lecture_pack:
+        report['pack_sections'] = [r['pack_sections'] for r in results]
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--video-url')
+    source.add_argument('--transcript-file')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--num-questions', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.transcript_file:
+        with open(args.transcript_file, encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = VideoService().get_transcript(args.video_url)['full_text']
+
+    report = {
+        'separate_calls': run(separate_calls, text, args.runs, args.num_questions),
+        'lecture_pack': run(lecture_pack, text, args.runs, args.num_questions)
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
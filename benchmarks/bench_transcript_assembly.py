@@ -0,0 +1,117 @@
+"""Benchmark transcript assembly on synthetic transcripts of up to six hours.
+
+Compares the old string-concatenation loop with assemble_transcript over the
+segment generator (with and without token reduction), reporting wall time and
+peak traced memory per length.
+No network access needed. Usage:
+    python benchmarks/bench_transcript_assembly.py [--hours 1 2 4 6] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.video_service import assemble_transcript
+from services.transcript_reducer import iter_reduced_segments
+
+WORDS = ('gradient vector matrix function derivative integral limit series proof theorem value '
+         'system energy force model data sample error rate signal the a of to and is in that').split()
+
+def synthetic_transcript(hours: float, seed: int = 0):
+    """Caption entries at YouTube's usual ~3 second cadence"""
+    rng = random.Random(seed)
+    entries = []
+    t = 0.0
+    while t < hours * 3600:
+        duration = rng.uniform(2.0, 4.0)
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 10)))
+        if rng.random() < 0.2:
+            text += '.'
+        entries.append({'text': text, 'start': round(t, 2), 'duration': round(duration, 2)})
+        t += duration
+    return entries
+
+def legacy_assembly(transcript_list):
+    """The loop get_transcript used before, kept here for comparison"""
+    full_text = ""
+    timestamps = []
+    current_segment = {"text": "", "start": 0}
+    for i, entry in enumerate(transcript_list):
+        text = entry.get('text', '').strip()
+        if not text:
+            continue
+        if full_text and not full_text.endswith(('.', '!', '?')):
+            full_text += " "
+        full_text += text
+        current_segment["text"] += f" {text}"
+        if (i > 0 and i % 12 == 0) or any(text.endswith(p) for p in ['.', '!', '?']):
+            if len(current_segment["text"].strip()) > 50:
+                timestamps.append({
+                    "text": current_segment["text"].strip(),
+                    "start": current_segment["start"]
+                })
+                current_segment = {"text": "", "start": entry.get('start', 0)}
+    if current_segment["text"].strip():
+        timestamps.append({
+            "text": current_segment["text"].strip(),
+            "start": current_segment["start"]
+        })
+    return full_text.strip(), timestamps
+
+def normalized(transcript_list):
+    return ({'text': e['text'].strip(), 'start': e['start'], 'duration': e['duration']}
+            for e in transcript_list if e['text'].strip())
+
+def streaming_assembly(transcript_list):
+    """Generator segments joined once, without the token-reduction stage"""
+    return assemble_transcript(normalized(transcript_list))
+
+def reduced_assembly(transcript_list):
+    """What get_transcript does by default: normalize and reduce lazily, join once"""
+    return assemble_transcript(iter_reduced_segments(normalized(transcript_list)))
+
+def measure(fn, entries, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(entries)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(entries)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': round(best, 4), 'peak_mb': round(peak / 2 ** 20, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hours', type=float, nargs='+', default=[1, 2, 4, 6])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    report = []
+    for hours in args.hours:
+        entries = synthetic_transcript(hours)
+        legacy = measure(legacy_assembly, entries, args.repeat)
+        streaming = measure(streaming_assembly, entries, args.repeat)
+        reduced = measure(reduced_assembly, entries, args.repeat)
+        report.append({
+            'hours': hours,
+            'entries': len(entries),
+            'legacy': legacy,
+            'streaming': streaming,
+            'streaming_reduced': reduced,
+            'us_per_entry': {
+                'legacy': round(legacy['seconds'] / len(entries) * 1e6, 2),
+                'streaming': round(streaming['seconds'] / len(entries) * 1e6, 2),
+                'streaming_reduced': round(reduced['seconds'] / len(entries) * 1e6, 2)
+            }
+        })
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""Add pre-rendered HTML to lecture summaries and notes
+
+Revision ID: a7b5e6f8c9d0
+Revises: f6a4d5e7b8c9
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7b5e6f8c9d0'
+down_revision = 'f6a4d5e7b8c9'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('lecture_summary', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_html', sa.Text(), nullable=True))
+    with op.batch_alter_table('lecture_note', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_html', sa.Text(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('lecture_note', schema=None) as batch_op:
+        batch_op.drop_column('content_html')
+    with op.batch_alter_table('lecture_summary', schema=None) as batch_op:
+        batch_op.drop_column('content_html')
@@ -0,0 +1,23 @@
+"""Add lecture content version for page cache keys
+
+Revision ID: b8c6f7a9d0e1
+Revises: a7b5e6f8c9d0
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b8c6f7a9d0e1'
+down_revision = 'a7b5e6f8c9d0'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('lecture', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_version', sa.String(length=16), nullable=False, server_default='0'))
+
+def downgrade():
+    with op.batch_alter_table('lecture', schema=None) as batch_op:
+        batch_op.drop_column('content_version')
@@ -0,0 +1,37 @@
+"""Add lecture search documents
+
+Revision ID: c3f1a2b4d5e6
+Revises: 9598461699b6
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c3f1a2b4d5e6'
+down_revision = '9598461699b6'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('lecture_search_document',
+        sa.Column('lecture_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('transcript', sa.Text(), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=False),
+        sa.Column('flashcards', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['lecture_id'], ['lecture.id'], ),
+        sa.PrimaryKeyConstraint('lecture_id')
+    )
+    # On SQLite the FTS5 table and its sync triggers are created at app startup
+    # (search_index.ensure_schema); run `flask search-reindex` to fill them
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('lecture_search_ai', 'lecture_search_ad', 'lecture_search_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS lecture_search')
+    op.drop_table('lecture_search_document')
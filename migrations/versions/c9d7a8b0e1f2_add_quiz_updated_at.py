@@ -0,0 +1,24 @@
+"""Add quiz updated_at for conditional GETs
+
+Revision ID: c9d7a8b0e1f2
+Revises: b8c6f7a9d0e1
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c9d7a8b0e1f2'
+down_revision = 'b8c6f7a9d0e1'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE quiz SET updated_at = CURRENT_TIMESTAMP')
+
+def downgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
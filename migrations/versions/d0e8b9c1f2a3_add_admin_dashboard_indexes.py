@@ -0,0 +1,35 @@
+"""Add indexes for keyset-paginated admin dashboard tables
+
+Revision ID: d0e8b9c1f2a3
+Revises: c9d7a8b0e1f2
+Create Date: 2026-10-19 19:30:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd0e8b9c1f2a3'
+down_revision = 'c9d7a8b0e1f2'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('subject', 'name'),
+    ('lecture', 'subject_id'),
+    ('lecture', 'title'),
+    ('lecture_summary', 'lecture_id'),
+    ('quiz', 'lecture_id'),
+    ('quiz', 'date_of_quiz'),
+    ('question', 'quiz_id'),
+    ('score', 'quiz_id'),
+    ('score', 'user_id'),
+    ('score', 'time_stamp_of_attempt'),
+]
+
+def upgrade():
+    for table, column in INDEXES:
+        op.create_index(f'ix_{table}_{column}', table, [column], unique=False)
+
+def downgrade():
+    for table, column in reversed(INDEXES):
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
@@ -0,0 +1,29 @@
+"""Add lecture transcript timelines
+
+Revision ID: d4e2b3c5f6a7
+Revises: c3f1a2b4d5e6
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd4e2b3c5f6a7'
+down_revision = 'c3f1a2b4d5e6'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('lecture_timeline',
+        sa.Column('lecture_id', sa.Integer(), nullable=False),
+        sa.Column('starts', sa.LargeBinary(), nullable=False),
+        sa.Column('offsets', sa.LargeBinary(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['lecture_id'], ['lecture.id'], ),
+        sa.PrimaryKeyConstraint('lecture_id')
+    )
+
+def downgrade():
+    op.drop_table('lecture_timeline')
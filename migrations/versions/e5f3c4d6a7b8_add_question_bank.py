@@ -0,0 +1,47 @@
+"""Add per-lecture question bank
+
+Revision ID: e5f3c4d6a7b8
+Revises: d4e2b3c5f6a7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5f3c4d6a7b8'
+down_revision = 'd4e2b3c5f6a7'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('bank_question',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('lecture_id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=40), nullable=False),
+        sa.Column('question_statement', sa.Text(), nullable=False),
+        sa.Column('option1', sa.String(length=200), nullable=False),
+        sa.Column('option2', sa.String(length=200), nullable=False),
+        sa.Column('option3', sa.String(length=200), nullable=False),
+        sa.Column('option4', sa.String(length=200), nullable=False),
+        sa.Column('correct_option', sa.Integer(), nullable=False),
+        sa.Column('topic', sa.Integer(), nullable=True),
+        sa.Column('times_used', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('times_answered', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('times_correct', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['lecture_id'], ['lecture.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('lecture_id', 'content_hash', name='uq_bank_question_content')
+    )
+    op.create_index('ix_bank_question_lecture_id', 'bank_question', ['lecture_id'], unique=False)
+    with op.batch_alter_table('question', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('bank_question_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_question_bank_question', 'bank_question', ['bank_question_id'], ['id'])
+
+def downgrade():
+    with op.batch_alter_table('question', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_question_bank_question', type_='foreignkey')
+        batch_op.drop_column('bank_question_id')
+    op.drop_index('ix_bank_question_lecture_id', table_name='bank_question')
+    op.drop_table('bank_question')
@@ -0,0 +1,34 @@
+"""Add per-chunk generated artifacts
+
+Revision ID: f6a4d5e7b8c9
+Revises: e5f3c4d6a7b8
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f6a4d5e7b8c9'
+down_revision = 'e5f3c4d6a7b8'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('lecture_chunk_artifact',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('lecture_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('chunk_hash', sa.String(length=40), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['lecture_id'], ['lecture.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('lecture_id', 'kind', 'chunk_hash', name='uq_chunk_artifact')
+    )
+    op.create_index('ix_lecture_chunk_artifact_lecture_id', 'lecture_chunk_artifact', ['lecture_id'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_lecture_chunk_artifact_lecture_id', table_name='lecture_chunk_artifact')
+    op.drop_table('lecture_chunk_artifact')
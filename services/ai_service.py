@@ -1,11 +1,28 @@
 import os
 from dotenv import load_dotenv
 import google.generativeai as genai
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import re
-import html
-import markdown
+import math
 from .video_service import VideoService
+from .cancellation import CancellationToken, GenerationCancelled
+from .llm_client import LLMClient, gemini_breaker
+from .model_router import model_router
+from .hedging import hedge_policy
+from .stream_parsers import QuizStreamParser
+from .transcript_reducer import reduce_text
+from .extractive_summary import extractive_summary
+from .markdown_renderer import markdown_renderer
+from .item_pool import ItemPool, normalize_key
+from .minhash import NearDuplicateIndex
+from .structured_output import (QUIZ_SCHEMA, QUIZ_JSON_EXAMPLE, StructuredStreamParser, decode_json,
+                                decode_json_items, json_generation_config, lecture_pack_schema, parse_stats,
+                                quiz_question_from_json)
+
+# Compiled once; these run for every parsed question and option
+QUESTION_MARKER_RE = re.compile(r'^Q(?:uestion)?\s*\d+[\.:\)]\s*')
+OPTION_MARKER_RE = re.compile(r'^[A-D][\.:\)]\s*')
+MARKDOWN_CHARS_RE = re.compile(r'[*_`]')
 
 class LectureAIService:
     def __init__(self):
@@ -16,14 +33,23 @@ class LectureAIService:
             raise ValueError("GOOGLE_API_KEY environment variable is not set")
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.llm = LLMClient(self.model, router=model_router, hedging=hedge_policy, breaker=gemini_breaker)
         self.video_service = VideoService()
         self._error_counts = {
             'quiz': 0,
             'summary': 0,
             'flashcards': 0,
-            'notes': 0
+            'notes': 0,
+            'pack': 0
         }
         self._max_retries = 3
+        # Ask for JSON output, keeping the line-format parser as the fallback
+        self.structured_output = os.getenv('LLM_STRUCTURED_OUTPUT', '1') == '1'
+        self.reduce_transcripts = os.getenv('TRANSCRIPT_REDUCTION', '1') == '1'
+        # Ask for this many times the wanted questions on the first call
+        self.overgenerate_factor = max(float(os.getenv('LLM_OVERGENERATE_FACTOR', 1.0)), 1.0)
+        # Fall back to a local extractive summary when the model call fails
+        self.summary_fallback = os.getenv('SUMMARY_FALLBACK', '1') == '1'
         
     def _log_error(self, component: str, error: str):
         """Log errors for monitoring"""
@@ -34,24 +60,20 @@ class LectureAIService:
         """Determine if we should retry based on error count"""
         return self._error_counts.get(component, 0) < self._max_retries
 
-    def _clean_content(self, content: str) -> str:
-        """Clean and prepare content for AI processing"""
+    def _clean_content(self, content: str, max_chars: Optional[int] = 4000) -> str:
+        """Clean and prepare content for AI processing; max_chars=None keeps all of it"""
+        if self.reduce_transcripts:
+            content = reduce_text(content)  # Drop fillers and non-speech markers first
         # Remove excessive whitespace
         content = re.sub(r'\s+', ' ', content)
         # Remove special characters but keep basic punctuation
         content = re.sub(r'[^\w\s.,!?-]', '', content)
         # Truncate to avoid token limits while preserving meaning
-        return content[:4000]
+        return content[:max_chars]
 
     def _format_markdown(self, content: str) -> str:
-        """Convert markdown to HTML for better display"""
-        # Convert markdown to HTML
-        html_content = markdown.markdown(content)
-        # Sanitize HTML to prevent XSS
-        html_content = html.escape(html_content)
-        # Convert escaped HTML tags back to actual tags
-        html_content = re.sub(r'&lt;([/]?(?:p|h[1-6]|ul|ol|li|strong|em|code|pre))&gt;', r'<\1>', html_content)
-        return html_content
+        """Convert markdown to sanitized HTML for display"""
+        return markdown_renderer.render(content)
 
     def process_video_content(self, video_url: str) -> Dict[str, any]:
         """Process a YouTube video URL and generate AI content from its transcript"""
@@ -69,7 +91,23 @@ class LectureAIService:
             'timestamps': transcript_data['timestamps']  # Use timestamps from transcript
         }
 
-    def generate_summary(self, content: str) -> str:
+    def generate_summary(self, content: str, cancel_token: Optional[CancellationToken] = None) -> str:
+        summary = self.generate_model_summary(content, cancel_token=cancel_token)
+        if summary:
+            return summary
+        if self.summary_fallback:
+            print("[AI Service] Model summary unavailable, using extractive summary")
+            return self.generate_extractive_summary(content)
+        return "Error generating summary. Please try again."
+
+    def generate_extractive_summary(self, content: str) -> str:
+        """Summary built locally from the most central transcript sentences (no API call)"""
+        # Whole transcript: unlike a prompt, this has no token limit to truncate for
+        text = reduce_text(content) if self.reduce_transcripts else content
+        return extractive_summary(text)
+
+    def generate_model_summary(self, content: str, cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
+        """Model-written summary, or None if the call fails"""
         cleaned_content = self._clean_content(content)
         prompt = """Create a comprehensive yet concise summary of this content.
         Use markdown formatting for better organization.
@@ -91,14 +129,18 @@ class LectureAIService:
         Content: {content}"""
         
         try:
-            response = self.model.generate_content(prompt.format(content=cleaned_content))
-            return self._format_markdown(response.text)
+            response = self.llm.generate_content(prompt.format(content=cleaned_content),
+                                                 cancel_token=cancel_token, component='summary')
+            return response.text.strip()
+        except GenerationCancelled:
+            raise
         except Exception as e:
             print(f"Error generating summary: {str(e)}")
-            return "Error generating summary. Please try again."
+            return None
 
-    def generate_flashcards(self, content: str) -> List[Dict[str, str]]:
-        cleaned_content = self._clean_content(content)
+    def generate_flashcards(self, content: str, cancel_token: Optional[CancellationToken] = None,
+                            count: int = 10, max_chars: Optional[int] = 4000) -> List[Dict[str, str]]:
+        cleaned_content = self._clean_content(content, max_chars)
         prompt = """Create educational flashcards covering key concepts.
         Mix these types of cards:
         1. Term/Definition
@@ -112,12 +154,13 @@ class LectureAIService:
         Front: (clear question/concept)
         Back: (comprehensive answer/explanation)
         
-        Create 10 varied cards that progress from basic to complex.
+        Create {count} varied cards that progress from basic to complex.
         
         Content: {content}"""
         
         try:
-            response = self.model.generate_content(prompt.format(content=cleaned_content))
+            response = self.llm.generate_content(prompt.format(content=cleaned_content, count=count),
+                                                 cancel_token=cancel_token, component='flashcards')
             flashcards = []
             current_card = {}
             
@@ -138,11 +181,13 @@ class LectureAIService:
                 flashcards.append(current_card)
                 
             return flashcards
+        except GenerationCancelled:
+            raise
         except Exception as e:
             print(f"Error generating flashcards: {str(e)}")
             return []
 
-    def generate_timestamps(self, content: str) -> List[Dict[str, any]]:
+    def generate_timestamps(self, content: str, cancel_token: Optional[CancellationToken] = None) -> List[Dict[str, any]]:
         cleaned_content = self._clean_content(content)
         prompt = """Create logical video timestamps for this content.
         For each major topic or section:
@@ -160,7 +205,8 @@ class LectureAIService:
         Content: {content}"""
         
         try:
-            response = self.model.generate_content(prompt.format(content=cleaned_content))
+            response = self.llm.generate_content(prompt.format(content=cleaned_content),
+                                                 cancel_token=cancel_token, component='timestamps')
             timestamps = []
             current_timestamp = {}
             
@@ -182,11 +228,13 @@ class LectureAIService:
                         continue
             
             return timestamps
+        except GenerationCancelled:
+            raise
         except Exception as e:
             print(f"Error generating timestamps: {str(e)}")
             return []
 
-    def generate_notes(self, content: str) -> str:
+    def generate_notes(self, content: str, cancel_token: Optional[CancellationToken] = None) -> str:
         cleaned_content = self._clean_content(content)
         prompt = """Create detailed study notes using markdown formatting.
         Structure as:
@@ -219,82 +267,189 @@ class LectureAIService:
         Content: {content}"""
         
         try:
-            response = self.model.generate_content(prompt.format(content=cleaned_content))
-            return self._format_markdown(response.text)
+            response = self.llm.generate_content(prompt.format(content=cleaned_content),
+                                                 cancel_token=cancel_token, component='notes')
+            return response.text.strip()
+        except GenerationCancelled:
+            raise
         except Exception as e:
             print(f"Error generating notes: {str(e)}")
             return "Error generating study notes. Please try again."
 
-    def generate_quiz(self, content: str, num_questions: int = 10) -> List[Dict[str, any]]:
-        """Generate quiz questions with improved error handling and retries"""
-        self._error_counts['quiz'] = 0  # Reset error count for new attempt
+    def generate_part_notes(self, content: str, cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
+        """Study notes for one part of a lecture, sent whole, or None if the call fails"""
+        cleaned_content = self._clean_content(content, max_chars=None)
+        prompt = """Create study notes for this part of a lecture using markdown formatting.
+        Start with a ## header naming the part's main topic, then cover:
+        - Each key concept with its definition
+        - Examples and explanations
+        - How the concepts connect
         
-        while self._should_retry('quiz'):
-            try:
-                cleaned_content = self._clean_content(content)
-                if not cleaned_content:
-                    self._log_error('quiz', "Content cleaning failed")
-                    return []
-
-                prompt = f"""Based on this content, generate {num_questions} multiple-choice questions.
-                Each question must:
-                - Test understanding of key concepts
-                - Have exactly 4 unique answer options
-                - Have one clear correct answer
-                - Use simple, clear language
-                
-                Format each question exactly like this:
+        Use ### headers, lists and **bold** for key terms. Do not add an
+        introduction or conclusion for the whole lecture.
+        
+        Content: {content}"""
+        
+        try:
+            response = self.llm.generate_content(prompt.format(content=cleaned_content),
+                                                 cancel_token=cancel_token, component='notes')
+            return response.text.strip()
+        except GenerationCancelled:
+            raise
+        except Exception as e:
+            print(f"Error generating part notes: {str(e)}")
+            return None
+
+    def generate_lecture_pack(self, content: str, sections: List[str], num_questions: int = 10,
+                              max_cards: int = 10, cancel_token: Optional[CancellationToken] = None,
+                              card_filter: Optional[Callable[[List[Dict]], List[Dict]]] = None) -> Dict[str, any]:
+        """Generate several lecture artifacts from a single model call.
+
+        sections is a subset of 'summary', 'notes', 'flashcards' and 'quiz'. The
+        result holds only the sections that came back valid, so callers fall back
+        to the separate generators for the rest. Quiz questions and flashcards
+        may be fewer than asked for; they are meant to seed the top-up path.
+        card_filter validates and cleans flashcards (see FlashcardService.valid_cards).
+        """
+        keys = ['questions' if section == 'quiz' else section for section in sections]
+        cleaned_content = self._clean_content(content)
+        prompt = self._lecture_pack_prompt(cleaned_content, keys, num_questions, max_cards)
+        pack = {}
+        try:
+            config = json_generation_config(lecture_pack_schema(keys)) if self.structured_output else None
+            response = self.llm.generate_content(prompt, cancel_token=cancel_token, component='pack',
+                                                 **({'generation_config': config} if config else {}))
+            data = decode_json(response.text) if response and response.text else None
+            if not isinstance(data, dict):
+                parse_stats.record('pack', 'failed')
+                self._log_error('pack', "Response was not a JSON object")
+                return pack
+            parse_stats.record('pack', 'json')
+
+            for section in ('summary', 'notes'):
+                text = data.get(section)
+                if section in sections and isinstance(text, str) and len(text.strip()) >= 50:
+                    pack[section] = text.strip()
+
+            cards = data.get('flashcards')
+            if 'flashcards' in sections and isinstance(cards, list):
+                cards = [card for card in cards if isinstance(card, dict)]
+                cards = card_filter(cards) if card_filter else cards
+                if cards:
+                    pack['flashcards'] = cards
+
+            questions = data.get('questions')
+            if 'quiz' in sections and isinstance(questions, list):
+                pool = ItemPool(num_questions, key=lambda q: normalize_key(q['question_statement']),
+                                near_duplicates=NearDuplicateIndex())
+                for item in questions:
+                    q = quiz_question_from_json(item) if isinstance(item, dict) else None
+                    q = q and self._postprocess_quiz_question(q)
+                    if q and self._validate_quiz_question(q):
+                        pool.add(q)
+                if len(pool):
+                    pack['quiz'] = pool.items[:num_questions]
+
+            missing = [section for section in sections if section not in pack]
+            if missing:
+                self._log_error('pack', f"Sections missing or invalid: {missing}")
+            return pack
+
+        except GenerationCancelled:
+            raise
+        except Exception as e:
+            self._log_error('pack', f"Generation error: {str(e)}")
+            return pack
+
+    def _lecture_pack_prompt(self, cleaned_content: str, keys: List[str], num_questions: int,
+                             max_cards: int) -> str:
+        """Build the combined prompt asking for one JSON object with every requested section"""
+        descriptions = {
+            'summary': '"summary": a concise markdown summary with # Main Topic, ## Key Concepts '
+                       'and ## Applications sections',
+            'notes': '"notes": detailed markdown study notes with # Overview, ## Key Concepts, '
+                     '## Important Relationships, ## Applications and ## Summary sections',
+            'flashcards': f'"flashcards": exactly {max_cards} cards mixing term/definition, concept/example '
+                          'and problem/solution, each {{"front": "...", "back": "..."}} with a concise back',
+            'questions': f'"questions": exactly {num_questions} multiple-choice questions testing key concepts, '
+                         'each {{"question": "...", "options": ["...", "...", "...", "..."], "answer": "A"}} '
+                         'with 4 unique options and "answer" the letter (A/B/C/D) of the correct one'
+        }
+        fields = '\n'.join(f'                - {descriptions[key]}' for key in keys)
+        return f"""Create study material for this lecture content.
+                Respond with JSON only, no other text: a single object with these fields:
+{fields}
                 
-                Q1. [Clear question text]
-                A) [First option]
-                B) [Second option]
-                C) [Third option]
-                D) [Fourth option]
-                Correct Answer: [A/B/C/D]
+                Content: {cleaned_content}"""
+
+    def generate_quiz(self, content: str, num_questions: int = 10,
+                      cancel_token: Optional[CancellationToken] = None, stream: bool = False,
+                      on_progress: Optional[Callable[[int, int], None]] = None,
+                      seed: Optional[List[Dict[str, any]]] = None) -> List[Dict[str, any]]:
+        """Generate quiz questions with improved error handling and retries.
+
+        Valid questions are kept across attempts, so a short response is topped up
+        by asking only for the missing ones; seed questions (e.g. from a lecture
+        pack) count towards the total the same way. With stream=True each question is
+        validated as soon as it arrives, on_progress(valid, wanted) is called per
+        question, and the stream is abandoned once enough valid questions exist.
+        If the attempts run out first, the valid questions gathered so far are
+        returned, so the result can be shorter than num_questions.
+        """
+        self._error_counts['quiz'] = 0  # Reset error count for new attempt
+        pool = ItemPool(num_questions, key=lambda q: normalize_key(q['question_statement']),
+                        near_duplicates=NearDuplicateIndex())
+        for q in seed or []:
+            pool.add(q)
+        if pool.full:
+            return pool.items[:num_questions]
 
-                [Leave a blank line between questions]
-                
-                Content to generate questions about:
-                {cleaned_content}"""
+        cleaned_content = self._clean_content(content)
+        if not cleaned_content:
+            self._log_error('quiz', "Content cleaning failed")
+            return []
+
+        for attempt in range(self._max_retries):
+            # Over-generate up front so a few rejects don't cost a follow-up call
+            wanted = pool.shortfall if attempt or seed else math.ceil(num_questions * self.overgenerate_factor)
+            prompt = self._quiz_prompt(cleaned_content, wanted,
+                                       avoid=[q['question_statement'] for q in pool.items])
 
-                try:
-                    response = self.model.generate_content(prompt)
+            try:
+                if stream:
+                    mode = self._stream_quiz_questions(prompt, pool, cancel_token=cancel_token,
+                                                       on_progress=on_progress)
+                else:
+                    response = self.llm.generate_content(prompt, cancel_token=cancel_token, component='quiz',
+                                                         **self._quiz_generation_kwargs())
                     if not response or not response.text:
                         self._log_error('quiz', "No response from model")
                         continue
 
-                    questions = self._parse_quiz_response(response.text)
-                    if not questions:
-                        self._log_error('quiz', "Failed to parse questions")
-                        continue
-
-                    # Validate each question
-                    validated_questions = []
+                    questions, mode = self._decode_quiz_response(response.text)
                     for q in questions:
                         if self._validate_quiz_question(q):
-                            validated_questions.append(q)
+                            pool.add(q)
                         else:
                             self._log_error('quiz', f"Invalid question format: {q}")
+                    if on_progress:
+                        on_progress(min(len(pool), num_questions), num_questions)
 
-                    # Check if we have enough valid questions
-                    if len(validated_questions) >= num_questions:
-                        return validated_questions[:num_questions]
-                    else:
-                        self._log_error('quiz', f"Only generated {len(validated_questions)} valid questions, needed {num_questions}")
-                        continue
-
-                except Exception as parse_error:
-                    self._log_error('quiz', f"Parse error: {str(parse_error)}")
-                    continue
+                parse_stats.record('quiz', mode if len(pool) else 'failed')
+                if pool.full:
+                    parse_stats.record_calls('quiz', attempt + 1)
+                    return pool.items[:num_questions]
+                self._log_error('quiz', f"Have {len(pool)} valid questions, topping up {pool.shortfall}")
 
+            except GenerationCancelled:
+                raise
             except Exception as e:
                 self._log_error('quiz', f"Generation error: {str(e)}")
-                if not self._should_retry('quiz'):
-                    break
                 continue
 
-        print(f"[AI Service] Quiz generation failed after {self._error_counts['quiz']} attempts")
-        return []
+        print(f"[AI Service] Quiz generation stopped after {self._max_retries} attempts "
+              f"with {len(pool)}/{num_questions} valid questions")
+        return pool.items
 
     def _validate_quiz_question(self, question: Dict) -> bool:
         """Validate quiz question with detailed error logging"""
@@ -356,81 +511,83 @@ class LectureAIService:
             self._log_error('quiz', f"Validation error: {str(e)}")
             return False
 
-    def _parse_quiz_response(self, response: str) -> List[Dict[str, any]]:
-        """Parse quiz questions with improved pattern matching"""
-        try:
-            questions = []
-            current_question = None
-            
-            # Split into lines and clean up
-            lines = [line.strip() for line in response.split('\n') if line.strip()]
-            
-            for line in lines:
-                # Match question patterns
-                q_match = re.match(r'^(?:Q(?:uestion)?\s*)?(\d+)[\.:)\s]\s*(.+)', line, re.IGNORECASE)
-                if q_match:
-                    # Save previous question if complete
-                    if current_question and len(current_question['options']) == 4 and current_question['correct_option']:
-                        questions.append(current_question)
-                    
-                    current_question = {
-                        'question_statement': q_match.group(2).strip(),
-                        'options': [],
-                        'correct_option': None
-                    }
-                    continue
+    def _quiz_prompt(self, cleaned_content: str, num_questions: int, avoid: Optional[List[str]] = None) -> str:
+        """Build the quiz prompt in JSON or line format, excluding questions already generated"""
+        if self.structured_output:
+            format_instructions = f"""Respond with JSON only, no other text, in exactly this shape:
+                {QUIZ_JSON_EXAMPLE}
+                "answer" is the letter (A/B/C/D) of the correct option."""
+        else:
+            format_instructions = """Format each question exactly like this:
+                
+                Q1. [Clear question text]
+                A) [First option]
+                B) [Second option]
+                C) [Third option]
+                D) [Fourth option]
+                Correct Answer: [A/B/C/D]
 
-                # Match option patterns
-                opt_match = re.match(r'^[(\s]*([A-D])[\.:)\s]\s*(.+)', line, re.IGNORECASE)
-                if current_question and opt_match:
-                    option_letter = opt_match.group(1).upper()
-                    option_text = opt_match.group(2).strip()
-                    
-                    # Map A-D to positions 0-3
-                    option_index = ord(option_letter) - ord('A')
-                    
-                    # Extend list if needed
-                    while len(current_question['options']) <= option_index:
-                        current_question['options'].append('')
-                    
-                    current_question['options'][option_index] = option_text
-                    continue
+                [Leave a blank line between questions]"""
 
-                # Match correct answer patterns
-                ans_patterns = [
-                    r'(?:correct\s*(?:answer|option)|answer|correct|solution)\s*:\s*([A-D])',
-                    r'^([A-D])\s*(?:is\s*(?:correct|the\s*answer))$',
-                    r'^\(([A-D])\)\s*(?:is\s*(?:correct|the\s*answer))$'
-                ]
+        return f"""Based on this content, generate {num_questions} multiple-choice questions.
+                Each question must:
+                - Test understanding of key concepts
+                - Have exactly 4 unique answer options
+                - Have one clear correct answer
+                - Use simple, clear language
                 
-                for pattern in ans_patterns:
-                    ans_match = re.search(pattern, line, re.IGNORECASE)
-                    if current_question and ans_match:
-                        answer_letter = ans_match.group(1).upper()
-                        current_question['correct_option'] = ord(answer_letter) - ord('A') + 1
-                        break
+                {format_instructions}
+                {self._avoid_instructions(avoid)}
+                Content to generate questions about:
+                {cleaned_content}"""
 
-            # Add the last question if complete
-            if current_question and len(current_question['options']) == 4 and current_question['correct_option']:
-                questions.append(current_question)
+    def _avoid_instructions(self, avoid: Optional[List[str]]) -> str:
+        """Prompt lines listing questions a top-up request must not repeat"""
+        if not avoid:
+            return ''
+        listed = '\n'.join(f'                - {text}' for text in avoid)
+        return f"""
+                Do not repeat any of these existing questions:
+{listed}
+"""
+
+    def _quiz_generation_kwargs(self) -> Dict:
+        """Native JSON mode for the model call, when enabled and supported by the SDK"""
+        if not self.structured_output:
+            return {}
+        config = json_generation_config(QUIZ_SCHEMA)
+        return {'generation_config': config} if config else {}
+
+    def _quiz_parser(self):
+        """Incremental parser for the configured response format"""
+        if self.structured_output:
+            return StructuredStreamParser(QuizStreamParser(), quiz_question_from_json)
+        return QuizStreamParser()
+
+    def _decode_quiz_response(self, response: str) -> Tuple[List[Dict[str, any]], str]:
+        """Decode a whole quiz response; returns (questions, 'json' or 'text')"""
+        if self.structured_output:
+            items = decode_json_items(response, 'questions')
+            if items is not None:
+                questions = [quiz_question_from_json(item) for item in items]
+                return [q for q in map(self._postprocess_quiz_question, filter(None, questions)) if q], 'json'
+        # Not strict JSON (truncated, or plain text): salvage what the incremental parser can
+        parser = self._quiz_parser()
+        questions = self._parse_quiz_response(response, parser)
+        return questions, getattr(parser, 'mode', None) or 'text'
+
+    def _parse_quiz_response(self, response: str, parser=None) -> List[Dict[str, any]]:
+        """Parse quiz questions with improved pattern matching"""
+        try:
+            parser = parser or QuizStreamParser()
+            questions = parser.feed(response) + parser.close()
 
             # Post-process and validate questions
             processed_questions = []
             for q in questions:
-                # Clean question and options
-                q['question_statement'] = self._clean_question_text(q['question_statement'])
-                q['options'] = [self._clean_option_text(opt) for opt in q['options']]
-                
-                # Skip questions with empty/missing options
-                if '' in q['options']:
-                    self._log_error('quiz', f"Missing options in question: {q['question_statement']}")
-                    continue
-
-                # Verify no duplicate options after cleaning
-                if len(set(q['options'])) == 4:
+                q = self._postprocess_quiz_question(q)
+                if q:
                     processed_questions.append(q)
-                else:
-                    self._log_error('quiz', f"Duplicate options after cleaning: {q['options']}")
 
             return processed_questions
 
@@ -438,12 +595,57 @@ class LectureAIService:
             self._log_error('quiz', f"Parse error: {str(e)}")
             return []
 
+    def _postprocess_quiz_question(self, q: Dict) -> Optional[Dict]:
+        """Clean a parsed question; None if options are missing or collide after cleaning"""
+        # Clean question and options
+        q['question_statement'] = self._clean_question_text(q['question_statement'])
+        q['options'] = [self._clean_option_text(opt) for opt in q['options']]
+        
+        # Skip questions with empty/missing options
+        if '' in q['options']:
+            self._log_error('quiz', f"Missing options in question: {q['question_statement']}")
+            return None
+
+        # Verify no duplicate options after cleaning
+        if len(set(q['options'])) != 4:
+            self._log_error('quiz', f"Duplicate options after cleaning: {q['options']}")
+            return None
+        return q
+
+    def _stream_quiz_questions(self, prompt: str, pool: ItemPool,
+                               cancel_token: Optional[CancellationToken] = None,
+                               on_progress: Optional[Callable[[int, int], None]] = None) -> str:
+        """Stream a quiz response into the pool, validating each question as soon as it is complete.
+
+        Returns the response format that was parsed.
+        """
+        parser = self._quiz_parser()
+
+        def accept(questions):
+            for q in questions:
+                q = self._postprocess_quiz_question(q)
+                if q is None:
+                    continue
+                if not self._validate_quiz_question(q):
+                    self._log_error('quiz', f"Invalid question format: {q}")
+                elif pool.add(q) and on_progress:
+                    on_progress(min(len(pool), pool.target), pool.target)
+
+        for chunk in self.llm.stream_content(prompt, cancel_token=cancel_token, component='quiz',
+                                             **self._quiz_generation_kwargs()):
+            accept(parser.feed(chunk))
+            if pool.full:
+                break  # Enough valid questions; abandon the rest of the stream
+        else:
+            accept(parser.close())
+        return getattr(parser, 'mode', None) or 'text'
+
     def _clean_question_text(self, text: str) -> str:
         """Clean up question text"""
         # Remove any leading question markers
-        text = re.sub(r'^Q(?:uestion)?\s*\d+[\.:\)]\s*', '', text)
+        text = QUESTION_MARKER_RE.sub('', text)
         # Remove any markdown or extra formatting
-        text = re.sub(r'[*_`]', '', text)
+        text = MARKDOWN_CHARS_RE.sub('', text)
         # Ensure it ends with a question mark if it doesn't
         if not text.strip().endswith('?'):
             text = text.strip() + '?'
@@ -452,7 +654,7 @@ class LectureAIService:
     def _clean_option_text(self, text: str) -> str:
         """Clean up option text"""
         # Remove any option markers
-        text = re.sub(r'^[A-D][\.:\)]\s*', '', text)
+        text = OPTION_MARKER_RE.sub('', text)
         # Remove any markdown or extra formatting
-        text = re.sub(r'[*_`]', '', text)
+        text = MARKDOWN_CHARS_RE.sub('', text)
         return text.strip()
\ No newline at end of file
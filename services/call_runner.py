@@ -0,0 +1,66 @@
+import concurrent.futures
+import threading
+from typing import Callable, Dict
+
+class CallRunner:
+    """Runs blocking calls on their own daemon threads so a hung call can be abandoned.
+
+    At most max_concurrent calls run at once; later ones wait for a slot. A call
+    that is abandoned gives its slot back straight away and is left to finish on
+    its own thread, so calls that never return can't use up the slots the way
+    they fill the workers of a fixed thread pool.
+    """
+
+    def __init__(self, max_concurrent: int, name: str):
+        self.name = name
+        self._slots = threading.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._release: Dict[concurrent.futures.Future, Callable[[], bool]] = {}
+        self.abandoned = 0  # Abandoned calls still running
+
+    def submit(self, fn: Callable) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        released = []
+
+        def release() -> bool:
+            """Give the slot back once, whether the call finished or was abandoned"""
+            with self._lock:
+                if released:
+                    return False
+                released.append(True)
+                self._release.pop(future, None)
+            self._slots.release()
+            return True
+
+        def run():
+            self._slots.acquire()
+            if not future.set_running_or_notify_cancel():
+                release()
+                return
+            try:
+                result = fn()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                if not release():
+                    with self._lock:
+                        self.abandoned -= 1
+
+        with self._lock:
+            self._release[future] = release
+        threading.Thread(target=run, name=f'{self.name}_call', daemon=True).start()
+        return future
+
+    def abandon(self, future: concurrent.futures.Future):
+        """Stop waiting on a call: cancel it if it has not started, otherwise free its slot"""
+        if future.cancel() or future.done():
+            return
+        with self._lock:
+            release = self._release.get(future)
+        if release is not None and release():
+            with self._lock:
+                self.abandoned += 1
+                abandoned = self.abandoned
+            print(f"[Call Runner] {self.name}: abandoned a hung call ({abandoned} still running)")
@@ -0,0 +1,54 @@
+import threading
+import time
+from typing import Optional
+
+class GenerationCancelled(Exception):
+    """Raised at a checkpoint once a generation job has been cancelled or has run out of time"""
+
+class CancellationToken:
+    def __init__(self, deadline_seconds: Optional[float] = None):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+
+    def cancel(self, reason: str = 'Cancelled'):
+        """Request cancellation; the job stops at its next checkpoint"""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or self.expired
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the job deadline, or None if there is no deadline"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def raise_if_cancelled(self):
+        """Checkpoint: raise GenerationCancelled if the job should stop"""
+        if self._event.is_set():
+            raise GenerationCancelled(self.reason or 'Cancelled')
+        if self.expired:
+            raise GenerationCancelled('Content generation deadline exceeded')
+
+    def timeout_for(self, timeout: float) -> float:
+        """Clamp a per-call timeout so it never outlives the job deadline"""
+        self.raise_if_cancelled()
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return min(timeout, remaining)
+
+    def wait(self, seconds: float) -> bool:
+        """Interruptible sleep; returns True if the job was cancelled meanwhile"""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        return self._event.wait(seconds) or self.expired
@@ -0,0 +1,142 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+WORD_RE = re.compile(r"[a-z][a-z'-]+")
+
+# Function words plus the verbal tics of spoken lectures, which carry no topic
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being
+below between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down
+during each few for from further had hadn't has hasn't have haven't having he he's her here here's hers
+herself him himself his how how's i i'd i'll i'm i've if in into is isn't it it's its itself let let's
+me more most mustn't my myself no nor not of off on once only or other ought our ours ourselves out over
+own same she she's should shouldn't so some such than that that's the their theirs them themselves then
+there there's these they they'd they'll they're they've this those through to too under until up very was
+wasn't we we'd we'll we're we've were weren't what what's when when's where where's which while who who's
+whom why why's will with won't would wouldn't you you'd you'll you're you've your yours yourself
+yourselves
+okay ok yeah yes right just like really actually basically gonna wanna gotta going go get got know
+think want say said see look thing things kind sort lot lots way well now one two also maybe
+something anything everything stuff mean means need make makes made take takes come comes
+today guys let's us thank thanks please video first next last back little bit pretty much many
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase content words of at least three letters, stopwords removed"""
+    words = (word.strip("'-") for word in WORD_RE.findall(text.lower()))
+    return [word for word in words if len(word) > 2 and word not in STOPWORDS]
+
+def _cosine(left: Counter, right: Counter, idf: Dict[str, float]) -> float:
+    if len(left) > len(right):
+        left, right = right, left
+    dot = sum(count * right[word] * idf[word] ** 2 for word, count in left.items() if word in right)
+    if not dot:
+        return 0.0
+    norm_left = math.sqrt(sum((count * idf[word]) ** 2 for word, count in left.items()))
+    norm_right = math.sqrt(sum((count * idf[word]) ** 2 for word, count in right.items()))
+    return dot / (norm_left * norm_right)
+
+def gap_similarities(blocks: List[Counter], idf: Dict[str, float], window: int) -> List[float]:
+    """TF-IDF cosine between the window blocks before and after each gap.
+
+    Entry i is the gap in front of block i + 1. Both windows slide one block per
+    gap, so each step adds and removes a single block instead of re-summing.
+    """
+    left = Counter(blocks[0])
+    right = Counter()
+    for block in blocks[1:1 + window]:
+        right.update(block)
+    similarities = []
+    for gap in range(1, len(blocks)):
+        similarities.append(_cosine(left, right, idf))
+        # Slide: the block after the gap moves left, the next one joins on the right
+        left.update(blocks[gap])
+        if gap - window >= 0:
+            left.subtract(blocks[gap - window])
+        right.subtract(blocks[gap])
+        if gap + window < len(blocks):
+            right.update(blocks[gap + window])
+        left = +left
+        right = +right
+    return similarities
+
+def smooth(values: List[float], width: int = 1) -> List[float]:
+    """Moving average over width neighbours on each side"""
+    smoothed = []
+    for i in range(len(values)):
+        window = values[max(i - width, 0):i + width + 1]
+        smoothed.append(sum(window) / len(window))
+    return smoothed
+
+def depth_scores(similarities: List[float]) -> List[float]:
+    """How far each gap's similarity dips below the nearest peaks on either side"""
+    scores = []
+    for i, value in enumerate(similarities):
+        left_peak = value
+        for j in range(i - 1, -1, -1):
+            if similarities[j] < left_peak:
+                break
+            left_peak = similarities[j]
+        right_peak = value
+        for j in range(i + 1, len(similarities)):
+            if similarities[j] < right_peak:
+                break
+            right_peak = similarities[j]
+        scores.append(left_peak + right_peak - 2 * value)
+    return scores
+
+def top_keywords(counts: Counter, idf: Dict[str, float], keywords: int) -> List[str]:
+    """The words with the highest TF-IDF weight, ties broken alphabetically"""
+    return sorted(counts, key=lambda word: (-counts[word] * idf[word], word))[:keywords]
+
+def chapterize(segments: Iterable[Dict], window: int = 10, min_seconds: float = 120,
+               max_chapters: Optional[int] = None, keywords: int = 3) -> List[Dict]:
+    """Split timed transcript segments into chapters at topic shifts, locally.
+
+    Segments are dicts with 'text' and 'start' (the groups get_transcript returns
+    under 'timestamps'). Cosine similarity between TF-IDF vectors of the window
+    blocks on either side of each gap is scored TextTiling-style; gaps whose dip
+    is a local maximum deeper than mean + std become cuts, deepest first, at least min_seconds
+    apart. Each chapter is titled by its highest TF-IDF keywords.
+    Returns [{'title', 'start', 'keywords'}] ordered by start time.
+    """
+    segments = [segment for segment in segments if segment.get('text')]
+    if not segments:
+        return []
+    blocks = [Counter(tokenize(segment['text'])) for segment in segments]
+    document_frequency = Counter(word for block in blocks for word in block)
+    idf = {word: math.log(len(blocks) / df) + 1 for word, df in document_frequency.items()}
+
+    cuts = []
+    if len(blocks) >= 2 * window:
+        scores = depth_scores(smooth(gap_similarities(blocks, idf, window)))
+        mean = sum(scores) / len(scores)
+        std = math.sqrt(sum((score - mean) ** 2 for score in scores) / len(scores))
+        threshold = max(mean + std, 1e-9)
+        duration = segments[-1].get('start', 0) - segments[0].get('start', 0)
+        limit = max_chapters or max(int(duration // min_seconds), 1)
+        # Local maxima of depth above the cutoff, deepest first
+        candidates = sorted((i + 1 for i, score in enumerate(scores) if score >= threshold
+                             and score >= max(scores[max(i - 1, 0):i + 2])),
+                            key=lambda index: -scores[index - 1])
+        for index in candidates:
+            if len(cuts) + 1 >= limit:
+                break
+            start = segments[index].get('start', 0)
+            neighbours = [segments[0].get('start', 0)] + [segments[cut].get('start', 0) for cut in cuts]
+            if all(abs(start - other) >= min_seconds for other in neighbours):
+                cuts.append(index)
+        cuts.sort()
+
+    chapters = []
+    for begin, end in zip([0] + cuts, cuts + [len(segments)]):
+        counts = sum(blocks[begin:end], Counter())
+        ranked = top_keywords(counts, idf, keywords)
+        chapters.append({
+            'title': ', '.join(ranked).capitalize()[:200] if ranked else 'Introduction',
+            'start': int(segments[begin].get('start', 0)),
+            'keywords': ranked
+        })
+    return chapters
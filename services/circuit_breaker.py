@@ -0,0 +1,111 @@
+import os
+import time
+import threading
+from typing import Callable, Dict, Optional, Tuple, Type
+from .cancellation import GenerationCancelled
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while a dependency's breaker is open"""
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one upstream dependency.
+
+    failure_threshold consecutive failures open the circuit; calls then fail
+    fast until reset_timeout has passed, when a single probe call is let
+    through (half-open). A successful probe closes the circuit, a failed one
+    reopens it. Only exceptions in failure_exceptions count as failures;
+    other errors prove the dependency answered and count as successes.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None,
+                 failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,)):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+        self.reset_timeout = reset_timeout or float(os.getenv('BREAKER_RESET_TIMEOUT', 30))
+        self.failure_exceptions = failure_exceptions
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.counts = {'calls': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a probe through"""
+        return max(self.opened_at + self.reset_timeout - time.monotonic(), 0)
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not reach upstream"""
+        with self.lock:
+            if self.state == self.OPEN and self.retry_in() == 0:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._probe_in_flight):
+                self.counts['rejected'] += 1
+                raise CircuitOpenError(f"{self.name} is unavailable; retrying in {self.retry_in():.0f}s")
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = True
+            self.counts['calls'] += 1
+
+    def record_success(self):
+        with self.lock:
+            if self.state != self.CLOSED:
+                print(f"[Circuit Breaker] {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.counts['failures'] += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.counts['opened'] += 1
+                    print(f"[Circuit Breaker] {self.name} opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a call that says nothing about upstream health (e.g. a cancelled job)"""
+        with self.lock:
+            self._probe_in_flight = False
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Run fn through the breaker"""
+        self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except GenerationCancelled:
+            self.release()
+            raise
+        except self.failure_exceptions:
+            self.record_failure()
+            raise
+        except Exception:
+            self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> Dict[str, any]:
+        with self.lock:
+            state = self.state
+            if state == self.OPEN and self.retry_in() == 0:
+                state = self.HALF_OPEN  # Next call will probe
+            return dict(self.counts, state=state, consecutive_failures=self.failures,
+                        retry_in=round(self.retry_in(), 1) if state == self.OPEN else 0)
+
+# Every breaker by dependency name, for the health endpoint
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """The shared breaker for a dependency, created on first use"""
+    if name not in circuit_breakers:
+        circuit_breakers[name] = CircuitBreaker(name, **kwargs)
+    return circuit_breakers[name]
@@ -0,0 +1,108 @@
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List
+from .chapterizer import tokenize
+from .transcript_reducer import SENTENCE_SPLIT_RE
+
+def split_sentences(text: str, min_words: int = 6, max_words: int = 40) -> List[str]:
+    """Sentences of the transcript, with unpunctuated auto-caption runs cut into max_words pieces"""
+    sentences = []
+    for sentence in SENTENCE_SPLIT_RE.split(text):
+        words = sentence.split()
+        for i in range(0, len(words), max_words):
+            piece = words[i:i + max_words]
+            if len(piece) >= min_words:
+                sentences.append(' '.join(piece))
+    return sentences
+
+def tfidf_vectors(sentences: List[str]) -> List[Dict[str, float]]:
+    """Unit-length TF-IDF vectors, one sparse dict per sentence"""
+    counts = [Counter(tokenize(sentence)) for sentence in sentences]
+    document_frequency = Counter(word for count in counts for word in count)
+    vectors = []
+    for count in counts:
+        vector = {word: tf * (math.log(len(counts) / document_frequency[word]) + 1) for word, tf in count.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({word: weight / norm for word, weight in vector.items()})
+    return vectors
+
+def similarity_graph(vectors: List[Dict[str, float]], threshold: float = 0.05) -> List[Dict[int, float]]:
+    """Cosine-weighted edges between sentences, computed only for pairs sharing a term"""
+    postings = defaultdict(list)
+    for i, vector in enumerate(vectors):
+        for word, weight in vector.items():
+            postings[word].append((i, weight))
+    dots = defaultdict(float)
+    for entries in postings.values():
+        for a in range(len(entries)):
+            i, weight_i = entries[a]
+            for j, weight_j in entries[a + 1:]:
+                dots[i, j] += weight_i * weight_j
+    graph = [{} for _ in vectors]
+    for (i, j), weight in dots.items():
+        if weight >= threshold:
+            graph[i][j] = weight
+            graph[j][i] = weight
+    return graph
+
+def textrank(graph: List[Dict[int, float]], damping: float = 0.85, iterations: int = 50,
+             tolerance: float = 1e-6) -> List[float]:
+    """Weighted PageRank over the sentence graph (power iteration)"""
+    n = len(graph)
+    if not n:
+        return []
+    out_weight = [sum(edges.values()) for edges in graph]
+    scores = [1.0 / n] * n
+    for _ in range(iterations):
+        updated = [(1 - damping) / n] * n
+        for j, edges in enumerate(graph):
+            if not out_weight[j]:
+                continue
+            share = damping * scores[j] / out_weight[j]
+            for i, weight in edges.items():
+                updated[i] += share * weight
+        delta = sum(abs(a - b) for a, b in zip(updated, scores))
+        scores = updated
+        if delta < tolerance:
+            break
+    return scores
+
+def extract_key_sentences(text: str, count: int = 8, max_candidates: int = 400,
+                          redundancy: float = 0.5) -> List[str]:
+    """The count most central sentences, in transcript order.
+
+    Long transcripts are first narrowed to the max_candidates sentences closest
+    to the document centroid so the pairwise graph stays small. Sentences too
+    similar to one already picked are skipped.
+    """
+    sentences = split_sentences(text)
+    if len(sentences) <= count:
+        return sentences
+    vectors = tfidf_vectors(sentences)
+    candidates = list(range(len(sentences)))
+    if len(candidates) > max_candidates:
+        centroid = Counter()
+        for vector in vectors:
+            centroid.update(vector)
+        closeness = [sum(weight * centroid[word] for word, weight in vector.items()) for vector in vectors]
+        candidates = sorted(sorted(candidates, key=lambda i: -closeness[i])[:max_candidates])
+    candidate_vectors = [vectors[i] for i in candidates]
+    graph = similarity_graph(candidate_vectors)
+    scores = textrank(graph)
+
+    picked = []
+    for position in sorted(range(len(candidates)), key=lambda p: -scores[p]):
+        if any(graph[position].get(other, 0) > redundancy for other in picked):
+            continue
+        picked.append(position)
+        if len(picked) == count:
+            break
+    return [sentences[candidates[position]] for position in sorted(picked)]
+
+def extractive_summary(text: str, count: int = 8) -> str:
+    """Markdown summary of the key transcript sentences, for when no model output is available"""
+    sentences = extract_key_sentences(text, count)
+    if not sentences:
+        return ''
+    points = '\n'.join(f"- {sentence[0].upper()}{sentence[1:]}" for sentence in sentences)
+    return f"# Key Points\n\n{points}\n\n*Extracted automatically from the transcript.*"
@@ -1,10 +1,21 @@
 import os
 from dotenv import load_dotenv
 import google.generativeai as genai
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
 import re
+import math
 import queue
 from datetime import datetime, timedelta
+from .cancellation import CancellationToken, GenerationCancelled
+from .llm_client import LLMClient, gemini_breaker
+from .model_router import model_router
+from .hedging import hedge_policy
+from .stream_parsers import FlashcardStreamParser
+from .transcript_reducer import reduce_text
+from .item_pool import ItemPool, normalize_key
+from .minhash import NearDuplicateIndex
+from .structured_output import (FLASHCARD_SCHEMA, FLASHCARD_JSON_EXAMPLE, StructuredStreamParser,
+                                decode_json_items, json_generation_config, parse_stats)
 
 class FlashcardService:
     def __init__(self):
@@ -15,65 +26,79 @@ class FlashcardService:
             raise ValueError("GOOGLE_API_KEY environment variable is not set")
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.llm = LLMClient(self.model, router=model_router, hedging=hedge_policy, breaker=gemini_breaker)
         self.min_content_length = 20
         self.max_retries = 2
+        # Ask for JSON output, keeping the Q:/A: parser as the fallback
+        self.structured_output = os.getenv('LLM_STRUCTURED_OUTPUT', '1') == '1'
+        self.reduce_transcripts = os.getenv('TRANSCRIPT_REDUCTION', '1') == '1'
+        # Ask for this many times the wanted cards on the first call
+        self.overgenerate_factor = max(float(os.getenv('LLM_OVERGENERATE_FACTOR', 1.0)), 1.0)
 
-    def generate_flashcards(self, content: str, max_cards: int = 10) -> Dict[str, any]:
-        """Generate flashcards with validation and error handling"""
+    def generate_flashcards(self, content: str, max_cards: int = 10,
+                            cancel_token: Optional[CancellationToken] = None, stream: bool = False,
+                            on_progress: Optional[Callable[[int, int], None]] = None,
+                            seed: Optional[List[Dict]] = None) -> Dict[str, any]:
+        """Generate flashcards with validation and error handling.
+
+        Valid cards are kept across attempts, so a short response is topped up by
+        asking only for the missing cards; seed cards (e.g. from a lecture pack)
+        count towards the total the same way. With stream=True cards are validated as
+        they arrive, on_progress(valid, wanted) is called per card, and the stream
+        is abandoned once max_cards are valid.
+        """
         if not content or len(content.strip()) < self.min_content_length:
             return {
                 'success': False,
                 'error': 'Content too short for flashcard generation'
             }
 
+        # Clean content
+        cleaned_content = self._clean_content(content)
+        pool = ItemPool(max_cards, key=lambda card: normalize_key(card['front']),
+                        near_duplicates=NearDuplicateIndex())
+        for card in self.valid_cards(seed or []):
+            pool.add(card)
+        if seed and len(pool) >= max_cards * 0.8:
+            return {
+                'success': True,
+                'flashcards': pool.items[:max_cards]
+            }
+
         for attempt in range(self.max_retries):
             try:
-                # Clean content
-                cleaned_content = self._clean_content(content)
-                
-                # Generate flashcards
-                prompt = """Create educational flashcards from the content.
-                Make exactly {num_cards} flashcards.
-                Mix these types:
-                1. Term/Definition
-                2. Concept/Example
-                3. Problem/Solution
-                
-                Format each card exactly as:
-                Q: (question or concept)
-                A: (answer or explanation)
-                
-                Keep answers clear and concise.
-                
-                Content: {content}""".format(
-                    num_cards=max_cards,
-                    content=cleaned_content
-                )
-
-                response = self.model.generate_content(prompt)
-                if not response or not response.text:
-                    continue
-
-                # Parse and validate flashcards
-                flashcards = self._parse_response(response.text)
-                if not flashcards:
-                    continue
-
-                # Clean and validate each card
-                valid_cards = []
-                for card in flashcards:
-                    if self._validate_flashcard(card):
-                        cleaned = self._clean_flashcard(card)
-                        if cleaned:
-                            valid_cards.append(cleaned)
+                # Over-generate up front so a few rejects don't cost a follow-up call
+                wanted = pool.shortfall if attempt or seed else math.ceil(max_cards * self.overgenerate_factor)
+                prompt = self._build_prompt(cleaned_content, wanted, avoid=[card['front'] for card in pool.items])
+
+                if stream:
+                    mode = self._stream_flashcards(prompt, pool, cancel_token, on_progress)
+                else:
+                    response = self.llm.generate_content(prompt, cancel_token=cancel_token, component='flashcards',
+                                                         **self._generation_kwargs())
+                    if not response or not response.text:
+                        continue
+
+                    # Parse, clean and validate each card
+                    flashcards, mode = self._parse_response(response.text)
+                    for card in self.valid_cards(flashcards):
+                        pool.add(card)
+                    if on_progress:
+                        on_progress(min(len(pool), max_cards), max_cards)
+
+                parse_stats.record('flashcards', mode if len(pool) else 'failed')
 
                 # Ensure we have enough valid cards
-                if len(valid_cards) >= max_cards * 0.8:  # Allow for some missing cards
+                if len(pool) >= max_cards * 0.8:  # Allow for some missing cards
+                    parse_stats.record_calls('flashcards', attempt + 1)
                     return {
                         'success': True,
-                        'flashcards': valid_cards[:max_cards]  # Limit to requested number
+                        'flashcards': pool.items[:max_cards]  # Limit to requested number
                     }
+                print(f"Flashcard attempt {attempt + 1}: have {len(pool)} valid cards, topping up {pool.shortfall}")
 
+            except GenerationCancelled:
+                raise
             except Exception as e:
                 print(f"Error in flashcard generation attempt {attempt + 1}: {str(e)}")
                 if attempt == self.max_retries - 1:
@@ -89,33 +114,103 @@ class FlashcardService:
 
     def _clean_content(self, content: str) -> str:
         """Clean content for AI processing"""
+        if self.reduce_transcripts:
+            content = reduce_text(content)  # Drop fillers and non-speech markers first
         content = ' '.join(content.split())  # Normalize whitespace
         content = re.sub(r'[^\w\s.,!?-]', '', content)  # Remove special chars
         return content[:4000]  # Limit length for API
 
-    def _parse_response(self, response: str) -> List[Dict]:
-        """Parse the AI response into flashcard objects"""
-        flashcards = []
-        current_card = {}
-        
-        for line in response.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
+    def _build_prompt(self, cleaned_content: str, max_cards: int, avoid: Optional[List[str]] = None) -> str:
+        """Build the flashcard prompt in JSON or Q:/A: format, excluding cards already generated"""
+        if self.structured_output:
+            format_instructions = f"""Respond with JSON only, no other text, in exactly this shape:
+                {FLASHCARD_JSON_EXAMPLE}
+                "front" is the question or concept, "back" the answer or explanation."""
+        else:
+            format_instructions = """Format each card exactly as:
+                Q: (question or concept)
+                A: (answer or explanation)"""
+
+        return f"""Create educational flashcards from the content.
+                Make exactly {max_cards} flashcards.
+                Mix these types:
+                1. Term/Definition
+                2. Concept/Example
+                3. Problem/Solution
                 
-            if line.startswith('Q:'):
-                if current_card.get('front'):  # Save previous card
-                    flashcards.append(current_card)
-                    current_card = {}
-                current_card['front'] = line[2:].strip()
-            elif line.startswith('A:') and current_card.get('front'):
-                current_card['back'] = line[2:].strip()
+                {format_instructions}
                 
-        # Add the last card if complete
-        if current_card.get('front') and current_card.get('back'):
-            flashcards.append(current_card)
-            
-        return flashcards
+                Keep answers clear and concise.
+                {self._avoid_instructions(avoid)}
+                Content: {cleaned_content}"""
+
+    def _avoid_instructions(self, avoid: Optional[List[str]]) -> str:
+        """Prompt lines listing cards a top-up request must not repeat"""
+        if not avoid:
+            return ''
+        listed = '\n'.join(f'                - {front}' for front in avoid)
+        return f"""
+                Do not repeat any of these existing cards:
+{listed}
+"""
+
+    def _generation_kwargs(self) -> Dict:
+        """Native JSON mode for the model call, when enabled and supported by the SDK"""
+        if not self.structured_output:
+            return {}
+        config = json_generation_config(FLASHCARD_SCHEMA)
+        return {'generation_config': config} if config else {}
+
+    def _parser(self):
+        """Incremental parser for the configured response format"""
+        if self.structured_output:
+            return StructuredStreamParser(FlashcardStreamParser())
+        return FlashcardStreamParser()
+
+    def _parse_response(self, response: str) -> Tuple[List[Dict], str]:
+        """Parse the AI response into flashcard objects; returns (cards, 'json' or 'text')"""
+        if self.structured_output:
+            cards = decode_json_items(response, 'flashcards')
+            if cards is not None:
+                return cards, 'json'
+        # Not strict JSON (truncated, or plain text): salvage what the incremental parser can
+        parser = self._parser()
+        return parser.feed(response) + parser.close(), getattr(parser, 'mode', None) or 'text'
+
+    def _stream_flashcards(self, prompt: str, pool: ItemPool,
+                           cancel_token: Optional[CancellationToken] = None,
+                           on_progress: Optional[Callable[[int, int], None]] = None) -> str:
+        """Stream a flashcard response into the pool, validating each card as soon as it is complete.
+
+        Returns the response format that was parsed.
+        """
+        parser = self._parser()
+
+        def accept(cards):
+            for card in cards:
+                if self._validate_flashcard(card):
+                    cleaned = self._clean_flashcard(card)
+                    if cleaned and pool.add(cleaned) and on_progress:
+                        on_progress(min(len(pool), pool.target), pool.target)
+
+        for chunk in self.llm.stream_content(prompt, cancel_token=cancel_token, component='flashcards',
+                                             **self._generation_kwargs()):
+            accept(parser.feed(chunk))
+            if pool.full:
+                break  # Enough valid cards; abandon the rest of the stream
+        else:
+            accept(parser.close())
+        return getattr(parser, 'mode', None) or 'text'
+
+    def valid_cards(self, cards: List[Dict]) -> List[Dict]:
+        """Cleaned copies of the cards that pass validation"""
+        valid = []
+        for card in cards:
+            if self._validate_flashcard(card):
+                cleaned = self._clean_flashcard(card)
+                if cleaned:
+                    valid.append(cleaned)
+        return valid
 
     def _validate_flashcard(self, card: Dict) -> bool:
         """Validate a single flashcard"""
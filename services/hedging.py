@@ -0,0 +1,79 @@
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional
+from .model_router import model_router, percentile
+
+class HedgePolicy:
+    """Decides when a slow model call gets a duplicate request, and tracks the effect.
+
+    A call is hedged once it has run longer than the component's observed p90,
+    provided hedges stay under max_rate of recent calls. Latency of the primary
+    request alone (what the call would have taken unhedged) is kept next to the
+    latency actually delivered, so the tail improvement can be read off directly.
+    """
+
+    def __init__(self, router=None, enabled: Optional[bool] = None, max_rate: Optional[float] = None,
+                 min_samples: int = 20, window: int = 200):
+        self.router = router or model_router
+        self.enabled = enabled if enabled is not None else os.getenv('LLM_HEDGING', '0') == '1'
+        self.max_rate = max_rate if max_rate is not None else float(os.getenv('LLM_HEDGE_MAX_RATE', 0.1))
+        self.min_samples = min_samples
+        self.window = window
+        self.lock = threading.Lock()
+        self.primary_latencies: Dict[str, deque] = {}
+        self.delivered_latencies: Dict[str, deque] = {}
+        self.recent: Dict[str, deque] = {}  # True per recent call that fired a hedge
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def _samples(self, store: Dict[str, deque], component: str) -> deque:
+        return store.setdefault(component, deque(maxlen=self.window))
+
+    def delay(self, component: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there is too little history"""
+        if not self.enabled:
+            return None
+        with self.lock:
+            samples = list(self.primary_latencies.get(component, ()))
+        if len(samples) < self.min_samples:
+            samples = self.router.latency_samples(component)
+        if len(samples) < self.min_samples:
+            return None
+        return percentile(samples, 90)
+
+    def allow(self, component: str) -> bool:
+        """Whether another hedge keeps the component under the hedge rate cap"""
+        with self.lock:
+            recent = self._samples(self.recent, component)
+            return sum(recent) < self.max_rate * max(len(recent), 1)
+
+    def record_primary(self, component: str, seconds: float):
+        with self.lock:
+            self._samples(self.primary_latencies, component).append(seconds)
+
+    def record_call(self, component: str, seconds: float, hedged: bool, hedge_won: bool):
+        with self.lock:
+            self._samples(self.delivered_latencies, component).append(seconds)
+            self._samples(self.recent, component).append(hedged)
+            counts = self.counts.setdefault(component, {'calls': 0, 'hedged': 0, 'hedge_wins': 0})
+            counts['calls'] += 1
+            counts['hedged'] += hedged
+            counts['hedge_wins'] += hedge_won
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Hedge counts and p50/p99 unhedged (primary only) vs delivered, per component"""
+        with self.lock:
+            report = {}
+            for component, counts in self.counts.items():
+                primary = list(self.primary_latencies.get(component, ()))
+                delivered = list(self.delivered_latencies.get(component, ()))
+                report[component] = dict(
+                    counts,
+                    hedge_rate=round(counts['hedged'] / counts['calls'], 3) if counts['calls'] else None,
+                    unhedged={'p50': percentile(primary, 50), 'p99': percentile(primary, 99)},
+                    delivered={'p50': percentile(delivered, 50), 'p99': percentile(delivered, 99)}
+                )
+            return {'enabled': self.enabled, 'max_rate': self.max_rate, 'components': report}
+
+# Global hedging policy shared by the AI services
+hedge_policy = HedgePolicy()
@@ -0,0 +1,47 @@
+import re
+from typing import Callable, Dict, List, Optional
+from .minhash import NearDuplicateIndex
+
+NON_WORD_RE = re.compile(r'[\W_]+')
+
+def normalize_key(text: str) -> str:
+    """Case, punctuation and whitespace insensitive key for duplicate detection"""
+    return NON_WORD_RE.sub(' ', str(text).lower()).strip()
+
+class ItemPool:
+    """Validated items accumulated across generation attempts, without duplicates.
+
+    With a near_duplicates index, paraphrases of a pooled item's key are
+    rejected too, not only exact matches.
+    """
+
+    def __init__(self, target: int, key: Callable[[Dict], str],
+                 near_duplicates: Optional[NearDuplicateIndex] = None):
+        self.target = target
+        self.key = key
+        self.near_duplicates = near_duplicates
+        self.items: List[Dict] = []
+        self._seen = set()
+        self.duplicates = 0
+
+    def add(self, item: Dict) -> bool:
+        """Keep item unless an equivalent one is already pooled"""
+        key = self.key(item)
+        if key in self._seen or (self.near_duplicates is not None
+                                 and not self.near_duplicates.add(len(self.items), key)):
+            self.duplicates += 1
+            return False
+        self._seen.add(key)
+        self.items.append(item)
+        return True
+
+    @property
+    def shortfall(self) -> int:
+        return max(self.target - len(self.items), 0)
+
+    @property
+    def full(self) -> bool:
+        return len(self.items) >= self.target
+
+    def __len__(self) -> int:
+        return len(self.items)
@@ -0,0 +1,198 @@
+import os
+import time
+import concurrent.futures
+from typing import Iterator, Optional
+from google.api_core.exceptions import ResourceExhausted, ServerError, TooManyRequests
+from .call_runner import CallRunner
+from .cancellation import CancellationToken, GenerationCancelled
+from .circuit_breaker import get_breaker
+
+# Model calls run here so a hung request can be abandoned without blocking the caller
+_call_runner = CallRunner(int(os.getenv('LLM_MAX_CONCURRENT_CALLS', 16)), 'llm')
+
+# Outcomes that mean Gemini itself is degraded, as opposed to a bad request or blocked prompt
+gemini_breaker = get_breaker('gemini', failure_exceptions=(ServerError, TooManyRequests, TimeoutError, ConnectionError))
+
+class LLMClient:
+    """Wraps a Gemini model with per-call timeouts and cancellation checkpoints.
+
+    With a router, calls that name their component go to that component's routed
+    model and generation config instead of self.model. With an enabled hedge
+    policy, slow calls that name their component are hedged (see HedgePolicy).
+    With a breaker, calls fail fast while the dependency is marked down.
+    """
+
+    def __init__(self, model, timeout: Optional[float] = None, router=None, hedging=None, breaker=None):
+        self.model = model
+        self.router = router
+        self.hedging = hedging
+        self.breaker = breaker
+        self.timeout = timeout or float(os.getenv('LLM_CALL_TIMEOUT', 120))
+        self.poll_interval = 0.25  # seconds between cancellation checks while waiting
+
+    def _call(self, fn, timeout: float, cancel_token: Optional[CancellationToken] = None):
+        """Run fn on the call pool, giving up on timeout, deadline or cancellation"""
+        future = _call_runner.submit(fn)
+        waited = 0.0
+        while True:
+            step = min(self.poll_interval, max(timeout - waited, 0))
+            try:
+                result = future.result(timeout=step)
+                break
+            except concurrent.futures.TimeoutError:
+                waited += step
+                if cancel_token is not None and cancel_token.cancelled:
+                    _call_runner.abandon(future)
+                    cancel_token.raise_if_cancelled()
+                if waited >= timeout:
+                    _call_runner.abandon(future)
+                    if cancel_token is not None and cancel_token.expired:
+                        raise GenerationCancelled('Content generation deadline exceeded')
+                    raise TimeoutError(f"Model call timed out after {timeout:.0f}s")
+
+        # Never hand back results for a job that was cancelled while the call was in flight
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        return result
+
+    def _hedged_call(self, component: str, fn, timeout: float, cancel_token: Optional[CancellationToken] = None):
+        """Like _call, but fires a duplicate request once the first outlives the component's p90.
+
+        The first valid response wins; the other request is abandoned (see CallRunner).
+        """
+        hedging = self.hedging
+        delay = hedging.delay(component)
+        start = time.monotonic()
+
+        def on_primary_done(future):
+            if not future.cancelled():
+                hedging.record_primary(component, time.monotonic() - start)
+
+        primary = _call_runner.submit(fn)
+        primary.add_done_callback(on_primary_done)
+        pending = {primary}
+        hedge = None
+        invalid_result = None
+        error = None
+        while True:
+            waited = time.monotonic() - start
+            step = min(self.poll_interval, max(timeout - waited, 0))
+            if hedge is None and delay is not None:
+                step = min(step, max(delay - waited, 0))
+            done, pending = concurrent.futures.wait(pending, timeout=step,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if self._is_valid(result):
+                    for other in pending:
+                        _call_runner.abandon(other)
+                    hedging.record_call(component, time.monotonic() - start, hedge is not None, future is hedge)
+                    if cancel_token is not None:
+                        cancel_token.raise_if_cancelled()
+                    return result
+                invalid_result = result
+            if not pending:
+                hedging.record_call(component, time.monotonic() - start, hedge is not None, False)
+                if invalid_result is None:
+                    raise error
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                return invalid_result
+
+            waited = time.monotonic() - start
+            if cancel_token is not None and cancel_token.cancelled:
+                for future in pending:
+                    _call_runner.abandon(future)
+                cancel_token.raise_if_cancelled()
+            if waited >= timeout:
+                for future in pending:
+                    _call_runner.abandon(future)
+                if cancel_token is not None and cancel_token.expired:
+                    raise GenerationCancelled('Content generation deadline exceeded')
+                raise TimeoutError(f"Model call timed out after {timeout:.0f}s")
+            if hedge is None and delay is not None and waited >= delay:
+                if hedging.allow(component):
+                    hedge = _call_runner.submit(fn)
+                    pending.add(hedge)
+                else:
+                    delay = None  # Over the hedge rate cap; just wait for the primary
+
+    @staticmethod
+    def _is_valid(response) -> bool:
+        """Whether a response carries text; blocked or empty responses don't win a hedge"""
+        try:
+            return bool(response.text)
+        except Exception:
+            return False
+
+    def _timeout(self, cancel_token: Optional[CancellationToken]) -> float:
+        if cancel_token is not None:
+            return cancel_token.timeout_for(self.timeout)
+        return self.timeout
+
+    def _routed(self, component: Optional[str], fn, **kwargs):
+        """Run fn(model, **kwargs) on the component's routed model, or on self.model, through the breaker"""
+        if self.router is not None and component:
+            call = lambda: self.router.call(component, fn, **kwargs)
+        else:
+            call = lambda: fn(self.model, **kwargs)
+        if self.breaker is not None:
+            return self.breaker.call(call)
+        return call()
+
+    def generate_content(self, prompt, cancel_token: Optional[CancellationToken] = None,
+                         component: Optional[str] = None, **kwargs):
+        """Call generate_content, giving up on timeout, deadline or cancellation"""
+        def attempt(model, **call_kwargs):
+            call = lambda: model.generate_content(prompt, **call_kwargs)
+            if component and self.hedging is not None and self.hedging.enabled:
+                return self._hedged_call(component, call, self._timeout(cancel_token), cancel_token)
+            return self._call(call, self._timeout(cancel_token), cancel_token)
+        return self._routed(component, attempt, **kwargs)
+
+    def _stream_failed(self, component: Optional[str], model, error: Exception):
+        """Count an error partway through a stream as _routed would have counted it at the start"""
+        if isinstance(error, GenerationCancelled):
+            return
+        if self.breaker is not None and isinstance(error, self.breaker.failure_exceptions):
+            self.breaker.record_failure()
+        if self.router is not None and component and isinstance(error, (ResourceExhausted, TimeoutError)):
+            self.router.record_breach(component, model)
+
+    def stream_content(self, prompt, cancel_token: Optional[CancellationToken] = None,
+                       component: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Yield response text chunks as they arrive.
+
+        The timeout applies to each chunk rather than the whole response. Stopping
+        iteration early abandons the rest of the stream. Routed latency covers the
+        request up to the start of the stream; a chunk that times out or fails later
+        still counts against the breaker and the serving model's route. Streams are
+        never hedged or failed over once started.
+        """
+        served = {}
+
+        def attempt(model, **call_kwargs):
+            served['model'] = model
+            return self._call(lambda: model.generate_content(prompt, stream=True, **call_kwargs),
+                              self._timeout(cancel_token), cancel_token)
+        response = self._routed(component, attempt, **kwargs)
+        chunks = iter(response)
+        while True:
+            try:
+                chunk = self._call(lambda: next(chunks, None), self._timeout(cancel_token), cancel_token)
+            except Exception as e:
+                self._stream_failed(component, served.get('model'), e)
+                raise
+            if chunk is None:
+                return
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety metadata) carry nothing to parse
+                continue
+            if text:
+                yield text
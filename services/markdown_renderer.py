@@ -0,0 +1,42 @@
+import threading
+import bleach
+import markdown
+
+ALLOWED_TAGS = frozenset({
+    'p', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'dl', 'dt', 'dd',
+    'strong', 'em', 'b', 'i', 'del', 'sup', 'sub', 'abbr', 'code', 'pre', 'blockquote',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td', 'a'
+})
+ALLOWED_ATTRIBUTES = {
+    'a': ['href', 'title'],
+    'abbr': ['title'],
+    'code': ['class'],  # language-* from fenced code blocks
+    'th': ['align'],
+    'td': ['align']
+}
+ALLOWED_PROTOCOLS = frozenset({'http', 'https', 'mailto'})
+
+class MarkdownRenderer:
+    """Markdown to sanitized HTML with one reusable Markdown parser and bleach cleaner.
+
+    Building a Markdown instance loads its extensions, so it is built once and
+    reset between documents; a lock serializes use since both the parser and
+    the cleaner keep state while working. Raw HTML in the source (including
+    content stored as HTML before markdown was kept) passes through the
+    parser and is then cut down to the allowlist.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.markdown = markdown.Markdown(extensions=['fenced_code', 'tables', 'sane_lists'])
+        self.cleaner = bleach.Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES,
+                                      protocols=ALLOWED_PROTOCOLS, strip=True)
+
+    def render(self, text: str) -> str:
+        if not text:
+            return ''
+        with self.lock:
+            return self.cleaner.clean(self.markdown.reset().convert(text))
+
+# Global renderer for generated markdown
+markdown_renderer = MarkdownRenderer()
@@ -0,0 +1,100 @@
+import random
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+from .chapterizer import STOPWORDS
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+WORD_RE = re.compile(r'\w+')
+
+def shingles(text: str) -> Set[str]:
+    """Content words plus adjacent word pairs; paraphrases keep most of the former.
+
+    Numbers and one-letter symbols stay in, so "x^2" and "x^3" variants differ.
+    """
+    words = [word for word in WORD_RE.findall(text.lower()) if word not in STOPWORDS]
+    return set(words) | {f'{a} {b}' for a, b in zip(words, words[1:])}
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+class MinHasher:
+    """MinHash signatures from num_perm universal hash permutations over crc32 shingle hashes"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.permutations = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                             for _ in range(num_perm)]
+
+    def signature(self, tokens: Set[str]) -> Tuple[int, ...]:
+        if not tokens:
+            return (MAX_HASH,) * self.num_perm
+        hashes = [zlib.crc32(token.encode('utf-8')) for token in tokens]
+        return tuple(min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+                     for a, b in self.permutations)
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures that finds near-duplicate texts without a full scan.
+
+    Signatures are split into bands; texts sharing any band bucket become
+    candidates, and a candidate counts as a duplicate when the exact Jaccard
+    similarity of the shingle sets reaches threshold. With 16 bands of 4 rows,
+    pairs at Jaccard 0.5 are found ~65% of the time and at 0.7 ~98%.
+    """
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 64, bands: int = 16,
+                 hasher: Optional[MinHasher] = None):
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher(num_perm)
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.buckets: List[Dict[Tuple[int, ...], Set[Hashable]]] = [defaultdict(set) for _ in range(bands)]
+        self.shingles: Dict[Hashable, Set[str]] = {}
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.shingles)
+
+    def _bands(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def find(self, text: str, tokens: Optional[Set[str]] = None,
+             signature: Optional[Tuple[int, ...]] = None) -> Optional[Hashable]:
+        """Key of an indexed text near-identical to text, or None"""
+        tokens = shingles(text) if tokens is None else tokens
+        if not tokens:
+            return None
+        signature = signature or self.hasher.signature(tokens)
+        with self.lock:
+            candidates = set()
+            for band, key in self._bands(signature):
+                candidates |= self.buckets[band].get(key, set())
+            best = max(candidates, key=lambda c: jaccard(tokens, self.shingles[c]), default=None)
+        if best is not None and jaccard(tokens, self.shingles[best]) >= self.threshold:
+            return best
+        return None
+
+    def insert(self, key: Hashable, text: str, tokens: Optional[Set[str]] = None,
+               signature: Optional[Tuple[int, ...]] = None):
+        tokens = shingles(text) if tokens is None else tokens
+        signature = signature or self.hasher.signature(tokens)
+        with self.lock:
+            self.shingles[key] = tokens
+            for band, bucket_key in self._bands(signature):
+                self.buckets[band][bucket_key].add(key)
+
+    def add(self, key: Hashable, text: str) -> bool:
+        """Index text unless it near-duplicates an indexed one; True if it was added"""
+        tokens = shingles(text)
+        if not tokens:
+            return True  # Nothing to compare on; leave it to exact-match checks
+        signature = self.hasher.signature(tokens)
+        if self.find(text, tokens, signature) is not None:
+            return False
+        self.insert(key, text, tokens, signature)
+        return True
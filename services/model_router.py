@@ -0,0 +1,186 @@
+import os
+import json
+import math
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+import google.generativeai as genai
+from google.api_core.exceptions import ResourceExhausted
+
+# Default route per AI component: primary model, faster fallback, generation
+# config and the latency SLO (seconds) above which the fallback takes over
+DEFAULT_ROUTES = {
+    'summary': {
+        'model': 'gemini-2.0-flash', 'fallback': 'gemini-2.0-flash-lite', 'latency_slo': 30,
+        'generation_config': {'temperature': 0.4, 'max_output_tokens': 2048}
+    },
+    'notes': {
+        'model': 'gemini-2.0-flash', 'fallback': 'gemini-2.0-flash-lite', 'latency_slo': 45,
+        'generation_config': {'temperature': 0.4, 'max_output_tokens': 4096}
+    },
+    'flashcards': {
+        'model': 'gemini-2.0-flash', 'fallback': 'gemini-2.0-flash-lite', 'latency_slo': 30,
+        'generation_config': {'temperature': 0.7, 'max_output_tokens': 2048}
+    },
+    'quiz': {
+        'model': 'gemini-2.0-flash', 'fallback': 'gemini-2.0-flash-lite', 'latency_slo': 45,
+        'generation_config': {'temperature': 0.7, 'max_output_tokens': 8192}
+    },
+    'timestamps': {
+        'model': 'gemini-2.0-flash', 'fallback': 'gemini-2.0-flash-lite', 'latency_slo': 20,
+        'generation_config': {'temperature': 0.2, 'max_output_tokens': 1024}
+    },
+    'pack': {
+        'model': 'gemini-2.0-flash', 'fallback': 'gemini-2.0-flash-lite', 'latency_slo': 90,
+        'generation_config': {'temperature': 0.5, 'max_output_tokens': 8192}
+    }
+}
+
+def load_routes(overrides: Optional[str] = None) -> Dict[str, Dict]:
+    """Default routes merged with MODEL_ROUTES, a JSON object of per-component overrides"""
+    routes = {component: dict(route, generation_config=dict(route['generation_config']))
+              for component, route in DEFAULT_ROUTES.items()}
+    overrides = overrides if overrides is not None else os.getenv('MODEL_ROUTES')
+    if overrides:
+        for component, override in json.loads(overrides).items():
+            route = routes.setdefault(component, dict(DEFAULT_ROUTES['summary']))
+            config = dict(route.get('generation_config', {}), **override.pop('generation_config', {}))
+            route.update(override, generation_config=config)
+    return routes
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of samples (q in 0-100); None when empty"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+class ModelRouter:
+    """Routes each AI component to its model and config, failing over to a faster model.
+
+    A primary call that breaches its route's latency SLO, times out or hits a
+    quota error sends the component to the fallback model for a cool-down period.
+    Quota errors and timeouts are also retried once on the fallback straight away.
+    """
+
+    def __init__(self, routes: Optional[Dict[str, Dict]] = None, cooldown: Optional[float] = None,
+                 window: int = 200):
+        self._routes = routes
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv('ROUTE_FALLBACK_COOLDOWN', 60))
+        self.window = window
+        self.lock = threading.Lock()
+        self._models: Dict[str, any] = {}
+        self._fallback_until: Dict[str, float] = {}
+        self.decisions: Dict[str, Dict[str, int]] = {}
+        self.latencies: Dict[Tuple[str, str], deque] = {}
+
+    @property
+    def routes(self) -> Dict[str, Dict]:
+        if self._routes is None:
+            self._routes = load_routes()
+        return self._routes
+
+    def route(self, component: str) -> Dict:
+        return self.routes.get(component) or self.routes['summary']
+
+    def model(self, name: str):
+        """Cached model instance for a model name"""
+        with self.lock:
+            if name not in self._models:
+                self._models[name] = genai.GenerativeModel(name)
+            return self._models[name]
+
+    def choose(self, component: str) -> Tuple[str, str]:
+        """Model name for the next call and why: 'primary' or 'fallback'"""
+        route = self.route(component)
+        with self.lock:
+            if route.get('fallback') and self._fallback_until.get(component, 0) > time.monotonic():
+                return route['fallback'], 'fallback'
+        return route['model'], 'primary'
+
+    def record(self, component: str, model_name: str, decision: str, seconds: float, breached: bool):
+        """Store a call's latency and routing decision; a breached primary trips the fallback"""
+        route = self.route(component)
+        with self.lock:
+            counts = self.decisions.setdefault(component, {'primary': 0, 'fallback': 0, 'failover': 0,
+                                                           'breaches': 0})
+            counts[decision] += 1
+            samples = self.latencies.setdefault((component, model_name), deque(maxlen=self.window))
+            samples.append(seconds)
+            if breached:
+                counts['breaches'] += 1
+                if model_name == route['model'] and route.get('fallback'):
+                    self._fallback_until[component] = time.monotonic() + self.cooldown
+
+    def record_breach(self, component: str, model):
+        """Count a failure after call() returned (e.g. partway through a stream) against the model that served it"""
+        route = self.route(component)
+        with self.lock:
+            name = next((name for name, cached in self._models.items() if cached is model), None)
+            if name is None:
+                return
+            counts = self.decisions.setdefault(component, {'primary': 0, 'fallback': 0, 'failover': 0,
+                                                           'breaches': 0})
+            counts['breaches'] += 1
+            if name == route['model'] and route.get('fallback'):
+                self._fallback_until[component] = time.monotonic() + self.cooldown
+
+    def latency_samples(self, component: str, model_name: Optional[str] = None) -> List[float]:
+        """Recent latencies of a component, for one model or all of them"""
+        with self.lock:
+            return [seconds for (comp, name), samples in self.latencies.items()
+                    if comp == component and (model_name is None or name == model_name)
+                    for seconds in samples]
+
+    def _call_kwargs(self, route: Dict, kwargs: Dict) -> Dict:
+        """The route's generation config, overridden by any explicit generation_config"""
+        config = dict(route.get('generation_config') or {}, **(kwargs.get('generation_config') or {}))
+        return dict(kwargs, generation_config=config) if config else kwargs
+
+    def call(self, component: str, fn: Callable, **kwargs):
+        """Run fn(model, **call_kwargs) on the routed model, recording latency and failing over"""
+        route = self.route(component)
+        name, decision = self.choose(component)
+        call_kwargs = self._call_kwargs(route, kwargs)
+        start = time.monotonic()
+        try:
+            result = fn(self.model(name), **call_kwargs)
+        except (ResourceExhausted, TimeoutError) as e:
+            self.record(component, name, decision, time.monotonic() - start, breached=True)
+            if decision != 'primary' or not route.get('fallback'):
+                raise
+            print(f"[Model Router] {component}: {name} failed ({type(e).__name__}), retrying on {route['fallback']}")
+            name, decision = route['fallback'], 'failover'
+            start = time.monotonic()
+            result = fn(self.model(name), **call_kwargs)
+        elapsed = time.monotonic() - start
+        self.record(component, name, decision, elapsed, breached=elapsed > route['latency_slo'])
+        return result
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Routes, decision counts and latency percentiles per component and model"""
+        report = {}
+        for component, route in self.routes.items():
+            models = {}
+            for name in filter(None, [route['model'], route.get('fallback')]):
+                samples = self.latency_samples(component, name)
+                models[name] = {
+                    'calls': len(samples),
+                    'p50': percentile(samples, 50),
+                    'p90': percentile(samples, 90),
+                    'p99': percentile(samples, 99)
+                }
+            with self.lock:
+                decisions = dict(self.decisions.get(component, {}))
+                fallback_active = self._fallback_until.get(component, 0) > time.monotonic()
+            report[component] = {
+                'route': route,
+                'decisions': decisions,
+                'fallback_active': fallback_active,
+                'latency': models
+            }
+        return report
+
+# Global router shared by the AI services
+model_router = ModelRouter()
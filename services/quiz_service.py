@@ -1,7 +1,8 @@
 import os
 from dotenv import load_dotenv
 import google.generativeai as genai
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+from .cancellation import CancellationToken, GenerationCancelled
 
 class QuizService:
     def __init__(self, ai_service=None):
@@ -14,8 +15,15 @@ class QuizService:
         self.model = genai.GenerativeModel('gemini-2.0-flash')
         self.ai_service = ai_service
 
-    def generate_quiz(self, content: str, num_questions: int = 10) -> dict:
-        """Generate a quiz with the given number of questions"""
+    def generate_quiz(self, content: str, num_questions: int = 10,
+                      cancel_token: Optional[CancellationToken] = None, stream: bool = False,
+                      on_progress: Optional[Callable[[int, int], None]] = None,
+                      seed: Optional[List[Dict]] = None) -> dict:
+        """Generate a quiz with the given number of questions, topping up any seed questions.
+
+        If the model's attempts run out first, the valid questions gathered are
+        still returned, flagged short, rather than discarded.
+        """
         try:
             if not self.ai_service:
                 return {
@@ -35,42 +43,34 @@ class QuizService:
                     'error': 'Number of questions must be between 5 and 50'
                 }
 
-            # Use AI service with retries
-            max_retries = 2
-            last_error = None
-            
-            for attempt in range(max_retries):
-                try:
-                    questions = self.ai_service.generate_quiz(content, num_questions)
-                    if questions and len(questions) == num_questions:
-                        # Validate each question's format
-                        valid_questions = []
-                        for q in questions:
-                            if self._validate_question(q):
-                                valid_questions.append({
-                                    'question_statement': q['question_statement'],
-                                    'options': q['options'],
-                                    'correct_option': q['correct_option']
-                                })
-
-                        if len(valid_questions) == num_questions:
-                            return {
-                                'success': True,
-                                'questions': valid_questions
-                            }
-
-                    last_error = f"Generated {len(questions)} valid questions, expected {num_questions}"
-                except Exception as e:
-                    last_error = str(e)
-                    if attempt < max_retries - 1:
-                        continue
-                    break
+            # One call: LectureAIService.generate_quiz owns the retry budget and tops up short responses
+            questions = self.ai_service.generate_quiz(content, num_questions, cancel_token=cancel_token,
+                                                     stream=stream, on_progress=on_progress, seed=seed)
+            valid_questions = [{
+                'question_statement': q['question_statement'],
+                'options': q['options'],
+                'correct_option': q['correct_option']
+            } for q in questions or [] if self._validate_question(q)]
 
+            if len(valid_questions) >= num_questions:
+                return {
+                    'success': True,
+                    'questions': valid_questions[:num_questions]
+                }
+            if valid_questions:
+                print(f"[Quiz Service] Short quiz: {len(valid_questions)} of {num_questions} questions")
+                return {
+                    'success': True,
+                    'short': True,
+                    'questions': valid_questions
+                }
             return {
                 'success': False,
-                'error': f'Failed to generate valid quiz after {max_retries} attempts: {last_error}'
+                'error': f'No valid questions generated, expected {num_questions}'
             }
 
+        except GenerationCancelled:
+            raise
         except Exception as e:
             return {
                 'success': False,
@@ -0,0 +1,106 @@
+import re
+from typing import Dict, List, Optional
+
+# Pre-compiled patterns for the line-oriented quiz format
+QUESTION_RE = re.compile(r'^(?:Q(?:uestion)?\s*)?(\d+)[\.:)\s]\s*(.+)', re.IGNORECASE)
+OPTION_RE = re.compile(r'^[(\s]*([A-D])[\.:)\s]\s*(.+)', re.IGNORECASE)
+ANSWER_RES = [
+    re.compile(r'(?:correct\s*(?:answer|option)|answer|correct|solution)\s*:\s*([A-D])', re.IGNORECASE),
+    re.compile(r'^([A-D])\s*(?:is\s*(?:correct|the\s*answer))$', re.IGNORECASE),
+    re.compile(r'^\(([A-D])\)\s*(?:is\s*(?:correct|the\s*answer))$', re.IGNORECASE)
+]
+
+class LineStreamParser:
+    """Buffers streamed text into lines and emits items as soon as they are complete"""
+
+    def __init__(self):
+        self._buffer = ''
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Consume a chunk of text; return any items completed by it"""
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split('\n')
+        items = []
+        for line in lines:
+            line = line.strip()
+            if line:
+                items.extend(self._handle_line(line))
+        return items
+
+    def close(self) -> List[Dict]:
+        """Flush the trailing partial line and any item still being built"""
+        items = self.feed('\n')
+        items.extend(self._finish())
+        return items
+
+    def _handle_line(self, line: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def _finish(self) -> List[Dict]:
+        return []
+
+class QuizStreamParser(LineStreamParser):
+    """Parses 'Q1. / A) .. D) / Correct Answer: X' blocks into question dicts"""
+
+    def __init__(self):
+        super().__init__()
+        self.current: Optional[Dict] = None
+
+    def _is_complete(self) -> bool:
+        return bool(self.current and len(self.current['options']) == 4 and self.current['correct_option'])
+
+    def _finish(self) -> List[Dict]:
+        done = [self.current] if self._is_complete() else []
+        self.current = None
+        return done
+
+    def _handle_line(self, line: str) -> List[Dict]:
+        q_match = QUESTION_RE.match(line)
+        if q_match:
+            done = self._finish()
+            self.current = {
+                'question_statement': q_match.group(2).strip(),
+                'options': [],
+                'correct_option': None
+            }
+            return done
+
+        if self.current is None:
+            return []
+
+        opt_match = OPTION_RE.match(line)
+        if opt_match:
+            # Map A-D to positions 0-3
+            option_index = ord(opt_match.group(1).upper()) - ord('A')
+            while len(self.current['options']) <= option_index:
+                self.current['options'].append('')
+            self.current['options'][option_index] = opt_match.group(2).strip()
+            return []
+
+        for pattern in ANSWER_RES:
+            ans_match = pattern.search(line)
+            if ans_match:
+                self.current['correct_option'] = ord(ans_match.group(1).upper()) - ord('A') + 1
+                # The answer line closes a well-formed question, so emit it right away
+                if self._is_complete():
+                    return self._finish()
+                break
+        return []
+
+class FlashcardStreamParser(LineStreamParser):
+    """Parses 'Q: ... / A: ...' line pairs into flashcard dicts"""
+
+    def __init__(self, front_prefix: str = 'Q:', back_prefix: str = 'A:'):
+        super().__init__()
+        self.front_prefix = front_prefix
+        self.back_prefix = back_prefix
+        self.front: Optional[str] = None
+
+    def _handle_line(self, line: str) -> List[Dict]:
+        if line.startswith(self.front_prefix):
+            self.front = line[len(self.front_prefix):].strip()
+        elif line.startswith(self.back_prefix) and self.front:
+            card = {'front': self.front, 'back': line[len(self.back_prefix):].strip()}
+            self.front = None
+            return [card]
+        return []
@@ -0,0 +1,248 @@
+import inspect
+import json
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+import google.generativeai as genai
+
+QUIZ_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'questions': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'question': {'type': 'string'},
+                    'options': {'type': 'array', 'items': {'type': 'string'}, 'minItems': 4, 'maxItems': 4},
+                    'answer': {'type': 'string', 'enum': ['A', 'B', 'C', 'D']}
+                },
+                'required': ['question', 'options', 'answer']
+            }
+        }
+    },
+    'required': ['questions']
+}
+
+FLASHCARD_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'flashcards': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'front': {'type': 'string'},
+                    'back': {'type': 'string'}
+                },
+                'required': ['front', 'back']
+            }
+        }
+    },
+    'required': ['flashcards']
+}
+
+# Sections of a combined lecture pack and the JSON each one is returned as
+PACK_SECTION_SCHEMAS = {
+    'summary': {'type': 'string'},
+    'notes': {'type': 'string'},
+    'flashcards': FLASHCARD_SCHEMA['properties']['flashcards'],
+    'questions': QUIZ_SCHEMA['properties']['questions']
+}
+
+QUIZ_JSON_EXAMPLE = '{"questions": [{"question": "...", "options": ["...", "...", "...", "..."], "answer": "A"}]}'
+FLASHCARD_JSON_EXAMPLE = '{"flashcards": [{"front": "...", "back": "..."}]}'
+
+CODE_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.IGNORECASE)
+
+def json_generation_config(schema: Dict) -> Optional[Dict]:
+    """Native JSON mode settings if the installed SDK supports them, else None"""
+    params = inspect.signature(genai.types.GenerationConfig).parameters
+    if 'response_mime_type' not in params:
+        return None
+    config = {'response_mime_type': 'application/json'}
+    if 'response_schema' in params:
+        config['response_schema'] = schema
+    return config
+
+def lecture_pack_schema(sections: List[str]) -> Dict:
+    """Schema of a lecture pack response holding only the requested sections"""
+    return {
+        'type': 'object',
+        'properties': {section: PACK_SECTION_SCHEMAS[section] for section in sections},
+        'required': list(sections)
+    }
+
+def decode_json(text: str):
+    """Strictly decode a JSON response, tolerating a surrounding code fence; None if invalid"""
+    try:
+        return json.loads(CODE_FENCE_RE.sub('', text.strip()))
+    except ValueError:
+        return None
+
+def decode_json_items(text: str, key: str) -> Optional[List[Dict]]:
+    """Strictly decode {"<key>": [...]} or a bare array; None if the text is not that JSON"""
+    data = decode_json(text)
+    if isinstance(data, dict):
+        data = data.get(key)
+    if not isinstance(data, list):
+        return None
+    return [item for item in data if isinstance(item, dict)]
+
+def quiz_question_from_json(item: Dict) -> Optional[Dict]:
+    """Map a decoded JSON question onto the internal question format"""
+    options = item.get('options')
+    answer = item.get('answer')
+    if not isinstance(item.get('question'), str) or not isinstance(options, list):
+        return None
+    if isinstance(answer, str) and len(answer.strip()) == 1 and answer.strip().upper() in 'ABCD':
+        correct_option = ord(answer.strip().upper()) - ord('A') + 1
+    elif isinstance(answer, int) and 1 <= answer <= 4:
+        correct_option = answer
+    elif isinstance(answer, str) and answer in options:
+        correct_option = options.index(answer) + 1
+    else:
+        return None
+    return {
+        'question_statement': item['question'].strip(),
+        'options': [str(opt).strip() for opt in options],
+        'correct_option': correct_option
+    }
+
+class JsonItemStreamParser:
+    """Emits each object of the first JSON array as soon as its closing brace arrives"""
+
+    def __init__(self):
+        self.text = ''
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        self._item_start = None
+        self.items_seen = 0
+
+    def feed(self, chunk: str) -> List[Dict]:
+        self.text += chunk
+        items = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in '[{':
+                if ch == '{' and self._stack and self._stack[-1] == '[' and self._item_start is None:
+                    self._item_start = i
+                self._stack.append(ch)
+            elif ch in ']}' and self._stack:
+                self._stack.pop()
+                if ch == '}' and self._item_start is not None and self._stack and self._stack[-1] == '[':
+                    try:
+                        item = json.loads(text[self._item_start:i + 1])
+                        if isinstance(item, dict):
+                            items.append(item)
+                    except ValueError:
+                        pass
+                    self._item_start = None
+        self._pos = len(text)
+        self.items_seen += len(items)
+        return items
+
+    def close(self) -> List[Dict]:
+        return []
+
+class StructuredStreamParser:
+    """Streams JSON items, or hands the text to a line parser if the model ignored JSON mode.
+
+    The mode is decided from the first non-fence characters of the response and
+    is exposed as .mode ('json' or 'text') for parse statistics.
+    """
+
+    def __init__(self, fallback, convert: Optional[Callable[[Dict], Optional[Dict]]] = None):
+        self.fallback = fallback
+        self.convert = convert
+        self.json = JsonItemStreamParser()
+        self.mode: Optional[str] = None
+        self._head = ''
+
+    def _detect(self) -> Optional[str]:
+        head = self._head.lstrip()
+        if head.startswith('`'):
+            if '\n' not in head:
+                return None  # Wait for the rest of the code fence line
+            head = head.split('\n', 1)[1].lstrip()
+        if not head:
+            return None
+        return 'json' if head[0] in '{[' else 'text'
+
+    def _convert(self, items: List[Dict]) -> List[Dict]:
+        if not self.convert:
+            return items
+        return [item for item in map(self.convert, items) if item]
+
+    def feed(self, chunk: str) -> List[Dict]:
+        if self.mode is None:
+            self._head += chunk
+            self.mode = self._detect()
+            if self.mode is None:
+                return []
+            chunk = self._head
+        if self.mode == 'json':
+            return self._convert(self.json.feed(chunk))
+        return self.fallback.feed(chunk)
+
+    def close(self) -> List[Dict]:
+        if self.mode is None:
+            self.mode = 'text'
+            return self.fallback.feed(self._head) + self.fallback.close()
+        if self.mode == 'json':
+            return []
+        return self.fallback.close()
+
+class ParseStats:
+    """Process-wide counts of how generated responses were decoded"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.calls: Dict[str, Dict[str, int]] = {}
+
+    def record(self, component: str, outcome: str):
+        """outcome is 'json', 'text' (line-format parser) or 'failed'"""
+        with self.lock:
+            counts = self.counts.setdefault(component, {'json': 0, 'text': 0, 'failed': 0})
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def record_calls(self, component: str, calls: int):
+        """Model calls a successful generation took"""
+        with self.lock:
+            stats = self.calls.setdefault(component, {'generations': 0, 'calls': 0, 'single_call': 0})
+            stats['generations'] += 1
+            stats['calls'] += calls
+            stats['single_call'] += calls == 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self.lock:
+            report = {}
+            for component, counts in self.counts.items():
+                total = sum(counts.values())
+                report[component] = dict(counts, total=total,
+                                         json_success_rate=round(counts['json'] / total, 3) if total else None,
+                                         parse_success_rate=round((counts['json'] + counts['text']) / total, 3)
+                                         if total else None)
+            for component, stats in self.calls.items():
+                report.setdefault(component, {}).update(
+                    calls_per_generation=round(stats['calls'] / stats['generations'], 2),
+                    single_call_rate=round(stats['single_call'] / stats['generations'], 3)
+                )
+            return report
+
+# Global parse statistics shared by the AI services
+parse_stats = ParseStats()
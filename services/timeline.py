@@ -0,0 +1,98 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+class Timeline:
+    """Time-indexed transcript: sorted start offsets over one contiguous text blob.
+
+    starts holds each segment's start in milliseconds and offsets the position
+    of its text in the blob (plus a final end offset), both as compact 32-bit
+    arrays, so a lookup by time is a bisect and returning a window copies only
+    the text in it.
+    """
+
+    SEPARATOR = '\n'
+
+    def __init__(self, starts: array, offsets: array, text: str):
+        self.starts = starts
+        self.offsets = offsets
+        self.text = text
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Dict]) -> 'Timeline':
+        """Build from dicts with 'text' and 'start' (seconds), in time order"""
+        starts = array('I')
+        offsets = array('I')
+        parts = []
+        position = 0
+        for segment in segments:
+            text = ' '.join(segment.get('text', '').split())
+            if not text:
+                continue
+            start = int(round(segment.get('start', 0) * 1000))
+            if starts and start < starts[-1]:
+                start = starts[-1]  # Keep starts sorted for bisect
+            starts.append(start)
+            offsets.append(position)
+            parts.append(text)
+            position += len(text) + len(cls.SEPARATOR)
+        offsets.append(max(position - len(cls.SEPARATOR), 0))
+        return cls(starts, offsets, cls.SEPARATOR.join(parts))
+
+    @staticmethod
+    def _pack(values: array) -> bytes:
+        if sys.byteorder == 'big':
+            values = array(values.typecode, values)
+            values.byteswap()
+        return values.tobytes()
+
+    @staticmethod
+    def _unpack(data: bytes) -> array:
+        values = array('I')
+        values.frombytes(data)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+    def to_bytes(self) -> Tuple[bytes, bytes]:
+        """Little-endian starts and offsets, for storage"""
+        return self._pack(self.starts), self._pack(self.offsets)
+
+    @classmethod
+    def from_bytes(cls, starts: bytes, offsets: bytes, text: str) -> 'Timeline':
+        return cls(cls._unpack(starts), cls._unpack(offsets), text)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def duration(self) -> float:
+        return self.starts[-1] / 1000 if self.starts else 0.0
+
+    def index_at(self, seconds: float) -> int:
+        """Index of the segment playing at seconds (the last one starting at or before it)"""
+        return max(bisect_right(self.starts, int(seconds * 1000)) - 1, 0)
+
+    def segment(self, index: int) -> Dict[str, any]:
+        return {
+            'index': index,
+            'start': self.starts[index] / 1000,
+            'end': self.starts[index + 1] / 1000 if index + 1 < len(self.starts) else None,
+            'text': self.text[self.offsets[index]:self.offsets[index + 1]].rstrip(self.SEPARATOR)
+        }
+
+    def window(self, seconds: float, before: float = 30, after: float = 60) -> Dict[str, any]:
+        """Segments from before seconds ahead of the playhead to after seconds past it"""
+        if not self.starts:
+            return {'active': None, 'from': 0.0, 'to': 0.0, 'segments': []}
+        active = self.index_at(seconds)
+        first = min(bisect_left(self.starts, int((seconds - before) * 1000)), active)
+        last = max(bisect_right(self.starts, int((seconds + after) * 1000)), active + 1)
+        segments: List[Dict] = [self.segment(i) for i in range(first, last)]
+        return {
+            'active': active,
+            'from': segments[0]['start'],
+            'to': segments[-1]['end'] if segments[-1]['end'] is not None else self.duration,
+            'segments': segments
+        }
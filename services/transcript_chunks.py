@@ -0,0 +1,83 @@
+import hashlib
+import math
+import zlib
+from typing import Dict, Iterable, List
+
+def chunk_hash(text: str) -> str:
+    """Hash of a chunk's text, insensitive to case and spacing"""
+    return hashlib.sha1(' '.join(text.lower().split()).encode('utf-8')).hexdigest()
+
+def _boundary_divisor(segments: List[Dict], target_chars: int, min_chars: int) -> int:
+    """Power of two near the number of segments expected past min_chars, so small edits don't change it"""
+    average = sum(len(s['text']) for s in segments) / len(segments)
+    wanted = max((target_chars - min_chars) / max(average, 1), 1)
+    return 1 << round(wanted).bit_length() - 1
+
+def chunk_segments(segments: Iterable[Dict], target_chars: int = 2500, max_chars: int = 4000) -> List[Dict]:
+    """Split caption segments into chunks of about target_chars at content-defined boundaries.
+
+    A chunk ends after a segment whose text hashes to 0 modulo a divisor once
+    it holds half of target_chars, or before it would pass max_chars. Where a
+    chunk ends depends only on the text near the boundary, so editing part of
+    a transcript changes the hashes of the chunks around the edit and leaves
+    the rest alone. Segments are used as given; get_transcript has already
+    reduced them.
+    """
+    segments = [segment for segment in segments if segment.get('text')]
+    if not segments:
+        return []
+    min_chars = target_chars // 2
+    divisor = _boundary_divisor(segments, target_chars, min_chars)
+    chunks = []
+    current, size = [], 0
+
+    def close():
+        text = ' '.join(s['text'] for s in current)
+        chunks.append({'index': len(chunks), 'start': current[0].get('start', 0),
+                       'text': text, 'hash': chunk_hash(text)})
+
+    for segment in segments:
+        length = len(segment['text']) + 1
+        if current and size + length > max_chars:
+            close()
+            current, size = [], 0
+        current.append(segment)
+        size += length
+        if size >= min_chars and zlib.crc32(segment['text'].lower().encode('utf-8')) % divisor == 0:
+            close()
+            current, size = [], 0
+    if current:
+        close()
+    return chunks
+
+def group_chunks(chunks: List[Dict], max_groups: int = 4) -> List[Dict]:
+    """Merge adjacent chunks into at most max_groups groups, one model call each.
+
+    A group ends after a chunk whose hash is 0 modulo a power of two sized so
+    that about max_groups groups come out, so like chunk boundaries, group
+    boundaries move only around an edit. Surplus groups merge into the last.
+    Groups carry the same fields as chunks plus 'chunks', their chunk count.
+    A group is one prompt, so its text must be sent whole (max_chars=None)
+    rather than truncated like a full transcript.
+    """
+    if not chunks:
+        return []
+    max_groups = max(max_groups, 1)
+    divisor = 1 << (math.ceil(len(chunks) / max_groups) - 1).bit_length()
+    runs, current = [], []
+    for chunk in chunks:
+        current.append(chunk)
+        if int(chunk['hash'], 16) % divisor == 0:
+            runs.append(current)
+            current = []
+    if current:
+        runs.append(current)
+    while len(runs) > max_groups:
+        runs[-2:] = [runs[-2] + runs[-1]]
+
+    groups = []
+    for run in runs:
+        text = ' '.join(chunk['text'] for chunk in run)
+        groups.append({'index': len(groups), 'start': run[0]['start'], 'text': text,
+                       'hash': chunk_hash(text), 'chunks': len(run)})
+    return groups
@@ -0,0 +1,122 @@
+import math
+import re
+import threading
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Known caption annotations ([Music], [Applause], (laughter)) and music notes; other
+# brackets ("[0, 1]", "[x]") are speech
+NON_SPEECH_RE = re.compile(
+    r'[\[(]\s*(?:music|applause|laughter|laughs|laughing|cheering|inaudible|silence|noise|'
+    r'background noise|crosstalk|foreign|sound|blank_audio)\s*[\])]|[♪♫]+',
+    re.IGNORECASE
+)
+# Hesitations, plus discourse fillers only where set off by a comma
+FILLER_RE = re.compile(
+    r'(?<![\w-])(?:u+m+|u+h+|e+r+m+|uh-huh|mhm+|hmm+|ah+)(?![\w-])[,.]?'
+    r'|(?<![\w-])(?:you know|i mean),',
+    re.IGNORECASE
+)
+# A short function word repeated ("the the", "I I"), or any word said three or more
+# times in a row; a single repeat of other words is often meant ("had had", "that that")
+STUTTER_RE = re.compile(r'\b(the|a|an|i|and|to|of)(?:\s+\1\b)+|\b(\w+)(?:\s+\2\b){2,}', re.IGNORECASE)
+SPACE_BEFORE_PUNCT_RE = re.compile(r'\s+([,.!?])')
+MULTI_SPACE_RE = re.compile(r'\s{2,}')
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+WORD_RE = re.compile(r'\w+')
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini token count (about four characters per token)"""
+    return math.ceil(len(text) / 4)
+
+def clean_caption(text: str) -> str:
+    """Strip non-speech markers, fillers and stutters from one caption line"""
+    text = NON_SPEECH_RE.sub(' ', text)
+    text = FILLER_RE.sub(' ', text)
+    text = STUTTER_RE.sub(lambda match: match.group(1) or match.group(2), text)
+    text = SPACE_BEFORE_PUNCT_RE.sub(r'\1', text)
+    text = MULTI_SPACE_RE.sub(' ', text).strip()
+    return text.lstrip(',. ')
+
+def strip_overlap(previous: str, current: str, max_words: int = 20, min_words: int = 2) -> str:
+    """Drop the start of current that repeats the end of previous (rolling captions)"""
+    prev_words = previous.split()[-max_words:]
+    words = current.split()
+    for size in range(min(len(prev_words), len(words)), min_words - 1, -1):
+        if [w.lower() for w in prev_words[-size:]] == [w.lower() for w in words[:size]]:
+            return ' '.join(words[size:])
+    return current
+
+def iter_reduced_segments(segments: Iterable[Dict]) -> Iterator[Dict]:
+    """Yield caption entries with markers, fillers and overlapping repeats removed.
+
+    Entries left empty are dropped; the rest keep their original timing fields.
+    """
+    previous = ''
+    for entry in segments:
+        text = clean_caption(entry.get('text', ''))
+        if previous and text:
+            text = strip_overlap(previous, text)
+        if not text:
+            continue
+        yield dict(entry, text=text)
+        previous = text
+
+def reduce_segments(segments: Iterable[Dict]) -> List[Dict]:
+    """List form of iter_reduced_segments"""
+    return list(iter_reduced_segments(segments))
+
+def dedupe_sentences(text: str, threshold: float = 0.9, window: int = 50) -> str:
+    """Drop sentences nearly identical (word-set Jaccard >= threshold) to a recent one"""
+    kept = []
+    recent = deque(maxlen=window)
+    for sentence in SENTENCE_SPLIT_RE.split(text):
+        words = set(WORD_RE.findall(sentence.lower()))
+        if len(words) >= 4 and any(len(words & seen) / len(words | seen) >= threshold for seen in recent):
+            continue
+        if words:
+            recent.append(words)
+        kept.append(sentence)
+    return ' '.join(kept)
+
+def reduce_text(text: str, dedupe: bool = False) -> str:
+    """Apply the line-level cleanup (and optional sentence de-duplication) to plain text"""
+    text = clean_caption(text)
+    return dedupe_sentences(text) if dedupe else text
+
+def reduction_report(chars_before: int, chars_after: int) -> Dict[str, any]:
+    """Character and estimated token counts before and after reduction"""
+    tokens_before = math.ceil(chars_before / 4)
+    tokens_after = math.ceil(chars_after / 4)
+    return {
+        'chars_before': chars_before,
+        'chars_after': chars_after,
+        'tokens_before': tokens_before,
+        'tokens_after': tokens_after,
+        'reduction_ratio': round(1 - tokens_after / tokens_before, 3) if tokens_before else 0.0
+    }
+
+class ReductionStats:
+    """Recent per-video reduction reports"""
+
+    def __init__(self, window: int = 100):
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=window)
+
+    def record(self, video_id: Optional[str], report: Dict):
+        with self.lock:
+            self.recent.append(dict(report, video_id=video_id))
+
+    def snapshot(self) -> Dict[str, any]:
+        with self.lock:
+            recent = list(self.recent)
+        tokens_before = sum(r['tokens_before'] for r in recent)
+        tokens_after = sum(r['tokens_after'] for r in recent)
+        return {
+            'transcripts': len(recent),
+            'reduction_ratio': round(1 - tokens_after / tokens_before, 3) if tokens_before else None,
+            'recent': recent[-10:]
+        }
+
+# Global reduction statistics for transcripts fetched by this process
+reduction_stats = ReductionStats()
@@ -1,16 +1,98 @@
 from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api._errors import TooManyRequests, YouTubeRequestFailed
 from urllib.parse import urlparse, parse_qs
 import re
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import time
 import os
+import concurrent.futures
+from requests.exceptions import RequestException
+from .call_runner import CallRunner
+from .cancellation import CancellationToken, GenerationCancelled
+from .circuit_breaker import CircuitOpenError, get_breaker
+from .transcript_reducer import dedupe_sentences, iter_reduced_segments, reduction_report, reduction_stats
+
+SENTENCE_ENDINGS = ('.', '!', '?')
+
+def assemble_transcript(segments: Iterable[Dict], group_every: int = 12,
+                        min_chars: int = 50) -> Tuple[str, List[Dict]]:
+    """Build full_text and timestamp groups from segments in one pass, joining each string once.
+
+    A group starts at its first segment and closes at a sentence end or every
+    group_every segments, once it has more than min_chars characters.
+    """
+    parts = []
+    timestamps = []
+    group = []
+    group_chars = 0
+    group_start = None
+    for i, segment in enumerate(segments):
+        text = segment['text']
+        parts.append(text)
+        if group_start is None:
+            group_start = segment.get('start', 0)
+        group.append(text)
+        group_chars += len(text) + 1
+        if ((i > 0 and i % group_every == 0) or text.endswith(SENTENCE_ENDINGS)) and group_chars - 1 > min_chars:
+            timestamps.append({'text': ' '.join(group), 'start': group_start})
+            group = []
+            group_chars = 0
+            group_start = None
+
+    # Add final group if not empty
+    if group:
+        timestamps.append({'text': ' '.join(group), 'start': group_start})
+    return ' '.join(parts), timestamps
+
+# Outages and throttling, as opposed to videos without usable transcripts
+transcript_breaker = get_breaker('youtube_transcript', failure_exceptions=(
+    TooManyRequests, YouTubeRequestFailed, RequestException, TimeoutError, ConnectionError))
+
+# Transcript fetches run here so a hung request can be abandoned
+_transcript_runner = CallRunner(int(os.getenv('TRANSCRIPT_MAX_CONCURRENT_CALLS', 8)), 'transcript')
 
 class VideoService:
     def __init__(self):
         self.max_retries = 3
         self.retry_delay = 2  # seconds between retries
+        self.call_timeout = float(os.getenv('TRANSCRIPT_CALL_TIMEOUT', 30))
+        # Strip caption overlap, fillers and [Music]-style markers before prompting
+        self.reduce = os.getenv('TRANSCRIPT_REDUCTION', '1') == '1'
+        self.dedupe_sentences = os.getenv('TRANSCRIPT_DEDUPE_SENTENCES', '0') == '1'
 
-    def get_transcript(self, video_url: str) -> Dict[str, any]:
+    def _fetch_transcript(self, video_id: str, cancel_token: Optional[CancellationToken] = None) -> List[Dict]:
+        """Fetch raw transcript entries through the breaker, giving up after call_timeout or the job deadline"""
+        timeout = cancel_token.timeout_for(self.call_timeout) if cancel_token is not None else self.call_timeout
+
+        def fetch():
+            future = _transcript_runner.submit(lambda: YouTubeTranscriptApi.get_transcript(video_id))
+            try:
+                return future.result(timeout=timeout)
+            except concurrent.futures.TimeoutError:
+                _transcript_runner.abandon(future)
+                if cancel_token is not None and cancel_token.expired:
+                    raise GenerationCancelled('Content generation deadline exceeded')
+                raise TimeoutError(f"Transcript request timed out after {timeout:.0f}s")
+        return transcript_breaker.call(fetch)
+
+    def iter_segments(self, video_id: str, counts: Optional[Dict[str, int]] = None,
+                      cancel_token: Optional[CancellationToken] = None) -> Iterator[Dict]:
+        """Yield the video's caption segments as {'text', 'start', 'duration'}.
+
+        Text is stripped (and reduced, unless disabled); empty segments are skipped.
+        If given, counts['chars_before'] accumulates the raw caption length.
+        """
+        def normalized():
+            for entry in self._fetch_transcript(video_id, cancel_token):
+                text = entry.get('text', '').strip()
+                if counts is not None and text:
+                    counts['chars_before'] += len(text) + (1 if counts['chars_before'] else 0)
+                if text:
+                    yield {'text': text, 'start': entry.get('start', 0), 'duration': entry.get('duration', 0)}
+
+        return iter_reduced_segments(normalized()) if self.reduce else normalized()
+
+    def get_transcript(self, video_url: str, cancel_token: Optional[CancellationToken] = None) -> Dict[str, any]:
         """Get transcript from YouTube video with retry logic"""
         video_id = self._extract_video_id(video_url)
         if not video_id:
@@ -18,55 +100,42 @@ class VideoService:
 
         last_error = None
         for attempt in range(self.max_retries):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
             try:
-                transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-                if not transcript_list:
+                counts = {'chars_before': 0}
+                full_text, timestamps = assemble_transcript(self.iter_segments(video_id, counts, cancel_token))
+                if not full_text:
                     raise ValueError("No transcript available")
 
-                # Process transcript
-                full_text = ""
-                timestamps = []
-                current_segment = {"text": "", "start": 0}
-                
-                for i, entry in enumerate(transcript_list):
-                    text = entry.get('text', '').strip()
-                    if not text:
-                        continue
-
-                    # Add to full text with proper spacing
-                    if full_text and not full_text.endswith(('.', '!', '?')):
-                        full_text += " "
-                    full_text += text
-
-                    # Handle timestamp segments (every ~2 minutes or on major punctuation)
-                    current_segment["text"] += f" {text}"
-                    if (i > 0 and i % 12 == 0) or any(text.endswith(p) for p in ['.', '!', '?']):
-                        if len(current_segment["text"].strip()) > 50:  # Minimum segment length
-                            timestamps.append({
-                                "text": current_segment["text"].strip(),
-                                "start": current_segment["start"]
-                            })
-                            current_segment = {"text": "", "start": entry.get('start', 0)}
-
-                # Add final segment if not empty
-                if current_segment["text"].strip():
-                    timestamps.append({
-                        "text": current_segment["text"].strip(),
-                        "start": current_segment["start"]
-                    })
+                if self.reduce and self.dedupe_sentences:
+                    full_text = dedupe_sentences(full_text)
+                reduction = None
+                if self.reduce:
+                    reduction = reduction_report(counts['chars_before'], len(full_text))
+                    reduction_stats.record(video_id, reduction)
+                    print(f"[Video Service] {video_id}: transcript reduced from {reduction['tokens_before']} "
+                          f"to {reduction['tokens_after']} tokens ({reduction['reduction_ratio']:.0%})")
 
                 return {
                     'success': True,
                     'video_id': video_id,
-                    'full_text': full_text.strip(),
-                    'timestamps': timestamps
+                    'full_text': full_text,
+                    'timestamps': timestamps,
+                    'reduction': reduction
                 }
 
+            except (CircuitOpenError, GenerationCancelled):
+                raise  # Upstream is down or the job is over; retrying now would only hold the worker
             except Exception as e:
                 last_error = str(e)
                 print(f"Attempt {attempt + 1} failed: {last_error}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))  # Exponential backoff
+                    delay = self.retry_delay * (attempt + 1)  # Exponential backoff
+                    if cancel_token is None:
+                        time.sleep(delay)
+                    elif cancel_token.wait(delay):
+                        cancel_token.raise_if_cancelled()
                 continue
 
         raise ValueError(f"Failed to get transcript after {self.max_retries} attempts: {last_error}")
@@ -0,0 +1,24 @@
+import unittest
+from app import create_app, db
+
+class TestConfig:
+    SECRET_KEY = 'test'
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    TESTING = True
+    PROGRESS_BUS_URL = 'memory://'
+
+class AppTestCase(unittest.TestCase):
+    """Runs each test inside an app context on a fresh database built from config"""
+
+    config = TestConfig
+
+    def setUp(self):
+        self.app = create_app(self.config)
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
@@ -0,0 +1,92 @@
+import unittest
+from datetime import datetime
+from werkzeug.datastructures import MultiDict
+from app import db
+from app import admin_tables
+from app.models import Lecture, LectureSummary, Question, Quiz, Score, Subject, User
+from tests.helpers import AppTestCase
+
+class TestAdminTables(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.physics = Subject(name='Physics')
+        self.maths = Subject(name='Maths')
+        db.session.add_all([self.physics, self.maths])
+        db.session.flush()
+        # Repeated titles and dates, so pages break inside runs of equal sort keys
+        for i in range(12):
+            subject = self.physics if i % 3 else self.maths
+            lecture = Lecture(subject_id=subject.id, title=f'Lecture {i % 4}', video_url='https://youtu.be/aaaaaaaaaaa')
+            db.session.add(lecture)
+            db.session.flush()
+            quiz = Quiz(lecture_id=lecture.id, date_of_quiz=datetime(2024, 1, 1 + i % 3), time_duration=10)
+            db.session.add(quiz)
+            if i == 0:
+                db.session.add(LectureSummary(lecture_id=lecture.id, content='# Summary'))
+        db.session.flush()
+        quiz = Quiz.query.first()
+        db.session.add(Question(quiz_id=quiz.id, question_statement='What?', option1='a', option2='b',
+                                option3='c', option4='d', correct_option=1))
+        for i, scored in enumerate([9, 5, 5, 7]):
+            user = User(email=f's{i}@example.com', full_name=f'Student {i}', dob=datetime(2000, 1, 1))
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Score(quiz_id=quiz.id, user_id=user.id, total_scored=scored, total_questions=10, time_taken=5))
+        db.session.commit()
+
+    def walk(self, page, **params):
+        """Every item of a table, following cursors page by page"""
+        items, cursor, pages = [], None, 0
+        while True:
+            args = MultiDict(dict(params, limit=5, **({'cursor': cursor} if cursor else {})))
+            result = page(args)
+            items += result['items']
+            pages += 1
+            cursor = result['next_cursor']
+            if cursor is None:
+                return items, pages
+
+    def test_keyset_walk_visits_every_row_once(self):
+        for sort in ('newest', 'date', 'lecture'):
+            for order in ('asc', 'desc'):
+                items, pages = self.walk(admin_tables.quizzes, sort=sort, order=order)
+                ids = [item['id'] for item in items]
+                self.assertEqual(sorted(ids), [quiz.id for quiz in Quiz.query.order_by(Quiz.id)])
+                self.assertEqual(pages, 3)
+        items, _ = self.walk(admin_tables.lectures, sort='title')
+        self.assertEqual([item['title'] for item in items], sorted(item['title'] for item in items))
+
+    def test_filters(self):
+        items, _ = self.walk(admin_tables.lectures, subject_id=self.maths.id)
+        self.assertEqual(len(items), 4)
+        self.assertEqual({item['subject'] for item in items}, {'Maths'})
+        items, _ = self.walk(admin_tables.lectures, q='lecture 1')
+        self.assertEqual(len(items), 3)
+        self.assertEqual(self.walk(admin_tables.lectures, q='100%')[0], [])
+
+    def test_row_details(self):
+        quiz = admin_tables.quizzes(MultiDict({'sort': 'newest', 'order': 'asc', 'limit': 1}))['items'][0]
+        self.assertEqual((quiz['questions'], quiz['attempts'], quiz['avg_score']), (1, 4, 65.0))
+        lecture = admin_tables.lectures(MultiDict({'order': 'asc', 'limit': 1}))['items'][0]
+        self.assertTrue(lecture['has_summary'])
+        subjects = {item['name']: item for item in admin_tables.subjects(MultiDict())['items']}
+        self.assertEqual((subjects['Physics']['lectures'], subjects['Physics']['quizzes']), (8, 8))
+
+    def test_rankings_and_subject_stats(self):
+        items, _ = self.walk(admin_tables.rankings)
+        self.assertEqual([item['avg_score'] for item in items], [90.0, 70.0, 50.0, 50.0])
+        stats = admin_tables.subject_stats(MultiDict())['items']
+        self.assertEqual([(s['name'], s['avg_score'], s['median_score'], s['attempts']) for s in stats],
+                         [('Maths', 65.0, 60.0, 4)])
+
+    def test_bad_parameters(self):
+        with self.assertRaises(ValueError):
+            admin_tables.quizzes(MultiDict({'sort': 'remarks'}))
+        with self.assertRaises(ValueError):
+            admin_tables.quizzes(MultiDict({'cursor': 'not-a-cursor'}))
+        cursor = admin_tables.quizzes(MultiDict({'sort': 'date', 'limit': 2}))['next_cursor']
+        with self.assertRaises(ValueError):
+            admin_tables.quizzes(MultiDict({'sort': 'lecture', 'cursor': cursor}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from app import db
+from app.bulk_ingest import BulkIngestJob, clamp_concurrency, collect_items, parse_num_questions, resolve_playlist
+from app.generation_registry import generation_registry
+from app.models import Lecture, LectureSummary, Subject
+from app.progress_bus import progress_bus, InProcessTransport
+from tests.helpers import AppTestCase, TestConfig
+
+OPTIONS = {
+    'generate_summary': True,
+    'generate_flashcards': False,
+    'generate_notes': False,
+    'generate_quiz': False,
+    'num_questions': 10
+}
+
+def url(video_id):
+    return f'https://www.youtube.com/watch?v={video_id}'
+
+class FakeStages:
+    """Transcript and generation stand-ins that record calls and peak concurrency"""
+
+    def __init__(self, delay=0.02, failing_transcripts=(), failing_generations=()):
+        self.delay = delay
+        self.failing_transcripts = set(failing_transcripts)
+        self.failing_generations = set(failing_generations)
+        self.lock = threading.Lock()
+        self.active = {'transcript': 0, 'generation': 0}
+        self.peak = {'transcript': 0, 'generation': 0}
+        self.transcripts = []
+        self.generations = []
+
+    def _enter(self, stage):
+        with self.lock:
+            self.active[stage] += 1
+            self.peak[stage] = max(self.peak[stage], self.active[stage])
+
+    def _leave(self, stage):
+        with self.lock:
+            self.active[stage] -= 1
+
+    def fetch_transcript(self, video_url):
+        self._enter('transcript')
+        try:
+            time.sleep(self.delay)
+            with self.lock:
+                self.transcripts.append(video_url)
+            if video_url in self.failing_transcripts:
+                raise RuntimeError('captions disabled')
+            return {'full_text': f'Transcript of {video_url}', 'timestamps': []}
+        finally:
+            self._leave('transcript')
+
+    def generate(self, app, lecture, options, cancel_token, transcript_data=None):
+        from app.routes import copy_generated_content
+        self._enter('generation')
+        try:
+            time.sleep(self.delay)
+            with self.lock:
+                self.generations.append(lecture.id)
+            if lecture.video_url in self.failing_generations:
+                generation_registry.finish(lecture.id)
+                raise ValueError('Summary generation failed')
+            db.session.add(LectureSummary(lecture_id=lecture.id, content=transcript_data['full_text']))
+            db.session.commit()
+            for follower_id in generation_registry.finish(lecture.id):
+                copy_generated_content(lecture.id, db.session.get(Lecture, follower_id), options)
+            db.session.commit()
+            return True
+        finally:
+            self._leave('generation')
+
+class TestBulkIngestJob(AppTestCase):
+    def setUp(self):
+        # Generation threads need their own connections, which an in-memory database can't give them
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config = type('Config', (TestConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(self.tmpdir.name, 'test.db')})
+        super().setUp()
+        progress_bus.transport = InProcessTransport()
+        self.subject = Subject(name='Physics')
+        db.session.add(self.subject)
+        db.session.commit()
+
+    def tearDown(self):
+        super().tearDown()
+        self.tmpdir.cleanup()
+
+    def run_job(self, urls, stages, transcript_workers=8, generation_workers=4):
+        job = BulkIngestJob(self.app, self.subject.id, [{'url': u} for u in urls], OPTIONS,
+                            transcript_workers=transcript_workers, generation_workers=generation_workers,
+                            fetch_transcript=stages.fetch_transcript, generate=stages.generate)
+        job.create_lectures()
+        job.run()
+        return job.report()
+
+    def test_generates_every_video(self):
+        stages = FakeStages()
+        report = self.run_job([url(f'vid{i:08d}') for i in range(5)], stages)
+        self.assertEqual(report['counts'], {'done': 5})
+        self.assertTrue(report['finished'])
+        self.assertEqual(LectureSummary.query.count(), 5)
+
+    def test_pool_limits(self):
+        stages = FakeStages(delay=0.05)
+        self.run_job([url(f'vid{i:08d}') for i in range(8)], stages, transcript_workers=3, generation_workers=2)
+        self.assertLessEqual(stages.peak['transcript'], 3)
+        self.assertLessEqual(stages.peak['generation'], 2)
+        self.assertGreater(stages.peak['transcript'], 1)
+
+    def test_reuses_existing_content(self):
+        existing = Lecture(subject_id=self.subject.id, title='Earlier', video_url=url('reused00000'))
+        db.session.add(existing)
+        db.session.flush()
+        db.session.add(LectureSummary(lecture_id=existing.id, content='# Done before'))
+        db.session.commit()
+        stages = FakeStages()
+        report = self.run_job([url('reused00000')], stages)
+        self.assertEqual(report['items'][0]['status'], 'done')
+        self.assertEqual(report['items'][0]['reused_from'], existing.id)
+        self.assertEqual(stages.transcripts, [])
+
+    def test_duplicate_videos_coalesce(self):
+        stages = FakeStages()
+        report = self.run_job([url('dupe0000000'), url('dupe0000000')], stages)
+        self.assertEqual(len(stages.generations), 1)
+        self.assertEqual([item['status'] for item in report['items']], ['done', 'done'])
+        self.assertEqual(report['items'][1]['coalesced_with'], report['items'][0]['lecture_id'])
+        self.assertEqual(LectureSummary.query.count(), 2)
+
+    def test_failures_are_reported_per_item(self):
+        stages = FakeStages(failing_transcripts=[url('notrans0000')], failing_generations=[url('nogen000000')])
+        report = self.run_job([url('notrans0000'), url('nogen000000'), 'https://example.com/x', url('fine0000000')],
+                              stages)
+        statuses = {item['url']: (item['status'], item['error']) for item in report['items']}
+        self.assertEqual(statuses[url('notrans0000')], ('failed', 'Transcript fetch failed: captions disabled'))
+        self.assertEqual(statuses[url('nogen000000')], ('failed', 'Summary generation failed'))
+        self.assertEqual(statuses['https://example.com/x'], ('failed', 'Invalid YouTube URL'))
+        self.assertEqual(statuses[url('fine0000000')], ('done', None))
+
+    def test_report_is_shared_with_other_workers(self):
+        job = BulkIngestJob(self.app, self.subject.id, [{'url': url('shared00000')}], OPTIONS,
+                            fetch_transcript=FakeStages().fetch_transcript, generate=FakeStages().generate)
+        job.create_lectures()
+        job.run()
+        saved = BulkIngestJob.saved_report(job.id)
+        self.assertTrue(saved['finished'])
+        self.assertEqual(saved['counts'], {'done': 1})
+        self.assertIsNone(BulkIngestJob.saved_report('unknown'))
+
+class TestIngestItems(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_collect_items_from_every_source(self):
+        index = self.write('index.json', json.dumps({'PL1': [url('plist000001'), {'url': url('plist000002'), 'title': 'Two'}]}))
+        items = collect_items({
+            'urls': [url('plain000001')],
+            'items': [{'url': url('item0000001'), 'title': 'Item'}],
+            'csv': 'url,title\n' + url('csv00000001') + ',From CSV\n\n',
+            'playlist_id': 'PL1'
+        }, index)
+        self.assertEqual([item['url'] for item in items],
+                         [url('plain000001'), url('item0000001'), url('csv00000001'), url('plist000001'), url('plist000002')])
+        self.assertEqual([item['title'] for item in items], [None, 'Item', 'From CSV', None, 'Two'])
+
+    def test_resolve_playlist_from_csv_index(self):
+        index = self.write('index.csv', f'playlist_id,url,title\nPL1,{url("a0000000000")},A\nPL2,{url("b0000000000")},\n')
+        self.assertEqual(resolve_playlist('PL2', index), [{'url': url('b0000000000'), 'title': None}])
+
+    def test_playlist_errors(self):
+        with self.assertRaises(ValueError):
+            collect_items({'playlist_id': 'PL1'})
+        index = self.write('index.json', '{}')
+        with self.assertRaises(ValueError):
+            collect_items({'playlist_id': 'missing'}, index)
+
+    def test_clamp_concurrency(self):
+        self.assertEqual(clamp_concurrency(None, 4), 4)
+        self.assertEqual(clamp_concurrency('2', 4), 2)
+        self.assertEqual(clamp_concurrency(500, 4), 4)
+        self.assertEqual(clamp_concurrency(0, 4), 1)
+        with self.assertRaises(ValueError):
+            clamp_concurrency('abc', 4)
+
+    def test_parse_num_questions(self):
+        self.assertEqual(parse_num_questions('12'), 12)
+        for value in ['abc', None, True, 7.5, 4, 51, '100']:
+            with self.assertRaises(ValueError):
+                parse_num_questions(value)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import threading
+import time
+from unittest.mock import patch
+from services.call_runner import CallRunner
+from services.cancellation import CancellationToken, GenerationCancelled
+from services.llm_client import LLMClient
+from services.video_service import VideoService
+
+class SlowModel:
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return prompt
+
+class TestCancellation(unittest.TestCase):
+    def test_cancel_raises_at_checkpoint(self):
+        token = CancellationToken()
+        token.raise_if_cancelled()
+        token.cancel('Cancelled by admin')
+        with self.assertRaises(GenerationCancelled) as ctx:
+            token.raise_if_cancelled()
+        self.assertIn('admin', str(ctx.exception))
+
+    def test_deadline_clamps_call_timeout(self):
+        token = CancellationToken(deadline_seconds=5)
+        self.assertLessEqual(token.timeout_for(60), 5)
+        self.assertEqual(CancellationToken().timeout_for(60), 60)
+
+    def test_expired_deadline_cancels(self):
+        token = CancellationToken(deadline_seconds=0.01)
+        time.sleep(0.02)
+        self.assertTrue(token.cancelled)
+        with self.assertRaises(GenerationCancelled):
+            token.raise_if_cancelled()
+
+    def test_client_returns_fast_response(self):
+        client = LLMClient(SlowModel(0), timeout=1)
+        self.assertEqual(client.generate_content('hello'), 'hello')
+
+    def test_client_times_out(self):
+        client = LLMClient(SlowModel(1), timeout=0.2)
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            client.generate_content('hello')
+        self.assertLess(time.monotonic() - start, 0.9)
+
+    def test_client_stops_waiting_on_cancel(self):
+        client = LLMClient(SlowModel(2), timeout=10)
+        token = CancellationToken()
+        threading.Timer(0.1, token.cancel, args=('Lecture was deleted',)).start()
+        start = time.monotonic()
+        with self.assertRaises(GenerationCancelled):
+            client.generate_content('hello', cancel_token=token)
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_client_skips_call_when_already_cancelled(self):
+        model = SlowModel(0)
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(GenerationCancelled):
+            LLMClient(model).generate_content('hello', cancel_token=token)
+        self.assertEqual(model.calls, 0)
+
+    def test_abandoned_calls_free_their_slot(self):
+        runner = CallRunner(1, 'test')
+        hung = threading.Event()
+        stuck = runner.submit(hung.wait)
+        queued = runner.submit(lambda: 'queued')
+        time.sleep(0.05)
+        self.assertFalse(queued.done())
+        runner.abandon(stuck)
+        self.assertEqual(queued.result(timeout=1), 'queued')
+        self.assertEqual(runner.abandoned, 1)
+        hung.set()
+        stuck.result(timeout=1)
+        self.assertEqual(runner.abandoned, 0)
+
+    def test_transcript_fetch_stops_at_deadline(self):
+        service = VideoService()
+        token = CancellationToken(deadline_seconds=0.2)
+        with patch('services.video_service.YouTubeTranscriptApi.get_transcript', side_effect=lambda _: time.sleep(2)):
+            start = time.monotonic()
+            with self.assertRaises(GenerationCancelled):
+                service.get_transcript('https://youtu.be/aaaaaaaaaaa', cancel_token=token)
+        self.assertLess(time.monotonic() - start, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import time
+import unittest
+from services.chapterizer import chapterize, tokenize
+
+TOPICS = [
+    'photosynthesis chlorophyll light glucose leaf plant energy sunlight carbon'.split(),
+    'derivative limit slope tangent function calculus rate change curve'.split(),
+    'revolution monarchy parliament king war treaty france empire'.split(),
+    'protein enzyme amino acid folding substrate catalyst molecule'.split()
+]
+FILLER = 'so the a of and is we this that it in to okay'.split()
+
+def lecture(blocks_per_topic=60, seconds_per_block=20, seed=1):
+    """Timed transcript groups that change topic every blocks_per_topic groups"""
+    rng = random.Random(seed)
+    segments = []
+    for topic in TOPICS:
+        for _ in range(blocks_per_topic):
+            words = [rng.choice(topic) if rng.random() < 0.4 else rng.choice(FILLER) for _ in range(20)]
+            segments.append({'text': ' '.join(words) + '.', 'start': len(segments) * seconds_per_block})
+    return segments
+
+class TestChapterizer(unittest.TestCase):
+    def test_cuts_at_topic_shifts_and_titles_by_keywords(self):
+        chapters = chapterize(lecture())
+        self.assertEqual([chapter['start'] for chapter in chapters], [0, 1200, 2400, 3600])
+        for chapter, topic in zip(chapters, TOPICS):
+            self.assertTrue(set(chapter['keywords']) <= set(topic))
+            self.assertEqual(chapter['title'], ', '.join(chapter['keywords']).capitalize())
+
+    def test_short_transcript_is_one_chapter(self):
+        chapters = chapterize([{'text': 'Gradient descent minimises the loss.', 'start': 4.2}])
+        self.assertEqual(chapters, [{'title': 'Descent, gradient, loss', 'start': 4,
+                                     'keywords': ['descent', 'gradient', 'loss']}])
+        self.assertEqual(chapterize([]), [])
+
+    def test_chapters_respect_min_seconds(self):
+        chapters = chapterize(lecture(), min_seconds=1500)
+        starts = [chapter['start'] for chapter in chapters]
+        self.assertTrue(all(b - a >= 1500 for a, b in zip(starts, starts[1:])))
+
+    def test_tokenize_drops_stopwords_and_spoken_fillers(self):
+        self.assertEqual(tokenize("Okay so we're gonna look at Newton's laws"), ["newton's", 'laws'])
+
+    def test_multi_hour_lecture_is_fast(self):
+        segments = lecture(blocks_per_topic=400, seconds_per_block=10)  # ~4.5 hours
+        started = time.perf_counter()
+        chapterize(segments)
+        self.assertLess(time.perf_counter() - started, 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import time
+import unittest
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.cancellation import GenerationCancelled
+
+def fail(exc):
+    raise exc
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker('upstream', failure_threshold=2, reset_timeout=0.1,
+                                      failure_exceptions=(TimeoutError,))
+
+    def trip(self):
+        for _ in range(2):
+            with self.assertRaises(TimeoutError):
+                self.breaker.call(fail, TimeoutError())
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        self.trip()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        calls = []
+        start = time.monotonic()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(calls.append, 1)
+        self.assertEqual(calls, [])
+        self.assertLess(time.monotonic() - start, 0.01)
+        self.assertEqual(self.breaker.snapshot()['rejected'], 1)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        self.trip()
+        time.sleep(0.15)
+        with self.assertRaises(TimeoutError):
+            self.breaker.call(fail, TimeoutError())
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        time.sleep(0.15)
+        self.assertEqual(self.breaker.snapshot()['state'], CircuitBreaker.HALF_OPEN)
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_only_one_probe_while_half_open(self):
+        self.trip()
+        time.sleep(0.15)
+        self.breaker.before_call()  # Probe in flight
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: 'ok')
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+
+    def test_other_errors_do_not_count(self):
+        for exc in (ValueError('no transcript'), GenerationCancelled('cancelled'), ValueError('again')):
+            with self.assertRaises(type(exc)):
+                self.breaker.call(fail, exc)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.failures, 0)
+
+if __name__ == '__main__':
+    unittest.main()
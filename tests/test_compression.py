@@ -0,0 +1,64 @@
+import gzip
+import unittest
+from flask import Flask, Response, jsonify
+from app.compression import Compressor
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['COMPRESS_MIN_SIZE'] = 100
+        self.compressor = Compressor()
+        self.compressor.init_app(self.app)
+        page = '<p>' + 'Waves and oscillations. ' * 200 + '</p>'
+
+        @self.app.route('/page')
+        def page_view():
+            return page
+
+        @self.app.route('/small')
+        def small_view():
+            return '<p>hi</p>'
+
+        @self.app.route('/data')
+        def data_view():
+            return jsonify(items=['flashcard'] * 200)
+
+        @self.app.route('/image')
+        def image_view():
+            return Response(b'\x89PNG' * 500, mimetype='image/png')
+
+        @self.app.route('/events')
+        def events_view():
+            return Response((f'data: {i}\n\n' * 50 for i in range(3)), mimetype='text/event-stream')
+
+        self.page = page
+        self.client = self.app.test_client()
+
+    def test_gzips_html(self):
+        response = self.client.get('/page', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertLess(len(response.data), len(self.page) // 10)
+        self.assertEqual(gzip.decompress(response.data).decode(), self.page)
+
+    def test_gzips_json(self):
+        response = self.client.get('/data', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+
+    def test_respects_accept_encoding(self):
+        self.assertNotIn('Content-Encoding', self.client.get('/page').headers)
+        response = self.client.get('/page', headers={'Accept-Encoding': 'gzip;q=0'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_skips_small_and_binary_responses(self):
+        for url in ('/small', '/image'):
+            response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+            self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_event_stream_passes_through(self):
+        response = self.client.get('/events', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertTrue(response.data.startswith(b'data: 0'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from datetime import datetime
+from flask import flash
+from flask_login import login_user
+from app import db
+from app.conditional import conditional_page
+from app.models import User
+from tests.helpers import AppTestCase
+
+class TestConditionalPage(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User(email='u@example.com', full_name='U', dob=datetime(2000, 1, 1))
+        db.session.add(self.user)
+        db.session.commit()
+        self.renders = []
+
+    def render(self):
+        self.renders.append(1)
+        return 'page'
+
+    def get(self, parts, headers=None, last_modified=None):
+        with self.app.test_request_context(headers=headers or {}):
+            login_user(self.user)
+            return conditional_page(parts, self.render, last_modified=last_modified)
+
+    def test_matching_etag_is_not_modified(self):
+        first = self.get(('lecture', 1, 'v1'))
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('private', first.headers['Cache-Control'])
+        second = self.get(('lecture', 1, 'v1'), {'If-None-Match': first.headers['ETag']})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(len(self.renders), 1)
+
+    def test_new_version_renders_again(self):
+        first = self.get(('lecture', 1, 'v1'))
+        second = self.get(('lecture', 1, 'v2'), {'If-None-Match': first.headers['ETag']})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(self.renders), 2)
+
+    def test_if_modified_since(self):
+        when = datetime(2024, 5, 1, 12, 0, 0, 500)
+        first = self.get(('attempt', 1), last_modified=when)
+        second = self.get(('attempt', 2), {'If-Modified-Since': first.headers['Last-Modified']}, last_modified=when)
+        self.assertEqual(second.status_code, 304)
+
+    def test_pending_flash_skips_validators(self):
+        with self.app.test_request_context():
+            login_user(self.user)
+            flash('Saved')
+            response = conditional_page(('lecture', 1), self.render)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response.headers)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import random
+import time
+import unittest
+from unittest.mock import patch
+from services.extractive_summary import extract_key_sentences, extractive_summary, split_sentences
+from services.llm_client import LLMClient
+
+LECTURE = ("Photosynthesis turns light energy into chemical energy stored in glucose. "
+           "Plants capture light with chlorophyll in the chloroplasts of leaf cells. "
+           "My cat was asleep on the keyboard all through last weekend. "
+           "The light reactions split water and release oxygen as a by-product. "
+           "Glucose made by photosynthesis fuels the plant and the animals that eat it. "
+           "Chlorophyll absorbs red and blue light but reflects green light. "
+           "The Calvin cycle fixes carbon dioxide into glucose using the energy from light.")
+
+class FailingModel:
+    def generate_content(self, prompt, **kwargs):
+        raise ConnectionError('model unavailable')
+
+class TestExtractiveSummary(unittest.TestCase):
+    def test_picks_central_sentences_in_order(self):
+        sentences = extract_key_sentences(LECTURE, count=3)
+        self.assertEqual(len(sentences), 3)
+        self.assertFalse(any('cat' in sentence for sentence in sentences))
+        order = [LECTURE.index(sentence) for sentence in sentences]
+        self.assertEqual(order, sorted(order))
+
+    def test_unpunctuated_captions_are_split(self):
+        pieces = split_sentences(' '.join(['word'] * 100), max_words=40)
+        self.assertEqual([len(piece.split()) for piece in pieces], [40, 40, 20])
+
+    def test_markdown_output(self):
+        summary = extractive_summary(LECTURE, count=2)
+        self.assertTrue(summary.startswith('# Key Points\n\n- '))
+        self.assertEqual(extractive_summary(''), '')
+
+    def test_long_transcript_within_a_second(self):
+        rng = random.Random(0)
+        vocabulary = LECTURE.lower().replace('.', '').split()
+        text = ' '.join(' '.join(rng.choice(vocabulary) for _ in range(15)) + '.' for _ in range(5000))
+        started = time.perf_counter()
+        self.assertEqual(len(extract_key_sentences(text, count=8)), 8)
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+    def test_generate_summary_falls_back_when_model_fails(self):
+        from services.ai_service import LectureAIService
+        with patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'}):
+            service = LectureAIService()
+        service.llm = LLMClient(FailingModel())
+        summary = service.generate_summary(LECTURE)
+        self.assertTrue(summary.startswith('# Key Points'))
+        self.assertIn('Photosynthesis', summary)
+
+if __name__ == '__main__':
+    unittest.main()
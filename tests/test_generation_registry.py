@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+from app import db
+from app.models import Lecture, LectureSummary, Subject
+from app.progress_bus import progress_bus, InProcessTransport, SQLiteLogTransport
+from app.generation_registry import GenerationRegistry
+from tests.helpers import AppTestCase
+
+OPTIONS = {
+    'generate_summary': True,
+    'generate_flashcards': True,
+    'generate_notes': False,
+    'generate_quiz': False,
+    'num_questions': 10
+}
+
+class TestGenerationRegistry(unittest.TestCase):
+    def setUp(self):
+        progress_bus.transport = InProcessTransport()
+        self.registry = GenerationRegistry()
+        self.key = GenerationRegistry.make_key('abcdefghijk', OPTIONS)
+
+    def test_key_ignores_question_count_without_quiz(self):
+        other = dict(OPTIONS, num_questions=20)
+        self.assertEqual(self.key, GenerationRegistry.make_key('abcdefghijk', other))
+        self.assertNotEqual(self.key, GenerationRegistry.make_key('abcdefghijk', dict(OPTIONS, generate_notes=True)))
+
+    def test_second_caller_joins_leader(self):
+        self.assertIsNone(self.registry.join_or_start(self.key, 1))
+        self.assertEqual(self.registry.join_or_start(self.key, 2), 1)
+
+    def test_follower_gets_replayed_and_live_events(self):
+        self.registry.join_or_start(self.key, 1)
+        self.registry.publish(1, {'component': 'transcript', 'progress': 100})
+        self.registry.join_or_start(self.key, 2)
+        self.registry.publish(1, {'component': 'summary', 'progress': 100})
+
+        sub = progress_bus.subscribe(2)
+        self.assertEqual(sub.get(timeout=1)['component'], 'transcript')
+        self.assertEqual(sub.get(timeout=1)['component'], 'summary')
+
+    def test_finish_returns_followers_and_frees_key(self):
+        self.registry.join_or_start(self.key, 1)
+        self.registry.join_or_start(self.key, 2)
+        self.registry.join_or_start(self.key, 3)
+        self.assertTrue(self.registry.detach(3))
+        self.assertEqual(self.registry.finish(1), [2])
+        self.assertIsNone(self.registry.join_or_start(self.key, 4))
+
+    def test_promote_hands_job_to_first_follower(self):
+        self.registry.join_or_start(self.key, 1)
+        self.registry.join_or_start(self.key, 2)
+        self.registry.join_or_start(self.key, 3)
+        self.assertEqual(self.registry.promote(1), 2)
+        self.assertEqual(self.registry.followers(2), [3])
+        self.registry.publish(2, {'component': 'summary', 'progress': 100})
+        self.assertEqual(progress_bus.subscribe(3).get(timeout=1)['component'], 'summary')
+        self.assertEqual(self.registry.finish(2), [3])
+        self.assertIsNone(self.registry.promote(3))
+
+class TestCrossWorkerRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        progress_bus.transport = SQLiteLogTransport(os.path.join(self.tmpdir.name, 'bus.db'), poll_interval=0.01)
+        self.key = GenerationRegistry.make_key('abcdefghijk', OPTIONS)
+
+    def tearDown(self):
+        progress_bus.transport = InProcessTransport()
+        self.tmpdir.cleanup()
+
+    def test_workers_share_one_job(self):
+        # Two registries stand in for two gunicorn workers sharing the bus file
+        first, second = GenerationRegistry(), GenerationRegistry()
+        self.assertIsNone(first.join_or_start(self.key, 1))
+        self.assertEqual(second.join_or_start(self.key, 2), 1)
+        first.publish(1, {'component': 'summary', 'progress': 100})
+        sub = progress_bus.subscribe(2)
+        self.assertEqual(sub.get(timeout=1)['component'], 'summary')
+        sub.close()
+        self.assertEqual(first.finish(1), [2])
+
+    def test_follower_detached_from_another_worker(self):
+        first, second = GenerationRegistry(), GenerationRegistry()
+        first.join_or_start(self.key, 1)
+        first.join_or_start(self.key, 2)
+        self.assertTrue(second.detach(2))
+        self.assertEqual(first.finish(1), [])
+
+    def test_stale_claim_is_taken_over(self):
+        first, second = GenerationRegistry(ttl=0), GenerationRegistry(ttl=0)
+        first.join_or_start(self.key, 1)
+        self.assertIsNone(second.join_or_start(self.key, 2))
+
+class TestPromoteFollower(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        progress_bus.transport = InProcessTransport()
+        subject = Subject(name='Physics')
+        db.session.add(subject)
+        db.session.flush()
+        self.leader = Lecture(subject_id=subject.id, title='Waves', video_url='https://youtu.be/abcdefghijk')
+        self.follower = Lecture(subject_id=subject.id, title='Waves again', video_url='https://youtu.be/abcdefghijk')
+        db.session.add_all([self.leader, self.follower])
+        db.session.commit()
+
+    def test_content_moves_to_promoted_follower(self):
+        from app.routes import promote_follower
+        from app.generation_registry import generation_registry
+        key = GenerationRegistry.make_key('abcdefghijk', OPTIONS)
+        generation_registry.join_or_start(key, self.leader.id)
+        generation_registry.join_or_start(key, self.follower.id)
+        db.session.add(LectureSummary(lecture_id=self.leader.id, content='# Summary'))
+        lecture = promote_follower(self.leader.id)
+        self.assertEqual(lecture.id, self.follower.id)
+        db.session.commit()
+        self.assertEqual(LectureSummary.query.one().lecture_id, self.follower.id)
+        self.assertEqual(generation_registry.finish(self.follower.id), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from app import db
+from app.models import Lecture, LectureNote, LectureSummary, Subject
+from services.markdown_renderer import markdown_renderer
+from tests.helpers import AppTestCase
+
+class TestMarkdownRenderer(unittest.TestCase):
+    def test_renders_markdown(self):
+        html = markdown_renderer.render('# Waves\n\n- **Amplitude**\n- Period\n\n```\nx < 3\n```')
+        self.assertIn('<h1>Waves</h1>', html)
+        self.assertIn('<li><strong>Amplitude</strong></li>', html)
+        self.assertIn('x &lt; 3', html)
+
+    def test_strips_unsafe_markup(self):
+        html = markdown_renderer.render('Hi <script>alert(1)</script> <img src=x onerror=alert(1)> '
+                                        '[link](javascript:alert(1)) [ok](https://example.com)')
+        self.assertNotIn('<script', html)
+        self.assertNotIn('<img', html)
+        self.assertNotIn('javascript:', html)
+        self.assertIn('<a href="https://example.com">ok</a>', html)
+
+    def test_legacy_html_passes_through(self):
+        legacy = '<h1>Old</h1>\n<ul>\n<li>item</li>\n</ul>'
+        self.assertEqual(markdown_renderer.render(legacy), legacy)
+
+class TestRenderedContent(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        subject = Subject(name='Physics')
+        db.session.add(subject)
+        db.session.flush()
+        self.lecture = Lecture(subject_id=subject.id, title='Waves', video_url='https://youtu.be/aaaaaaaaaaa')
+        db.session.add(self.lecture)
+        db.session.commit()
+
+    def test_html_rendered_when_content_is_set(self):
+        summary = LectureSummary(lecture_id=self.lecture.id, content='# Summary')
+        self.assertEqual(summary.content_html, '<h1>Summary</h1>')
+        summary.content = '## Changed'
+        self.assertEqual(summary.content_html, '<h2>Changed</h2>')
+
+    def test_backfill_command(self):
+        db.session.add(LectureNote(lecture_id=self.lecture.id, content='**Notes**'))
+        db.session.commit()
+        LectureNote.query.update({'content_html': None})
+        db.session.commit()
+        result = self.app.test_cli_runner().invoke(args=['render-content'])
+        self.assertIn('Rendered 1 lecture_note rows', result.output)
+        db.session.expire_all()
+        self.assertEqual(LectureNote.query.one().content_html, '<p><strong>Notes</strong></p>')
+
+if __name__ == '__main__':
+    unittest.main()
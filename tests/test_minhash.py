@@ -0,0 +1,118 @@
+import unittest
+from datetime import datetime
+from app import db
+from app.dedup import dedupe_existing, near_duplicate_guard
+from app.models import Lecture, LectureFlashcard, Question, Quiz, Score, Subject, User
+from app.question_bank import question_bank
+from services.item_pool import ItemPool, normalize_key
+from services.minhash import NearDuplicateIndex, jaccard, shingles
+from tests.helpers import AppTestCase
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def test_paraphrase_is_rejected(self):
+        index = NearDuplicateIndex()
+        self.assertTrue(index.add(1, 'What is the main function of the mitochondria in a cell?'))
+        self.assertFalse(index.add(2, 'What is the main function of mitochondria in the cell'))
+        self.assertTrue(index.add(3, 'Which organelle carries out photosynthesis in plant leaves?'))
+        self.assertEqual(len(index), 2)
+
+    def test_numeric_variants_are_distinct(self):
+        a, b = shingles('What is the derivative of x^2?'), shingles('What is the derivative of x^3?')
+        self.assertLess(jaccard(a, b), 0.6)
+        index = NearDuplicateIndex()
+        self.assertTrue(index.add(1, 'What is the derivative of x^2?'))
+        self.assertTrue(index.add(2, 'What is the derivative of x^3?'))
+
+    def test_item_pool_uses_near_duplicate_index(self):
+        pool = ItemPool(3, key=lambda card: normalize_key(card['front']), near_duplicates=NearDuplicateIndex())
+        for front in ('Define osmosis in plant cells', 'Define osmosis in plant cells.',
+                      'Define osmosis for plant cells', 'Define diffusion across membranes'):
+            pool.add({'front': front})
+        self.assertEqual([card['front'] for card in pool.items],
+                         ['Define osmosis in plant cells', 'Define diffusion across membranes'])
+
+class TestDuplicateGuard(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        near_duplicate_guard._indexes.clear()
+        subject = Subject(name='Biology')
+        db.session.add(subject)
+        db.session.flush()
+        self.lectures = [Lecture(subject_id=subject.id, title=f'Cells {i}', video_url='https://youtu.be/aaaaaaaaaaa')
+                         for i in range(2)]
+        db.session.add_all(self.lectures)
+        db.session.commit()
+
+    def cards(self, *fronts):
+        return [{'front': front, 'back': 'Answer'} for front in fronts]
+
+    def test_guard_rejects_paraphrases_of_stored_rows(self):
+        lecture = self.lectures[0]
+        db.session.add(LectureFlashcard(lecture_id=lecture.id, front='What does the mitochondria produce?', back='ATP'))
+        db.session.commit()
+        kept = near_duplicate_guard.filter('flashcards', lecture, self.cards(
+            'What does a mitochondria produce', 'What is a ribosome?', 'What is the ribosome'), lambda c: c['front'])
+        self.assertEqual([c['front'] for c in kept], ['What is a ribosome?'])
+        for card in kept:
+            db.session.add(LectureFlashcard(lecture_id=lecture.id, front=card['front'], back=card['back']))
+        db.session.commit()
+        # Index is reused after the guard's own inserts, rebuilt after outside changes
+        index = near_duplicate_guard.index('flashcards', ('lecture', lecture.id))
+        self.assertEqual(len(index), 2)
+        LectureFlashcard.query.filter_by(lecture_id=lecture.id).delete()
+        db.session.commit()
+        self.assertEqual(len(near_duplicate_guard.index('flashcards', ('lecture', lecture.id))), 0)
+
+    def test_pending_items_keep_distinct_keys(self):
+        lecture = self.lectures[0]
+        cards = []
+        for front in ('Define osmosis in plant cells', 'What is a ribosome?'):
+            # One list object reused across calls, as a freed list's id() can be
+            cards[:] = self.cards(front)
+            for card in near_duplicate_guard.filter('flashcards', lecture, cards, lambda c: c['front']):
+                db.session.add(LectureFlashcard(lecture_id=lecture.id, front=card['front'], back=card['back']))
+            db.session.commit()
+        self.assertEqual(len(near_duplicate_guard.index('flashcards', ('lecture', lecture.id))), 2)
+
+    def test_scope_setting(self):
+        db.session.add(LectureFlashcard(lecture_id=self.lectures[0].id, front='Define osmosis', back='Water'))
+        db.session.commit()
+        card = self.cards('Define osmosis.')
+        self.assertEqual(len(near_duplicate_guard.filter('flashcards', self.lectures[1], card, lambda c: c['front'])), 1)
+        self.app.config['DEDUP_SCOPE'] = 'subject'
+        self.assertEqual(len(near_duplicate_guard.filter('flashcards', self.lectures[1], card, lambda c: c['front'])), 0)
+        self.app.config['DEDUP_SCOPE'] = 'off'
+        self.assertEqual(len(near_duplicate_guard.filter('flashcards', self.lectures[0], card, lambda c: c['front'])), 1)
+
+    def test_question_bank_skips_paraphrases(self):
+        questions = [{'question_statement': statement, 'options': ['ATP', 'DNA', 'RNA', 'Fat'], 'correct_option': 1}
+                     for statement in ('What does the mitochondria produce?', 'What do mitochondria produce?')]
+        self.assertEqual(question_bank.add(self.lectures[0].id, questions), 1)
+
+    def test_bulk_dedupe_keeps_oldest_and_spares_attempted_quizzes(self):
+        lecture = self.lectures[0]
+        db.session.add_all([LectureFlashcard(lecture_id=lecture.id, front=front, back='b') for front in
+                            ('Define osmosis', 'Define osmosis!', 'Define diffusion')])
+        user = User(email='s@example.com', full_name='S', dob=datetime(2000, 1, 1))
+        attempted, fresh = [Quiz(lecture_id=lecture.id, date_of_quiz=datetime(2024, 1, 1), time_duration=10)
+                            for _ in range(2)]
+        db.session.add_all([user, attempted, fresh])
+        db.session.flush()
+        for quiz in (attempted, fresh):
+            db.session.add(Question(quiz_id=quiz.id, question_statement='What is osmosis?',
+                                    option1='a', option2='b', option3='c', option4='d', correct_option=1))
+        db.session.add(Score(quiz_id=attempted.id, user_id=user.id, total_scored=1, total_questions=1, time_taken=1))
+        db.session.commit()
+
+        report = dedupe_existing('flashcards', dry_run=True)
+        self.assertEqual((report['rows'], report['duplicates'], report['removed']), (3, 1, 0))
+        dedupe_existing('flashcards')
+        dedupe_existing('quiz_questions')
+        db.session.commit()
+        self.assertEqual([c.front for c in LectureFlashcard.query.order_by(LectureFlashcard.id)],
+                         ['Define osmosis', 'Define diffusion'])
+        self.assertEqual(Question.query.filter_by(quiz_id=attempted.id).count(), 1)
+        self.assertEqual(Question.query.filter_by(quiz_id=fresh.id).count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
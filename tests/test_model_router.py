@@ -0,0 +1,158 @@
+import time
+import unittest
+from google.api_core.exceptions import ResourceExhausted
+from services.model_router import ModelRouter, load_routes, percentile
+from services.hedging import HedgePolicy
+from services.circuit_breaker import CircuitBreaker
+from services.llm_client import LLMClient
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    def __init__(self, name, fail=None):
+        self.name = name
+        self.fail = fail
+        self.configs = []
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        self.configs.append(generation_config)
+        if self.fail:
+            raise self.fail
+        return Response(self.name)
+
+class TestModelRouter(unittest.TestCase):
+    def make_router(self, primary_fail=None, slo=30):
+        routes = {'quiz': {'model': 'big', 'fallback': 'small', 'latency_slo': slo,
+                           'generation_config': {'temperature': 0.7}}}
+        router = ModelRouter(routes=routes, cooldown=60)
+        router._models = {'big': FakeModel('big', primary_fail), 'small': FakeModel('small')}
+        return router
+
+    def test_routes_component_to_model_and_config(self):
+        router = self.make_router()
+        client = LLMClient(FakeModel('unrouted'), router=router)
+        response = client.generate_content('prompt', component='quiz', generation_config={'max_output_tokens': 10})
+        self.assertEqual(response.text, 'big')
+        self.assertEqual(router._models['big'].configs, [{'temperature': 0.7, 'max_output_tokens': 10}])
+        # Calls without a component stay on the client's own model
+        self.assertEqual(client.generate_content('prompt').text, 'unrouted')
+
+    def test_slo_breach_routes_to_fallback(self):
+        router = self.make_router(slo=-1)
+        client = LLMClient(FakeModel('unrouted'), router=router)
+        self.assertEqual(client.generate_content('p', component='quiz').text, 'big')
+        self.assertEqual(client.generate_content('p', component='quiz').text, 'small')
+        decisions = router.snapshot()['quiz']['decisions']
+        self.assertEqual(decisions['primary'], 1)
+        self.assertEqual(decisions['fallback'], 1)
+        self.assertTrue(router.snapshot()['quiz']['fallback_active'])
+
+    def test_quota_error_fails_over_immediately(self):
+        router = self.make_router(primary_fail=ResourceExhausted('quota'))
+        client = LLMClient(FakeModel('unrouted'), router=router)
+        self.assertEqual(client.generate_content('p', component='quiz').text, 'small')
+        self.assertEqual(router.snapshot()['quiz']['decisions']['failover'], 1)
+        self.assertEqual(router.choose('quiz'), ('small', 'fallback'))
+
+    def test_overrides_merge_with_defaults(self):
+        routes = load_routes('{"quiz": {"model": "gemini-pro", "generation_config": {"temperature": 0.1}}}')
+        self.assertEqual(routes['quiz']['model'], 'gemini-pro')
+        self.assertEqual(routes['quiz']['generation_config']['temperature'], 0.1)
+        self.assertIn('max_output_tokens', routes['quiz']['generation_config'])
+        self.assertEqual(routes['summary']['model'], 'gemini-2.0-flash')
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertIsNone(percentile([], 90))
+
+class StallingStream:
+    """A stream that yields one chunk, then fails or stalls on the next"""
+
+    def __init__(self, name, error=None, stall=0.0):
+        self.name = name
+        self.error = error
+        self.stall = stall
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        def chunks():
+            yield Response('first')
+            if self.error:
+                raise self.error
+            time.sleep(self.stall)
+            yield Response('late')
+        return chunks()
+
+class TestStreamFailures(unittest.TestCase):
+    def make_client(self, model):
+        self.router = ModelRouter(routes={'notes': {'model': 'big', 'fallback': 'small', 'latency_slo': 60}})
+        self.router._models = {'big': model, 'small': FakeModel('small')}
+        self.breaker = CircuitBreaker('stream', failure_threshold=1, failure_exceptions=(TimeoutError,))
+        return LLMClient(FakeModel('unrouted'), timeout=0.1, router=self.router, breaker=self.breaker)
+
+    def test_mid_stream_timeout_trips_breaker_and_route(self):
+        client = self.make_client(StallingStream('big', stall=1.0))
+        stream = client.stream_content('p', component='notes')
+        self.assertEqual(next(stream), 'first')
+        with self.assertRaises(TimeoutError):
+            next(stream)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.router.snapshot()['notes']['decisions']['breaches'], 1)
+        self.assertEqual(self.router.choose('notes'), ('small', 'fallback'))
+
+    def test_other_mid_stream_errors_are_not_counted(self):
+        client = self.make_client(StallingStream('big', error=ValueError('blocked')))
+        with self.assertRaises(ValueError):
+            list(client.stream_content('p', component='notes'))
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.router.snapshot()['notes']['decisions']['breaches'], 0)
+
+class SlowFirstModel:
+    """The first call hangs for a while; later calls answer at once"""
+
+    def __init__(self, first_delay=2.0):
+        self.first_delay = first_delay
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(self.first_delay)
+            return Response('slow')
+        return Response('fast')
+
+class TestHedging(unittest.TestCase):
+    def make_client(self, max_rate=1.0):
+        router = self.router = ModelRouter(routes={'quiz': {'model': 'm', 'latency_slo': 60}})
+        self.model = SlowFirstModel()
+        router._models = {'m': self.model}
+        self.policy = HedgePolicy(router=router, enabled=True, max_rate=max_rate, min_samples=3)
+        for _ in range(3):
+            self.policy.record_primary('quiz', 0.05)
+        return LLMClient(FakeModel('unrouted'), router=router, hedging=self.policy)
+
+    def test_slow_call_is_hedged_and_fast_duplicate_wins(self):
+        client = self.make_client()
+        start = time.monotonic()
+        response = client.generate_content('p', component='quiz')
+        self.assertEqual(response.text, 'fast')
+        self.assertLess(time.monotonic() - start, 1.0)
+        stats = self.policy.snapshot()['components']['quiz']
+        self.assertEqual((stats['calls'], stats['hedged'], stats['hedge_wins']), (1, 1, 1))
+
+    def test_hedge_rate_cap(self):
+        client = self.make_client(max_rate=0.0)
+        self.assertEqual(client.generate_content('p', component='quiz').text, 'slow')
+        self.assertEqual(self.model.calls, 1)
+        self.assertEqual(self.policy.snapshot()['components']['quiz']['hedged'], 0)
+
+    def test_no_hedge_without_history(self):
+        policy = HedgePolicy(router=ModelRouter(routes={'quiz': {'model': 'm', 'latency_slo': 60}}),
+                             enabled=True, min_samples=3)
+        self.assertIsNone(policy.delay('quiz'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from app import db
+from app.models import Lecture, Subject
+from app.page_cache import PageCache
+from tests.helpers import AppTestCase
+
+class TestPageCache(unittest.TestCase):
+    def test_lru_evicts_least_recently_used(self):
+        cache = PageCache(capacity=2)
+        cache.set('a', 'A')
+        cache.set('b', 'B')
+        self.assertEqual(cache.get('a'), 'A')
+        cache.set('c', 'C')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'A')
+        self.assertEqual(cache.snapshot()['entries'], 2)
+
+    def test_get_or_render_renders_once(self):
+        cache = PageCache()
+        calls = []
+        render = lambda: calls.append(1) or 'html'
+        self.assertEqual(cache.get_or_render('k', render), 'html')
+        self.assertEqual(cache.get_or_render('k', render), 'html')
+        self.assertEqual(len(calls), 1)
+
+class TestContentVersion(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        subject = Subject(name='Physics')
+        db.session.add(subject)
+        db.session.flush()
+        self.lecture = Lecture(subject_id=subject.id, title='Waves', video_url='https://youtu.be/aaaaaaaaaaa')
+        db.session.add(self.lecture)
+        db.session.commit()
+
+    def test_touch_changes_version(self):
+        version = self.lecture.content_version
+        self.assertEqual(len(version), 16)
+        self.lecture.touch()
+        db.session.commit()
+        self.assertNotEqual(db.session.query(Lecture.content_version).filter_by(id=self.lecture.id).scalar(), version)
+
+if __name__ == '__main__':
+    unittest.main()
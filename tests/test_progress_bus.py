@@ -0,0 +1,109 @@
+import unittest
+import os
+import queue
+import tempfile
+import threading
+import time
+from app.progress_bus import InProcessTransport, SQLiteLogTransport, create_transport
+
+class TransportContract:
+    def make_transport(self):
+        raise NotImplementedError
+
+    def test_events_delivered_in_order(self):
+        bus = self.make_transport()
+        bus.open(1)
+        bus.publish(1, {'component': 'transcript', 'progress': 0})
+        bus.publish(1, {'component': 'transcript', 'progress': 100})
+        sub = bus.subscribe(1)
+        self.assertEqual(sub.get(timeout=1)['progress'], 0)
+        self.assertEqual(sub.get(timeout=1)['progress'], 100)
+        with self.assertRaises(queue.Empty):
+            sub.get(timeout=0.1)
+        sub.close()
+
+    def test_jobs_are_isolated(self):
+        bus = self.make_transport()
+        bus.open(1)
+        bus.open(2)
+        bus.publish(2, {'component': 'complete', 'progress': 100})
+        sub = bus.subscribe(1)
+        with self.assertRaises(queue.Empty):
+            sub.get(timeout=0.1)
+        sub.close()
+
+    def test_subscriber_waits_for_later_events(self):
+        bus = self.make_transport()
+        bus.open(3)
+        sub = bus.subscribe(3)
+        threading.Timer(0.1, bus.publish, args=(3, {'component': 'complete', 'progress': 100})).start()
+        self.assertEqual(sub.get(timeout=2)['component'], 'complete')
+        sub.close()
+
+    def test_shared_state_updates_atomically(self):
+        bus = self.make_transport()
+        bus.update_state('counter', lambda state: None)
+        increment = lambda state: {'n': (state or {'n': 0})['n'] + 1}
+        threads = [threading.Thread(target=lambda: [bus.update_state('counter', increment) for _ in range(10)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(bus.get_state('counter'), {'n': 40})
+        self.assertIsNone(bus.update_state('counter', lambda state: None))
+        self.assertIsNone(bus.get_state('counter'))
+
+    def test_shared_state_expires(self):
+        bus = self.make_transport()
+        bus.update_state('short', lambda state: {'x': 1}, ttl=0.05)
+        time.sleep(0.1)
+        self.assertIsNone(bus.get_state('short'))
+
+class TestInProcessTransport(TransportContract, unittest.TestCase):
+    def make_transport(self):
+        return InProcessTransport()
+
+class TestSQLiteLogTransport(TransportContract, unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'progress.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_transport(self):
+        return SQLiteLogTransport(self.path, poll_interval=0.01)
+
+    def test_events_cross_workers(self):
+        # Two transports on one file stand in for two gunicorn workers
+        producer = self.make_transport()
+        consumer = create_transport(f'sqlite:///{self.path}')
+        producer.open(7)
+        sub = consumer.subscribe(7)
+        producer.publish(7, {'component': 'summary', 'progress': 100})
+        self.assertEqual(sub.get(timeout=1)['component'], 'summary')
+        sub.close()
+
+    def test_state_shared_across_workers(self):
+        first = self.make_transport()
+        second = create_transport(f'sqlite:///{self.path}')
+        first.update_state('job', lambda state: {'leader': 1})
+        self.assertEqual(second.get_state('job'), {'leader': 1})
+
+    def test_open_discards_previous_job(self):
+        bus = self.make_transport()
+        bus.publish(4, {'component': 'complete', 'progress': 100})
+        bus.open(4)
+        sub = bus.subscribe(4)
+        with self.assertRaises(queue.Empty):
+            sub.get(timeout=0.05)
+        sub.close()
+
+@unittest.skipUnless(os.getenv('TEST_REDIS_URL'), 'TEST_REDIS_URL not set')
+class TestRedisTransport(TransportContract, unittest.TestCase):
+    def make_transport(self):
+        return create_transport(os.environ['TEST_REDIS_URL'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import random
+import time
+import unittest
+from app import db
+from datetime import datetime
+from app.models import BankQuestion, Lecture, LectureTimestamp, Question, Quiz, Score, Subject, User
+from app.question_bank import content_hash, difficulty, question_bank
+from tests.helpers import AppTestCase
+
+def make_questions(prefix, count, topic_word=''):
+    return [{'question_statement': f'{prefix} question {i} about {topic_word}?',
+             'options': [f'{topic_word} answer {i}', 'Wrong A', 'Wrong B', 'Wrong C'],
+             'correct_option': 1} for i in range(count)]
+
+class TestQuestionBank(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        subject = Subject(name='Biology')
+        db.session.add(subject)
+        db.session.flush()
+        self.lecture = Lecture(subject_id=subject.id, title='Cells', video_url='https://youtu.be/aaaaaaaaaaa')
+        db.session.add(self.lecture)
+        db.session.flush()
+        db.session.add_all([LectureTimestamp(lecture_id=self.lecture.id, title='Mitochondria, respiration', timestamp=0),
+                            LectureTimestamp(lecture_id=self.lecture.id, title='Chloroplasts, photosynthesis', timestamp=600)])
+        db.session.commit()
+        self.calls = 0
+
+    def generate(self, questions):
+        def generate():
+            self.calls += 1
+            return {'success': True, 'questions': questions}
+        return generate
+
+    def test_content_hash_ignores_case_punctuation_and_option_order(self):
+        a = {'question_statement': 'What is ATP?', 'options': ['Energy', 'Fat', 'Salt', 'DNA'], 'correct_option': 1}
+        b = {'question_statement': 'what is atp', 'options': ['dna', 'salt', 'fat', 'energy!'], 'correct_option': 4}
+        self.assertEqual(content_hash(a), content_hash(b))
+
+    def test_add_dedupes_and_assigns_chapter_topics(self):
+        questions = make_questions('Cell', 3, 'mitochondria') + make_questions('Leaf', 2, 'photosynthesis')
+        self.assertEqual(question_bank.add(self.lecture.id, questions + questions[:2]), 5)
+        db.session.commit()
+        topics = sorted(q.topic for q in BankQuestion.query.filter_by(lecture_id=self.lecture.id))
+        self.assertEqual(topics, [0, 0, 0, 1, 1])
+
+    def test_quizzes_come_from_bank_without_repeats_until_it_runs_low(self):
+        bank = make_questions('Cell', 10, 'mitochondria') + make_questions('Leaf', 10, 'photosynthesis')
+        first = question_bank.questions_for_quiz(self.lecture.id, 10, self.generate(bank))
+        self.assertTrue(first['generated'])
+        self.assertEqual(self.calls, 1)
+        # Coverage: both chapters represented evenly
+        self.assertEqual(sum('Leaf' in q['question_statement'] for q in first['questions']), 5)
+
+        started = time.perf_counter()
+        second = question_bank.questions_for_quiz(self.lecture.id, 10, self.generate([]))
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(self.calls, 1)
+        self.assertFalse(second['generated'])
+        ids = [q['bank_question_id'] for q in first['questions'] + second['questions']]
+        self.assertEqual(len(set(ids)), 20)
+
+        # Bank exhausted: the model is asked again
+        question_bank.questions_for_quiz(self.lecture.id, 10, self.generate(make_questions('New', 10)))
+        self.assertEqual(self.calls, 2)
+
+    def test_failed_generation_reuses_bank(self):
+        question_bank.add(self.lecture.id, make_questions('Cell', 10))
+        db.session.commit()
+        question_bank.questions_for_quiz(self.lecture.id, 10, self.generate([]))  # Uses up the fresh ones
+        failed = lambda: {'success': False, 'error': 'quota'}
+        result = question_bank.questions_for_quiz(self.lecture.id, 5, failed)
+        self.assertTrue(result['success'])
+        self.assertEqual(len(result['questions']), 5)
+        self.assertEqual(question_bank.questions_for_quiz(self.lecture.id, 20, failed)['error'], 'quota')
+
+    def test_short_generation_keeps_its_questions(self):
+        short = lambda: {'success': True, 'short': True, 'questions': make_questions('Cell', 7)}
+        result = question_bank.questions_for_quiz(self.lecture.id, 10, short)
+        self.assertTrue(result['success'])
+        self.assertEqual(len(result['questions']), 7)
+        self.assertEqual(question_bank.size(self.lecture.id), 7)
+
+    def test_answered_questions_are_not_repeated(self):
+        question_bank.add(self.lecture.id, make_questions('Cell', 10))
+        db.session.flush()
+        taken = question_bank.questions_for_quiz(self.lecture.id, 5, self.generate([]))['questions']
+        quiz = Quiz(lecture_id=self.lecture.id, date_of_quiz=self.lecture.created_at, time_duration=10)
+        student = User(email='s@example.com', full_name='Student', dob=datetime(2000, 1, 1))
+        db.session.add_all([quiz, student])
+        db.session.flush()
+        for q in taken:
+            db.session.add(Question(quiz_id=quiz.id, question_statement=q['question_statement'],
+                                    option1=q['options'][0], option2=q['options'][1], option3=q['options'][2],
+                                    option4=q['options'][3], correct_option=q['correct_option'],
+                                    bank_question_id=q['bank_question_id']))
+        db.session.add(Score(quiz_id=quiz.id, user_id=student.id, total_scored=5, total_questions=5, time_taken=3))
+        db.session.commit()
+
+        # Only the five unanswered questions can be reused
+        failed = lambda: {'success': False, 'error': 'quota'}
+        result = question_bank.questions_for_quiz(self.lecture.id, 5, failed)
+        taken_ids = {q['bank_question_id'] for q in taken}
+        self.assertFalse(taken_ids & {q['bank_question_id'] for q in result['questions']})
+        self.assertEqual(question_bank.questions_for_quiz(self.lecture.id, 6, failed)['error'], 'quota')
+        self.assertEqual(len(question_bank.assemble(self.lecture.id, 10, user_id=student.id + 1)), 10)
+
+    def test_answers_rate_difficulty(self):
+        question_bank.add(self.lecture.id, make_questions('Cell', 1))
+        db.session.flush()
+        banked = BankQuestion.query.first()
+        quiz = Quiz(lecture_id=self.lecture.id, date_of_quiz=self.lecture.created_at, time_duration=10)
+        db.session.add(quiz)
+        db.session.flush()
+        question = Question(quiz_id=quiz.id, question_statement='q', option1='a', option2='b', option3='c',
+                            option4='d', correct_option=1, bank_question_id=banked.id)
+        for correct in [False, False, True, False, False]:
+            question_bank.record_answers([question], [{'is_correct': correct}])
+        db.session.commit()
+        db.session.refresh(banked)
+        self.assertEqual((banked.times_answered, banked.times_correct), (5, 1))
+        self.assertEqual(difficulty(banked), 'hard')
+
+    def test_assemble_is_deterministic_with_seeded_rng(self):
+        question_bank.add(self.lecture.id, make_questions('Cell', 30, 'mitochondria'))
+        db.session.commit()
+        first = question_bank.assemble(self.lecture.id, 8, random.Random(3))
+        second = question_bank.assemble(self.lecture.id, 8, random.Random(3))
+        self.assertEqual([q.id for q in first], [q.id for q in second])
+        self.assertIsNone(question_bank.assemble(self.lecture.id, 31))
+
+if __name__ == '__main__':
+    unittest.main()
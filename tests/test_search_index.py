@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+from app import db
+from app.models import Lecture, LectureFlashcard, LectureSearchDocument, LectureSummary, Subject
+from app.search_index import fts_query, search_index
+from tests.helpers import AppTestCase
+
+class TestSearchIndex(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        search_index._fts_engines.clear()
+        physics = Subject(name='Physics')
+        biology = Subject(name='Biology')
+        db.session.add_all([physics, biology])
+        db.session.flush()
+        self.optics = Lecture(subject_id=physics.id, title='Optics', video_url='https://youtu.be/aaaaaaaaaaa')
+        self.cells = Lecture(subject_id=biology.id, title='Cell biology', video_url='https://youtu.be/bbbbbbbbbbb')
+        db.session.add_all([self.optics, self.cells])
+        db.session.flush()
+        db.session.add(LectureSummary(lecture_id=self.optics.id,
+                                      content='<p>Refraction bends <strong>light</strong> at a boundary.</p>'))
+        db.session.add(LectureFlashcard(lecture_id=self.cells.id, front='What makes ATP?', back='Mitochondria'))
+        search_index.index_lecture(self.optics, transcript='Snell law relates the angles of refraction.')
+        search_index.index_lecture(self.cells, transcript='Mitochondria and chloroplasts are organelles. Light drives chloroplasts.')
+        db.session.commit()
+
+    def test_fts_ranks_and_highlights(self):
+        self.assertTrue(search_index.uses_fts())
+        results = search_index.search('light')
+        self.assertEqual([r['lecture_id'] for r in results], [self.optics.id, self.cells.id])
+        self.assertIn('<mark>light</mark>', results[0]['snippet'])
+        self.assertNotIn('<p>', results[0]['snippet'])
+        self.assertEqual(results[0]['subject'], 'Physics')
+        self.assertEqual([r['lecture_id'] for r in search_index.search('mitochon')], [self.cells.id])
+
+    def test_subject_filter_and_hostile_query(self):
+        biology = Subject.query.filter_by(name='Biology').first()
+        self.assertEqual([r['title'] for r in search_index.search('light', subject_id=biology.id)], ['Cell biology'])
+        self.assertEqual(search_index.search('"refraction) ('), search_index.search('refraction'))
+        self.assertEqual(search_index.search('***'), [])
+
+    def test_incremental_update_and_cascade_delete(self):
+        self.optics.title = 'Wave optics'
+        search_index.index_lecture(self.optics)
+        db.session.commit()
+        self.assertEqual([r['title'] for r in search_index.search('wave')], ['Wave optics'])
+        self.assertEqual(len(search_index.search('snell')), 1)  # Transcript kept
+
+        db.session.delete(self.optics)
+        db.session.commit()
+        self.assertEqual(search_index.search('snell'), [])
+        self.assertIsNone(db.session.get(LectureSearchDocument, self.optics.id))
+
+    def test_like_fallback(self):
+        with patch.object(search_index, 'uses_fts', return_value=False):
+            results = search_index.search('light')
+            self.assertEqual([r['lecture_id'] for r in results], [self.optics.id, self.cells.id])
+            self.assertIn('<mark>light</mark>', results[0]['snippet'])
+
+    def test_fts_query_quotes_terms(self):
+        self.assertEqual(fts_query('snell law'), '"snell" "law"*')
+        self.assertIsNone(fts_query('()'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+import unittest
+import os
+from unittest.mock import patch
+import json
+from services.stream_parsers import QuizStreamParser, FlashcardStreamParser
+from services.structured_output import (StructuredStreamParser, decode_json_items, quiz_question_from_json,
+                                        parse_stats)
+from services.llm_client import LLMClient
+
+QUIZ_TEXT = """Q1. What keyword defines a function in Python
+A) def
+B) func
+C) lambda
+D) define
+Correct Answer: A
+
+Q2. Which type is immutable
+A) list
+B) dict
+C) tuple
+D) set
+Correct Answer: C
+
+Q3. Which statement exits a loop early
+A) pass
+B) break
+C) continue
+D) return
+Correct Answer: B
+"""
+
+QUIZ_JSON = '```json\n' + json.dumps({'questions': [
+    {'question': 'What keyword defines a function in Python', 'options': ['def', 'func', 'lambda', 'define'],
+     'answer': 'A'},
+    {'question': 'Which type is immutable, e.g. {"a": 1}?', 'options': ['list', 'dict', 'tuple', 'set'],
+     'answer': 'C'},
+    {'question': 'Which statement exits a loop early', 'options': ['pass', 'break', 'continue', 'return'],
+     'answer': 'B'}
+]}, indent=2) + '\n```'
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+class StreamingModel:
+    """Stands in for a Gemini model; streams the canned text in small chunks"""
+
+    def __init__(self, text, chunk_size=7):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.chunks_served = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        if not stream:
+            return Chunk(self.text)
+        return self._chunks()
+
+    def _chunks(self):
+        for i in range(0, len(self.text), self.chunk_size):
+            self.chunks_served += 1
+            yield Chunk(self.text[i:i + self.chunk_size])
+
+class ScriptedModel:
+    """Returns one canned response per call and records the prompts it was given"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.prompts.append(prompt)
+        return StreamingModel(self.responses.pop(0)).generate_content(prompt, stream=stream)
+
+class TestStreamParsers(unittest.TestCase):
+    def test_quiz_parser_handles_arbitrary_chunk_boundaries(self):
+        whole = QuizStreamParser()
+        expected = whole.feed(QUIZ_TEXT) + whole.close()
+        self.assertEqual(len(expected), 3)
+
+        for size in (1, 5, 13):
+            parser = QuizStreamParser()
+            items = []
+            for i in range(0, len(QUIZ_TEXT), size):
+                items.extend(parser.feed(QUIZ_TEXT[i:i + size]))
+            items.extend(parser.close())
+            self.assertEqual(items, expected)
+
+    def test_quiz_question_emitted_at_answer_line(self):
+        parser = QuizStreamParser()
+        first_block = QUIZ_TEXT.split('\n\n')[0] + '\n'
+        items = parser.feed(first_block)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]['correct_option'], 1)
+        self.assertEqual(items[0]['options'][0], 'def')
+
+    def test_flashcard_parser_emits_on_answer(self):
+        parser = FlashcardStreamParser()
+        self.assertEqual(parser.feed('Q: What is a tuple?\nA: An immut'), [])
+        cards = parser.feed('able sequence\nQ: Next')
+        self.assertEqual(cards, [{'front': 'What is a tuple?', 'back': 'An immutable sequence'}])
+        self.assertEqual(parser.close(), [])
+
+class TestStreamingQuizGeneration(unittest.TestCase):
+    def setUp(self):
+        from services.ai_service import LectureAIService
+        with patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'}):
+            self.service = LectureAIService()
+
+    def test_stream_stops_once_enough_questions(self):
+        model = StreamingModel(QUIZ_TEXT)
+        self.service.llm = LLMClient(model)
+        progress = []
+        questions = self.service.generate_quiz('Python basics ' * 10, num_questions=2, stream=True,
+                                               on_progress=lambda done, total: progress.append(done))
+        self.assertEqual(len(questions), 2)
+        self.assertEqual(progress, [1, 2])
+        self.assertLess(model.chunks_served, len(QUIZ_TEXT) // model.chunk_size)
+
+    def test_stream_matches_buffered_parse(self):
+        self.service.llm = LLMClient(StreamingModel(QUIZ_TEXT))
+        streamed = self.service.generate_quiz('Python basics ' * 10, num_questions=3, stream=True)
+        buffered = self.service.generate_quiz('Python basics ' * 10, num_questions=3)
+        self.assertEqual(streamed, buffered)
+
+class TestStructuredOutput(unittest.TestCase):
+    def test_strict_decode_strips_code_fence(self):
+        items = decode_json_items(QUIZ_JSON, 'questions')
+        self.assertEqual(len(items), 3)
+        self.assertIsNone(decode_json_items(QUIZ_TEXT, 'questions'))
+        self.assertIsNone(decode_json_items(QUIZ_JSON[:-40], 'questions'))
+
+    def test_json_items_stream_across_chunk_boundaries(self):
+        expected = [quiz_question_from_json(item) for item in decode_json_items(QUIZ_JSON, 'questions')]
+        for size in (1, 4, 17):
+            parser = StructuredStreamParser(QuizStreamParser(), quiz_question_from_json)
+            items = []
+            for i in range(0, len(QUIZ_JSON), size):
+                items.extend(parser.feed(QUIZ_JSON[i:i + size]))
+            items.extend(parser.close())
+            self.assertEqual(parser.mode, 'json')
+            self.assertEqual(items, expected)
+        self.assertEqual(expected[1]['correct_option'], 3)
+
+    def test_falls_back_to_line_format(self):
+        parser = StructuredStreamParser(QuizStreamParser(), quiz_question_from_json)
+        items = parser.feed(QUIZ_TEXT) + parser.close()
+        self.assertEqual(parser.mode, 'text')
+        self.assertEqual(len(items), 3)
+
+    def test_generate_quiz_from_json_records_stats(self):
+        from services.ai_service import LectureAIService
+        with patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'}):
+            service = LectureAIService()
+        service.llm = LLMClient(StreamingModel(QUIZ_JSON))
+        before = parse_stats.snapshot().get('quiz', {}).get('json', 0)
+        streamed = service.generate_quiz('Python basics ' * 10, num_questions=3, stream=True)
+        buffered = service.generate_quiz('Python basics ' * 10, num_questions=3)
+        self.assertEqual(len(streamed), 3)
+        self.assertEqual(streamed, buffered)
+        self.assertEqual(parse_stats.snapshot()['quiz']['json'], before + 2)
+
+class TestTopUpGeneration(unittest.TestCase):
+    def setUp(self):
+        from services.ai_service import LectureAIService
+        with patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'}):
+            self.service = LectureAIService()
+        blocks = QUIZ_TEXT.strip().split('\n\n')
+        # First response: two good questions; second: a repeat plus the missing one
+        self.model = ScriptedModel(['\n\n'.join(blocks[:2]), '\n\n'.join([blocks[0], blocks[2]])])
+        self.service.llm = LLMClient(self.model)
+
+    def check_top_up(self, stream):
+        questions = self.service.generate_quiz('Python basics ' * 10, num_questions=3, stream=stream)
+        self.assertEqual([q['correct_option'] for q in questions], [1, 3, 2])
+        self.assertEqual(len(self.model.prompts), 2)
+        self.assertIn('generate 1 multiple-choice', self.model.prompts[1])
+        self.assertIn('Which type is immutable', self.model.prompts[1])
+
+    def test_buffered_top_up_requests_only_shortfall(self):
+        self.check_top_up(stream=False)
+
+    def test_streamed_top_up_requests_only_shortfall(self):
+        self.check_top_up(stream=True)
+
+class TestQuizService(unittest.TestCase):
+    def setUp(self):
+        from services.ai_service import LectureAIService
+        from services.quiz_service import QuizService
+        with patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'}):
+            service = LectureAIService()
+            self.quiz_service = QuizService(service)
+        # Every response repeats the same question, so the quiz never fills up
+        self.model = ScriptedModel([QUIZ_TEXT.strip().split('\n\n')[0]] * 10)
+        service.llm = LLMClient(self.model)
+
+    def test_short_quiz_costs_one_attempt_budget_and_keeps_valid_questions(self):
+        result = self.quiz_service.generate_quiz('Python basics ' * 10, num_questions=5)
+        self.assertEqual(len(self.model.prompts), 3)
+        self.assertTrue(result['short'])
+        self.assertEqual([q['correct_option'] for q in result['questions']], [1])
+
+class TestPartPrompts(unittest.TestCase):
+    def test_part_content_is_sent_whole(self):
+        from services.ai_service import LectureAIService
+        with patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'}):
+            service = LectureAIService()
+        model = ScriptedModel(['## Part', 'CARD:\nFront: Q\nBack: A'])
+        service.llm = LLMClient(model)
+        part = ' '.join(f'word{i}' for i in range(1500))
+        service.generate_part_notes(part)
+        service.generate_flashcards(part, count=1, max_chars=None)
+        self.assertTrue(all('word1499' in prompt for prompt in model.prompts))
+
+class TestLecturePack(unittest.TestCase):
+    def setUp(self):
+        from services.ai_service import LectureAIService
+        from services.flashcard_service import FlashcardService
+        with patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'}):
+            self.service = LectureAIService()
+            self.flashcards = FlashcardService()
+        questions = json.loads(QUIZ_JSON.strip('`json\n'))['questions']
+        pack = {
+            'summary': '# Python\n- Functions are defined with def and tuples are immutable sequences.',
+            'notes': 'too short',
+            'flashcards': [{'front': 'What is a tuple', 'back': 'An immutable sequence'}],
+            'questions': questions[:2]
+        }
+        self.model = ScriptedModel([json.dumps(pack), '\n\n'.join(QUIZ_TEXT.strip().split('\n\n')[2:])])
+        self.service.llm = LLMClient(self.model)
+
+    def test_pack_keeps_valid_sections_and_seeds_top_up(self):
+        pack = self.service.generate_lecture_pack('Python basics ' * 10, ['summary', 'notes', 'flashcards', 'quiz'],
+                                                  num_questions=3, card_filter=self.flashcards.valid_cards)
+        self.assertEqual(sorted(pack), ['flashcards', 'quiz', 'summary'])
+        self.assertTrue(pack['summary'].startswith('# Python'))
+        self.assertEqual(pack['flashcards'], [{'front': 'What is a tuple?', 'back': 'An immutable sequence'}])
+        self.assertEqual(len(pack['quiz']), 2)
+
+        questions = self.service.generate_quiz('Python basics ' * 10, num_questions=3, seed=pack['quiz'])
+        self.assertEqual(len(questions), 3)
+        self.assertEqual(len(self.model.prompts), 2)
+        self.assertIn('generate 1 multiple-choice', self.model.prompts[1])
+
+if __name__ == '__main__':
+    unittest.main()
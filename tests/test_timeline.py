@@ -0,0 +1,66 @@
+import unittest
+from app import db
+from app.models import Lecture, LectureTimeline, Subject
+from app.timeline_store import timeline_store
+from services.timeline import Timeline
+from tests.helpers import AppTestCase
+
+SEGMENTS = [{'text': f'Segment {i} text.', 'start': i * 10.0} for i in range(100)]
+
+class TestTimeline(unittest.TestCase):
+    def setUp(self):
+        self.timeline = Timeline.from_segments(SEGMENTS)
+
+    def test_lookup_by_time(self):
+        self.assertEqual(self.timeline.index_at(0), 0)
+        self.assertEqual(self.timeline.index_at(25.5), 2)
+        self.assertEqual(self.timeline.index_at(30), 3)
+        self.assertEqual(self.timeline.index_at(5000), 99)
+        self.assertEqual(self.timeline.segment(2), {'index': 2, 'start': 20.0, 'end': 30.0, 'text': 'Segment 2 text.'})
+
+    def test_window_around_playhead(self):
+        window = self.timeline.window(95, before=20, after=30)
+        self.assertEqual(window['active'], 9)
+        self.assertEqual([s['index'] for s in window['segments']], list(range(8, 13)))
+        self.assertEqual((window['from'], window['to']), (80.0, 130.0))
+        self.assertEqual(self.timeline.window(990, before=0, after=0)['segments'][-1]['end'], None)
+
+    def test_bytes_round_trip_is_compact(self):
+        starts, offsets = self.timeline.to_bytes()
+        self.assertEqual(len(starts), 4 * 100)
+        restored = Timeline.from_bytes(starts, offsets, self.timeline.text)
+        self.assertEqual(restored.window(500), self.timeline.window(500))
+
+    def test_unsorted_and_empty_segments(self):
+        timeline = Timeline.from_segments([{'text': 'a', 'start': 5}, {'text': ' ', 'start': 6}, {'text': 'b', 'start': 4}])
+        self.assertEqual(list(timeline.starts), [5000, 5000])
+        self.assertEqual(Timeline.from_segments([]).window(10)['segments'], [])
+
+class TestTimelineStore(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        subject = Subject(name='Maths')
+        db.session.add(subject)
+        db.session.flush()
+        self.lecture = Lecture(subject_id=subject.id, title='Series', video_url='https://youtu.be/aaaaaaaaaaa')
+        db.session.add(self.lecture)
+        db.session.commit()
+
+    def test_save_load_and_refresh(self):
+        self.assertIsNone(timeline_store.load(self.lecture.id))
+        timeline_store.save(self.lecture.id, SEGMENTS)
+        db.session.commit()
+        loaded = timeline_store.load(self.lecture.id)
+        self.assertEqual(loaded.segment(5)['text'], 'Segment 5 text.')
+        self.assertIs(timeline_store.load(self.lecture.id), loaded)  # Cached
+
+        timeline_store.save(self.lecture.id, [{'text': 'Replaced', 'start': 0}])
+        db.session.commit()
+        self.assertEqual(timeline_store.load(self.lecture.id).segment(0)['text'], 'Replaced')
+
+        db.session.delete(self.lecture)
+        db.session.commit()
+        self.assertIsNone(db.session.get(LectureTimeline, self.lecture.id))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import random
+import unittest
+from app import db
+from app.chunk_artifacts import chunk_artifacts
+from app.models import Lecture, LectureChunkArtifact, Subject
+from services.cancellation import CancellationToken, GenerationCancelled
+from services.transcript_chunks import chunk_segments, group_chunks
+from tests.helpers import AppTestCase
+
+def make_segments(count=600, seed=3):
+    rng = random.Random(seed)
+    vocabulary = [f'word{i}' for i in range(300)]
+    return [{'text': ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(5, 12))), 'start': i * 4.0}
+            for i in range(count)]
+
+class FakeAIService:
+    def __init__(self):
+        self.calls = []
+
+    def generate_flashcards(self, content, cancel_token=None, count=10, max_chars=4000):
+        self.calls.append(content)
+        # More cards than asked for, as the model sometimes returns
+        return [{'front': f'Card {len(self.calls)}.{i}', 'back': 'Back'} for i in range(count + 2)]
+
+    def generate_part_notes(self, content, cancel_token=None):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        self.calls.append(content)
+        return f'<h2>Part {len(self.calls)}</h2>'
+
+class TestChunkSegments(unittest.TestCase):
+    def test_chunks_cover_transcript_within_size_limits(self):
+        segments = make_segments()
+        chunks = chunk_segments(segments, target_chars=2500, max_chars=4000)
+        self.assertGreater(len(chunks), 5)
+        self.assertTrue(all(len(chunk['text']) <= 4000 for chunk in chunks))
+        self.assertEqual(' '.join(chunk['text'] for chunk in chunks), ' '.join(s['text'] for s in segments))
+        self.assertEqual([chunk['index'] for chunk in chunks], list(range(len(chunks))))
+
+    def test_local_edit_changes_only_nearby_chunks(self):
+        segments = make_segments()
+        before = [chunk['hash'] for chunk in chunk_segments(segments)]
+        edited = [dict(s) for s in segments]
+        edited[300]['text'] = 'an inserted correction ' + edited[300]['text']
+        edited.insert(301, {'text': 'and an extra caption line', 'start': 1202.0})
+        after = [chunk['hash'] for chunk in chunk_segments(edited)]
+        self.assertLessEqual(len(set(after) - set(before)), 2)
+        self.assertGreaterEqual(len(set(after) & set(before)), len(before) - 2)
+
+    def test_groups_are_bounded_and_cover_chunks(self):
+        chunks = chunk_segments(make_segments(1200))
+        groups = group_chunks(chunks, max_groups=4)
+        self.assertLessEqual(len(groups), 4)
+        self.assertEqual(sum(group['chunks'] for group in groups), len(chunks))
+        self.assertEqual(' '.join(group['text'] for group in groups), ' '.join(chunk['text'] for chunk in chunks))
+        self.assertEqual(len(group_chunks(chunks[:3], max_groups=4)), 3)
+
+    def test_segments_are_not_reduced_again(self):
+        # get_transcript hands over reduced segments; a second pass would strip more
+        chunks = chunk_segments([{'text': 'um so so [Music] we start', 'start': 0.0}])
+        self.assertEqual(chunks[0]['text'], 'um so so [Music] we start')
+
+    def test_empty(self):
+        self.assertEqual(chunk_segments([]), [])
+        self.assertEqual(group_chunks([]), [])
+
+class TestChunkArtifactStore(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        subject = Subject(name='Physics')
+        db.session.add(subject)
+        db.session.flush()
+        self.lecture = Lecture(subject_id=subject.id, title='Waves', video_url='https://youtu.be/aaaaaaaaaaa')
+        db.session.add(self.lecture)
+        db.session.commit()
+        self.ai = FakeAIService()
+
+    def test_regeneration_only_sends_changed_groups(self):
+        segments = make_segments()
+        groups = len(group_chunks(chunk_segments(segments)))
+        first = chunk_artifacts.notes(self.lecture.id, segments, self.ai)
+        db.session.commit()
+        self.assertEqual(len(self.ai.calls), groups)
+
+        self.assertEqual(chunk_artifacts.notes(self.lecture.id, segments, self.ai), first)
+        self.assertEqual(len(self.ai.calls), groups)
+
+        edited = [dict(s) for s in segments]
+        edited[10]['text'] = 'a corrected caption about standing waves'
+        before = {group['hash'] for group in group_chunks(chunk_segments(segments))}
+        after = {group['hash'] for group in group_chunks(chunk_segments(edited))}
+        self.assertLessEqual(len(after - before), 2)
+        chunk_artifacts.notes(self.lecture.id, edited, self.ai)
+        db.session.commit()
+        self.assertEqual(len(self.ai.calls), groups + len(after - before))
+        self.assertEqual(LectureChunkArtifact.query.filter_by(lecture_id=self.lecture.id).count(), len(after))
+
+        chunk_artifacts.notes(self.lecture.id, edited, self.ai, force=True)
+        self.assertEqual(len(self.ai.calls), groups + len(after - before) + len(after))
+
+    def test_flashcards_split_count_across_groups(self):
+        segments = make_segments()
+        cards = chunk_artifacts.flashcards(self.lecture.id, segments, self.ai, count=10)
+        self.assertEqual(len(cards), 10)
+        self.assertLessEqual(len(self.ai.calls), len(group_chunks(chunk_segments(segments))))
+        db.session.commit()
+        self.assertEqual(chunk_artifacts.flashcards(self.lecture.id, segments, self.ai, count=10), cards)
+
+    def test_long_lecture_makes_bounded_calls(self):
+        self.app.config['CHUNK_ARTIFACT_GROUPS'] = 3
+        cards = chunk_artifacts.flashcards(self.lecture.id, make_segments(1500), self.ai, count=10)
+        self.assertLessEqual(len(self.ai.calls), 3)
+        self.assertEqual(len(cards), 10)
+
+    def test_deadline_stops_chunked_regeneration(self):
+        token = CancellationToken()
+        token.cancel('Content generation deadline exceeded')
+        with self.assertRaises(GenerationCancelled):
+            chunk_artifacts.notes(self.lecture.id, make_segments(200), self.ai, cancel_token=token)
+        self.assertEqual(self.ai.calls, [])
+
+    def test_notes_are_joined_in_chunk_order_and_failures_not_cached(self):
+        segments = make_segments(200)
+        groups = len(group_chunks(chunk_segments(segments)))
+        failing = FakeAIService()
+        failing.generate_part_notes = lambda content, cancel_token=None: None
+        self.assertIn('Error', chunk_artifacts.notes(self.lecture.id, segments, failing))
+        notes = chunk_artifacts.notes(self.lecture.id, segments, self.ai)
+        self.assertEqual(notes, '\n\n'.join(f'<h2>Part {i + 1}</h2>' for i in range(groups)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import patch
+from services.transcript_reducer import clean_caption, dedupe_sentences, reduce_segments, reduction_report
+from services.video_service import VideoService, assemble_transcript
+
+CAPTIONS = [
+    {'text': '[Music]', 'start': 0.0, 'duration': 3.0},
+    {'text': 'um so today we are going to', 'start': 3.0, 'duration': 2.0},
+    {'text': 'we are going to talk about uh the', 'start': 5.0, 'duration': 2.0},
+    {'text': 'Fourier transform, you know, which is', 'start': 7.0, 'duration': 2.0},
+    {'text': 'which is really useful ♪', 'start': 9.0, 'duration': 2.0},
+    {'text': '[Applause]', 'start': 11.0, 'duration': 1.0}
+]
+
+class TestTranscriptReducer(unittest.TestCase):
+    def test_reduce_segments_removes_overlap_fillers_and_markers(self):
+        reduced = reduce_segments(CAPTIONS)
+        self.assertEqual(' '.join(entry['text'] for entry in reduced),
+                         'so today we are going to talk about the Fourier transform, which is really useful')
+        self.assertEqual([entry['start'] for entry in reduced], [3.0, 5.0, 7.0, 9.0])
+
+    def test_filler_removal_keeps_real_words(self):
+        self.assertEqual(clean_caption('Umbrella and humming, ah, matter. I mean, errands too'),
+                         'Umbrella and humming, matter. errands too')
+        self.assertEqual(clean_caption('I mean the mean value'), 'I mean the mean value')
+
+    def test_only_caption_markers_and_stutters_are_removed(self):
+        self.assertEqual(clean_caption('[Music] the the interval [0, 1] and [x] (Laughter)'),
+                         'the interval [0, 1] and [x]')
+        self.assertEqual(clean_caption('She had had enough, so that that works'), 'She had had enough, so that that works')
+        self.assertEqual(clean_caption('I I think it is is is true'), 'I think it is true')
+
+    def test_dedupe_near_identical_sentences(self):
+        text = 'The gradient points uphill here. The gradient points uphill here! Descent goes the other way.'
+        self.assertEqual(dedupe_sentences(text), 'The gradient points uphill here. Descent goes the other way.')
+
+    def test_get_transcript_reports_reduction(self):
+        with patch('services.video_service.YouTubeTranscriptApi.get_transcript', return_value=CAPTIONS):
+            data = VideoService().get_transcript('https://www.youtube.com/watch?v=abcdefghijk')
+        self.assertNotIn('Music', data['full_text'])
+        self.assertGreater(data['reduction']['reduction_ratio'], 0.2)
+        self.assertEqual(data['reduction'], reduction_report(
+            len(' '.join(c['text'] for c in CAPTIONS)), len(data['full_text'])))
+
+class TestTranscriptAssembly(unittest.TestCase):
+    def test_groups_close_at_sentence_end_once_long_enough(self):
+        segments = [
+            {'text': 'Short.', 'start': 0.0, 'duration': 1.0},
+            {'text': 'This segment carries the group past fifty characters.', 'start': 1.0, 'duration': 3.0},
+            {'text': 'Then a new group begins', 'start': 4.5, 'duration': 2.0},
+            {'text': 'and runs to the end', 'start': 6.5, 'duration': 2.0}
+        ]
+        full_text, timestamps = assemble_transcript(iter(segments))
+        self.assertEqual(full_text, ' '.join(s['text'] for s in segments))
+        self.assertEqual(timestamps, [
+            {'text': 'Short. This segment carries the group past fifty characters.', 'start': 0.0},
+            {'text': 'Then a new group begins and runs to the end', 'start': 4.5}
+        ])
+
+if __name__ == '__main__':
+    unittest.main()